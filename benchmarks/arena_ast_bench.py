@@ -0,0 +1,64 @@
+"""The AST of a program of about a million nodes as objects and as an arena.
+
+Run from the repository root:
+
+    python -m benchmarks.arena_ast_bench [statements]
+
+'memory' is what the tree holds once tokens are dropped, measured with
+tracemalloc; for the arena it is the arena alone. 'pickle' and 'unpickle' time
+a round trip and 'typecheck' walks the tree, through views for the arena.
+The views are made as the walk reads each node, so typechecking an arena
+is slower than typechecking the objects.
+"""
+import gc
+import pickle
+import sys
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.ast_memory_bench import count_nodes, generate_program
+from benchmarks.common import best_of
+from src.compiler.arena_ast import bind_symbols, pack, view
+from src.compiler.traversal import gc_paused
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck
+
+
+def traced(f: Callable[[], Any]) -> tuple[Any, int]:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = f()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 111_000
+    source = generate_program(statements)
+
+    symtab = SymTab(locals={}, parent=None)
+    root, tree_bytes = traced(lambda: parser(tokenize(source), symbols=symtab.symbols))
+    arena, arena_bytes = traced(lambda: pack(root))
+    bind_symbols(arena, symtab.symbols)
+    nodes = count_nodes(root)
+    print(f'{nodes} nodes')
+
+    runs: list[tuple[str, Any, int, Callable[[], Any]]] = [('objects', root, tree_bytes, lambda: root),
+                                                           ('arena', arena, arena_bytes, lambda: view(arena))]
+    for name, tree, size, walk in runs:
+        data, dump_time = best_of(3, lambda: pickle.dumps(tree))
+        with gc_paused():
+            _, load_time = best_of(3, lambda: pickle.loads(data))
+        _, check_time = best_of(3, lambda: typecheck(walk(), symtab))
+        print(f'{name:<8} memory {size / 2**20:>6.1f} MB ({size / nodes:>5.1f} bytes/node), '
+              f'pickle {len(data) / 2**20:>5.1f} MB in {dump_time:.3f} s, unpickle {load_time:.3f} s, '
+              f'typecheck {check_time:.3f} s')
+
+
+if __name__ == '__main__':
+    main()
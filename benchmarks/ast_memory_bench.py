@@ -0,0 +1,62 @@
+"""Memory taken by the AST of a program of about a million nodes, measured with tracemalloc.
+
+Run from the repository root:
+
+    python -m benchmarks.ast_memory_bench [statements]
+
+'parse' is what `parser` allocates while the tokens are alive: the nodes and
+their lists, since nodes share the tokens' locations. 'AST alone' is what is
+left of tokenizing and parsing once the tokens are dropped, which adds the
+locations and names the nodes keep.
+"""
+import gc
+import random
+import sys
+import tracemalloc
+
+from src.compiler import ast
+from src.compiler.parser import parser
+from src.compiler.tokenizer import tokenize
+from src.compiler.traversal import preorder
+
+
+def generate_program(statements: int) -> str:
+    rand = random.Random(0)
+    lines = ['{', '    var v0 = 1;']
+    for i in range(1, statements):
+        a, b, c, d = (f'v{rand.randrange(i)}' for _ in range(4))
+        lines.append(f'    var v{i} = {a} + {b} * {c} - {d};')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def count_nodes(root: ast.Expression) -> int:
+    return sum(1 for _ in preorder(root))
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 111_000
+    source = generate_program(statements)
+    gc.collect()
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tokens = tokenize(source)
+    after_tokenize, _ = tracemalloc.get_traced_memory()
+    root = parser(tokens)
+    after_parse, _ = tracemalloc.get_traced_memory()
+    del tokens
+    gc.collect()
+    ast_alone, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    nodes = count_nodes(root)
+    parse_bytes = after_parse - after_tokenize
+    alone_bytes = ast_alone - before
+    print(f'{nodes} nodes')
+    print(f'{"parse":<10} {parse_bytes / 2**20:>8.1f} MB {parse_bytes / nodes:>7.1f} bytes/node')
+    print(f'{"AST alone":<10} {alone_bytes / 2**20:>8.1f} MB {alone_bytes / nodes:>7.1f} bytes/node')
+
+
+if __name__ == '__main__':
+    main()
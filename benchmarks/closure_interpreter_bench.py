@@ -0,0 +1,55 @@
+"""The closure-compiling interpreter against the tree-walking one on loop-heavy programs.
+
+Run from the repository root:
+
+    python -m benchmarks.closure_interpreter_bench [iterations]
+
+'closures' includes compiling the tree, which is done once per run.
+Parsing is not included.
+"""
+import sys
+
+from benchmarks.common import best_of
+from benchmarks.resolver_bench import loop_template
+from src.compiler.closure_interpreter import interpret_closures
+from src.compiler.interpreter import interpret
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import tokenize
+
+# Counts the primes below the bound by trial division
+primes_template = '''{{
+    var count = 0;
+    var n = 2;
+    while n < {bound} do {{
+        var d = 2;
+        var prime = true;
+        while prime and d * d <= n do {{
+            if n - n / d * d == 0 then prime = false;
+            d = d + 1;
+        }};
+        if prime then count = count + 1;
+        n = n + 1;
+    }};
+    count
+}}'''
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    programs = {
+        'nested loops': loop_template.format(iterations=iterations),
+        'primes': primes_template.format(bound=iterations * 2),
+    }
+    print(f'{"program":<14} {"tree walk":>10} {"closures":>10} {"speedup":>8}')
+    for name, source in programs.items():
+        root = parser(tokenize(source))
+        expected, walk_time = best_of(3, lambda: interpret(SymTab(locals=interpreter_locals, parent=None), root))
+        result, closure_time = best_of(3, lambda: interpret_closures(SymTab(locals=interpreter_locals, parent=None),
+                                                                     root))
+        assert result == expected
+        print(f'{name:<14} {walk_time:>9.3f}s {closure_time:>9.3f}s {walk_time / closure_time:>8.2f}')
+
+
+if __name__ == '__main__':
+    main()
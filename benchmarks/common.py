@@ -0,0 +1,84 @@
+import time
+from typing import Callable, Iterator, TypeVar
+
+T = TypeVar('T')
+
+MB = 1024 * 1024
+
+program_template = '''// function {n}
+fun square_{n}(x: Int): Int {{
+    return x * x;
+}}
+
+/* block comment
+   spanning lines {n} */
+{{
+    var a_{n} = {n};
+    var b_{n}: Bool = true;
+    while a_{n} > 0 and b_{n} do {{
+        a_{n} = a_{n} - 1;
+        if a_{n} == 3 then print_int(square_{n}(a_{n})) else print_bool(not b_{n});
+    }}
+}}
+'''
+
+function_template = '''
+fun f_{n}(x: Int, y: Int): Int {{
+    var a = x * 2 + y;
+    var b = 0;
+    while a > 0 do {{
+        a = a - 1;
+        if a == 3 then {{ b = b + f_{previous}(a, b) }} else {{ b = b - 1 }}
+    }}
+    return a + b;
+}}
+'''
+
+
+def generate_functions(functions: int) -> str:
+    """Returns a program of `functions` function definitions, each calling the one before it."""
+    parts = ['fun f_0(x: Int, y: Int): Int { return x + y; }\n']
+    parts.extend(function_template.format(n=n, previous=n - 1) for n in range(1, functions))
+    parts.append(f'print_int(f_{functions - 1}(1, 2));\n')
+    return ''.join(parts)
+
+
+def generate_pieces(size: int, piece_size: int) -> Iterator[str]:
+    """Yields a synthetic program of roughly `size` bytes in pieces of about `piece_size` bytes.
+
+    Pieces are cut between top-level items, so every piece is a valid program on its own."""
+    parts: list[str] = []
+    piece_total = 0
+    total = 0
+    n = 0
+    while total < size:
+        part = program_template.format(n=n)
+        parts.append(part)
+        piece_total += len(part)
+        total += len(part)
+        n += 1
+        if piece_total >= piece_size:
+            yield ''.join(parts)
+            parts = []
+            piece_total = 0
+    if parts:
+        yield ''.join(parts)
+
+
+def generate_source(size: int) -> str:
+    """Returns a synthetic program of roughly `size` bytes."""
+    return ''.join(generate_pieces(size, size))
+
+
+def timed(f: Callable[[], T]) -> tuple[T, float]:
+    start = time.perf_counter()
+    result = f()
+    return result, time.perf_counter() - start
+
+
+def best_of(repeat: int, f: Callable[[], T]) -> tuple[T, float]:
+    result, best = timed(f)
+    for _ in range(repeat - 1):
+        result, elapsed = timed(f)
+        best = min(best, elapsed)
+    return result, best
@@ -0,0 +1,54 @@
+"""Time of typechecking and lowering to IR in one walk against the separate passes.
+
+Run from the repository root:
+
+    python -m benchmarks.fused_bench [functions] [statements]
+
+The programs are `generate_functions` and the random arithmetic of
+`ast_memory_bench`. Parsing is not included.
+"""
+import sys
+
+from benchmarks.ast_memory_bench import generate_program
+from benchmarks.common import best_of, generate_functions
+from src.compiler import ast
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parse_module, parser
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+
+
+def two_pass(module: ast.Module) -> None:
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+        generate_ir(root_types, fun)
+    if module.expr is not None:
+        typecheck(module.expr, symtab)
+        generate_ir(root_types, module.expr)
+
+
+def fused(module: ast.Module) -> None:
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        generate_ir(root_types, fun, symtab)
+    if module.expr is not None:
+        generate_ir(root_types, module.expr, symtab)
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    statements = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    programs = {
+        f'{functions} functions': parse_module(tokenize(generate_functions(functions))),
+        f'{statements} statements': ast.Module(functions=[], expr=parser(tokenize(generate_program(statements)))),
+    }
+    for name, module in programs.items():
+        _, separate = best_of(5, lambda: two_pass(module))
+        _, together = best_of(5, lambda: fused(module))
+        print(f'{name:<18} two passes {separate:>7.3f} s   fused {together:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
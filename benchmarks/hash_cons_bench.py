@@ -0,0 +1,59 @@
+"""Parsing with and without sharing equal subtrees through `SharedNodes`.
+
+Run from the repository root:
+
+    python -m benchmarks.hash_cons_bench [functions]
+
+'functions' is `generate_functions`, which repeats the same expressions in
+every function; 'statements' is the random arithmetic of `ast_memory_bench`,
+where few subtrees above the variables repeat. 'memory' is what the parse
+allocates while the tokens are alive, measured with tracemalloc, with the
+table and once it is dropped. 'saved' is the size of the nodes that
+`SharedNodes` replaced.
+"""
+import gc
+import sys
+import tracemalloc
+
+from benchmarks.ast_memory_bench import generate_program
+from benchmarks.common import best_of, generate_functions
+from src.compiler.parser import SharedNodes, parse_module
+from src.compiler.tokenizer import Token, tokenize
+
+
+def traced_parse(tokens: list[Token], shared: SharedNodes | None) -> tuple[int, int]:
+    """Returns the bytes allocated by the parse with `shared` alive, and once it is dropped."""
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    module = parse_module(tokens, shared)
+    with_table, _ = tracemalloc.get_traced_memory()
+    if shared is not None:
+        shared.nodes.clear()
+        shared.ids.clear()
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del module
+    return with_table - before, after - before
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    programs = {'functions': generate_functions(functions), 'statements': generate_program(functions * 20)}
+
+    for name, source in programs.items():
+        tokens = tokenize(source)
+        shared = SharedNodes()
+        plain_bytes, _ = traced_parse(tokens, None)
+        table_bytes, shared_bytes = traced_parse(tokens, shared)
+        _, plain_time = best_of(3, lambda: parse_module(tokens))
+        _, shared_time = best_of(3, lambda: parse_module(tokens, SharedNodes()))
+        print(f'{name:<10} {len(tokens)} tokens, {shared.shared} nodes shared, saved {shared.saved_bytes / 2**20:.1f} MB')
+        print(f'{"":<10} plain  {plain_bytes / 2**20:>6.1f} MB {"":>21} {plain_time:>7.3f} s')
+        print(f'{"":<10} shared {shared_bytes / 2**20:>6.1f} MB ({table_bytes / 2**20:>6.1f} MB with table) '
+              f'{shared_time:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
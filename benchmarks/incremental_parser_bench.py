@@ -0,0 +1,46 @@
+"""Reparsing after a one-function edit, against parsing the whole module again.
+
+Run from the repository root:
+
+    python -m benchmarks.incremental_parser_bench [functions]
+
+'same lines' changes a constant in the middle function; 'new line' adds a
+statement to it, which moves every function below it down by one line, so
+that they are reused as copies at their new lines.
+Tokenizing is not included.
+"""
+import sys
+
+from benchmarks.common import best_of, generate_functions
+from src.compiler.incremental_parser import ParseCache, reparse_module
+from src.compiler.parser import parse_module
+from src.compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generate_functions(functions)
+    middle = source.index(f'fun f_{functions // 2}(')
+    line_end = source.index('\n', middle)
+    edits = {
+        'same lines': source[:middle] + source[middle:].replace('x * 2 + y', 'x * 3 + y', 1),
+        'new line': source[:line_end + 1] + '    print_int(x);\n' + source[line_end + 1:],
+    }
+
+    tokens = tokenize(source)
+    _, full_time = best_of(3, lambda: parse_module(tokens))
+    print(f'{functions} functions, {len(tokens)} tokens')
+    print(f'{"parse_module":<24} {full_time:>7.3f} s')
+
+    for name, edited in edits.items():
+        edited_tokens = tokenize(edited)
+        elapsed = float('inf')
+        for _ in range(3):
+            cache = ParseCache()
+            reparse_module(tokens, cache)
+            elapsed = min(elapsed, best_of(1, lambda: reparse_module(edited_tokens, cache))[1])
+        print(f'{"reparse, " + name:<24} {elapsed:>7.3f} s  ({cache.parsed} parsed, {cache.reused} reused)')
+
+
+if __name__ == '__main__':
+    main()
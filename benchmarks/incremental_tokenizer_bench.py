@@ -0,0 +1,49 @@
+"""Single-character edits in a 50k-line file: `retokenize` versus tokenizing the whole buffer again.
+
+Run from the repository root:
+
+    python -m benchmarks.incremental_tokenizer_bench [edits]
+
+Each edit inserts one character at a random offset, then the next edit
+removes it again, like typing and backspacing in an editor.
+"""
+import random
+import sys
+
+from benchmarks.common import program_template, timed
+from src.compiler.incremental_tokenizer import retokenize
+from src.compiler.tokenizer import tokenize
+
+lines = 50_000
+
+
+def main() -> None:
+    edits = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    items = lines // program_template.count('\n') + 1
+    source = ''.join(program_template.format(n=n) for n in range(items))
+    tokens = tokenize(source)
+    print(f'{source.count(chr(10))} lines, {len(source)} bytes, {len(tokens)} tokens')
+
+    rand = random.Random(0)
+    full_time = 0.0
+    incremental_time = 0.0
+    for i in range(edits):
+        if i % 2 == 0:
+            offset = rand.randrange(len(source))
+            edit = (offset, 0, rand.choice(' x1\n'))
+        else:
+            edit = (offset, 1, '')
+        new_source = source[:edit[0]] + edit[2] + source[edit[0] + edit[1]:]
+        expected, elapsed = timed(lambda: tokenize(new_source))
+        full_time += elapsed
+        (source, tokens), elapsed = timed(lambda: retokenize(source, tokens, *edit))
+        incremental_time += elapsed
+        assert tokens == expected
+
+    print(f'{"mode":<12} {"ms/edit":>9}')
+    print(f'{"tokenize":<12} {full_time / edits * 1000:>9.2f}')
+    print(f'{"retokenize":<12} {incremental_time / edits * 1000:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Typechecking again after a one-function edit, against checking the whole module again.
+
+Run from the repository root:
+
+    python -m benchmarks.incremental_type_checker_bench [functions]
+
+The edit changes a constant in the middle function. 'reparsed' checks the
+module from `reparse_module`, which keeps the unchanged definitions;
+'parsed' checks a module parsed from scratch, whose types are copied from
+the cache. Parsing is not included.
+"""
+import sys
+
+from benchmarks.common import best_of, generate_functions
+from src.compiler import ast
+from src.compiler.incremental_parser import ParseCache, reparse_module
+from src.compiler.incremental_type_checker import TypeCache, retypecheck_module
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+
+
+def typecheck_module(module: ast.Module) -> None:
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+    typecheck(module.expr, symtab)
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    source = generate_functions(functions)
+    middle = source.index(f'fun f_{functions // 2}(')
+    edited = source[:middle] + source[middle:].replace('x * 2 + y', 'x * 3 + y', 1)
+
+    module = parse_module(tokenize(edited))
+    _, full_time = best_of(3, lambda: typecheck_module(module))
+    print(f'{functions} functions')
+    print(f'{"typecheck":<20} {full_time:>7.3f} s')
+
+    for name in ['reparsed', 'parsed']:
+        elapsed = float('inf')
+        for _ in range(3):
+            parse_cache = ParseCache()
+            cache = TypeCache()
+            retypecheck_module(reparse_module(tokenize(source), parse_cache), SymTab(locals={}, parent=None), cache)
+            if name == 'reparsed':
+                module = reparse_module(tokenize(edited), parse_cache)
+            else:
+                module = parse_module(tokenize(edited))
+            elapsed = min(elapsed, best_of(1, lambda: retypecheck_module(module, SymTab(locals={}, parent=None),
+                                                                          cache))[1])
+        print(f'{"retypecheck, " + name:<20} {elapsed:>7.3f} s  ({cache.checked} checked, {cache.reused} reused)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Time and peak memory of the tree-walking interpreter on long loops and deep recursion.
+
+Run from the repository root:
+
+    python -m benchmarks.interpreter_loop_bench [max_iterations]
+
+Peak memory stays flat as loops get longer, and grows with the recursion
+depth only by the frames on the explicit stack of `walk`.
+"""
+import sys
+import tracemalloc
+
+from benchmarks.common import MB, timed
+from src.compiler.interpreter import interpret_module
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import tokenize
+
+loop = '{{ var i = 0; var s = 0; while true do {{ i = i + 1; if i > {n} then break; if i == 3 then continue; s = s + i }}; s }}'
+recursion = 'fun down(n: Int): Int {{ if n == 0 then {{ return 0 }} else {{ return down(n - 1) + 1 }} }}\ndown({n})'
+
+
+def main() -> None:
+    max_iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f'{"program":<10} {"n":>9} {"seconds":>9} {"peak MB":>8}')
+    for name, template, largest in [('loop', loop, max_iterations), ('recursion', recursion, max_iterations // 10)]:
+        n = 1000
+        while n <= largest:
+            module = parse_module(tokenize(template.format(n=n)))
+            _, elapsed = timed(lambda: interpret_module(SymTab(locals=interpreter_locals, parent=None), module))
+            tracemalloc.start()  # in a second run, which tracing slows down
+            interpret_module(SymTab(locals=interpreter_locals, parent=None), module)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f'{name:<10} {n:>9} {elapsed:>9.3f} {peak / MB:>8.2f}')
+            n *= 10
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""Throughput of `tokenize_numpy` next to the regex `tokenize`.
+
+Run from the repository root (requires NumPy):
+
+    python -m benchmarks.numpy_tokenizer_bench [size_in_mb ...]
+"""
+import sys
+
+from benchmarks.common import MB, best_of, generate_source
+from src.compiler.numpy_tokenizer import tokenize_numpy
+from src.compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10]
+    print(f'{"engine":<16} {"input":>7} {"tokens":>10} {"seconds":>9} {"tokens/s":>10}')
+    for size in sizes:
+        source = generate_source(size * MB)
+        for name, engine in [('tokenize', tokenize), ('tokenize_numpy', tokenize_numpy)]:
+            tokens, elapsed = best_of(3, lambda: engine(source))
+            print(f'{name:<16} {size:>5}MB {len(tokens):>10} {elapsed:>9.2f} {len(tokens) / elapsed:>10.0f}')
+            del tokens
+
+
+if __name__ == '__main__':
+    main()
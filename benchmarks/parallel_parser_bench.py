@@ -0,0 +1,34 @@
+"""Scaling of `parse_parallel` from 1 to 4 worker processes on a module of many functions.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_parser_bench [functions]
+
+One worker is the plain `parse_module` call. The figures include starting the
+process pool, sending the tokens out and the function ASTs back.
+"""
+import os
+import sys
+
+from benchmarks.common import generate_functions, timed
+from src.compiler.parallel_parser import function_spans, parse_parallel
+from src.compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    tokens = tokenize(generate_functions(functions))
+    _, scan_time = timed(lambda: function_spans(tokens))
+    print(f'{functions} functions, {len(tokens)} tokens, {os.cpu_count()} CPUs; span scan {scan_time:.3f} s')
+    print(f'{"workers":>7} {"seconds":>9} {"speedup":>8}')
+    baseline = 0.0
+    for workers in range(1, 5):
+        module, elapsed = timed(lambda: parse_parallel(tokens, workers))
+        assert len(module.functions) == functions
+        baseline = baseline or elapsed
+        print(f'{workers:>7} {elapsed:>9.2f} {baseline / elapsed:>8.2f}')
+        del module
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""Scaling of `tokenize_parallel` from 1 to 8 worker processes.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_tokenizer_bench [size_in_mb]
+
+One worker is the plain `tokenize` call. The figures include starting the
+process pool and shipping the chunks and token lists between processes.
+"""
+import os
+import sys
+
+from benchmarks.common import MB, generate_source, timed
+from src.compiler.parallel_tokenizer import tokenize_parallel
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    source = generate_source(size * MB)
+    print(f'{size} MB input, {os.cpu_count()} CPUs')
+    print(f'{"workers":>7} {"seconds":>9} {"tokens/s":>12} {"speedup":>8}')
+    baseline = 0.0
+    for workers in range(1, 9):
+        tokens, elapsed = timed(lambda: tokenize_parallel(source, workers))
+        baseline = baseline or elapsed
+        print(f'{workers:>7} {elapsed:>9.2f} {len(tokens) / elapsed:>12.0f} {baseline / elapsed:>8.2f}')
+        del tokens
+
+
+if __name__ == '__main__':
+    main()
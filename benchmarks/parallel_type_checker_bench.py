@@ -0,0 +1,37 @@
+"""Scaling of `typecheck_parallel` from 1 to 4 worker processes on a module of many functions.
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_type_checker_bench [functions]
+
+One worker checks the bodies in this process. The figures include starting the
+process pool and, with annotations, copying the node types back; each run
+typechecks a freshly parsed module.
+"""
+import os
+import sys
+
+from benchmarks.common import generate_functions, timed
+from src.compiler.parallel_type_checker import typecheck_parallel
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    tokens = tokenize(generate_functions(functions))
+    print(f'{functions} functions, {os.cpu_count()} CPUs')
+    print(f'{"workers":>7} {"annotate":>9} {"seconds":>9} {"speedup":>8}')
+    baseline = 0.0
+    for workers in range(1, 5):
+        for annotate in [True, False] if workers > 1 else [True]:
+            module = parse_module(tokens)
+            _, elapsed = timed(lambda: typecheck_parallel(module, SymTab(locals={}, parent=None), workers, annotate))
+            baseline = baseline or elapsed
+            print(f'{workers:>7} {str(annotate):>9} {elapsed:>9.2f} {baseline / elapsed:>8.2f}')
+            del module
+
+
+if __name__ == '__main__':
+    main()
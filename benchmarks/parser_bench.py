@@ -0,0 +1,56 @@
+"""Expression parsing throughput on deep and wide expressions.
+
+Run from the repository root:
+
+    python -m benchmarks.parser_bench [operators]
+
+'wide' is one long expression mixing every binary operator; 'deep' is a block
+of statements that each nest parentheses 40 levels deep; 'literals' is a block
+of bare literals, where each one used to descend through every precedence level.
+"""
+import random
+import sys
+
+from benchmarks.common import best_of
+from src.compiler.parser import parser
+from src.compiler.tokenizer import tokenize
+
+operators = ['or', 'and', '==', '!=', '<', '>', '<=', '>=', '+', '-', '*', '/']
+
+
+def wide_expression(count: int) -> str:
+    rand = random.Random(0)
+    parts = ['a']
+    for _ in range(count):
+        parts.append(rand.choice(operators))
+        parts.append(rand.choice(['a', 'b', '1', '2']))
+    return ' '.join(parts)
+
+
+def deep_expression(count: int, depth: int = 40) -> str:
+    rand = random.Random(0)
+    statements = []
+    for _ in range(count // depth):
+        expression = 'a'
+        for _ in range(depth):
+            expression = f'({expression} {rand.choice(operators)} 1)'
+        statements.append(expression)
+    return '{\n' + ';\n'.join(statements) + '\n}'
+
+
+def literals(count: int) -> str:
+    return '{\n' + ';\n'.join(str(i) for i in range(count)) + '\n}'
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for name, source in [('wide', wide_expression(count)), ('deep', deep_expression(count)),
+                         ('literals', literals(count))]:
+        tokens = tokenize(source)
+        _, elapsed = best_of(3, lambda: parser(tokens))
+        print(f'{name:<10} {len(tokens):>8} tokens {elapsed:>7.3f} s {len(tokens) / elapsed:>12.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    main()
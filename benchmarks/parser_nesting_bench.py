@@ -0,0 +1,51 @@
+"""Time of the parser against nesting depth.
+
+Run from the repository root:
+
+    python -m benchmarks.parser_nesting_bench [max_depth]
+
+The time per nesting level should stay flat as the depth doubles. The last
+line gives the time of a flat program of about the same size in tokens.
+"""
+import sys
+from typing import Callable
+
+from benchmarks.common import best_of
+from src.compiler.parser import parser
+from src.compiler.tokenizer import tokenize
+
+nestings: dict[str, Callable[[int], str]] = {
+    'parens': lambda depth: '(' * depth + '1' + ')' * depth,
+    'blocks': lambda depth: '{' * depth + '1' + '}' * depth,
+    'if': lambda depth: 'if a then ' * depth + '1',
+    'while': lambda depth: 'while a do ' * depth + '1',
+}
+
+flat_statement = '''{
+    var a = (1 + b) * c;
+    while a > 0 and not done do {
+        a = a - 1;
+        if a == 3 then print_int(f(a, -a)) else { break }
+    }
+}
+'''
+
+
+def main() -> None:
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    for name, generate in nestings.items():
+        depth = max_depth // 8
+        while depth <= max_depth:
+            tokens = tokenize(generate(depth))
+            _, elapsed = best_of(3, lambda: parser(tokens))
+            print(f'{name:<8} depth {depth:>8} {elapsed:>7.3f} s {elapsed / depth * 1e6:>7.2f} us/level')
+            depth *= 2
+
+    tokens = tokenize('{' + flat_statement * 10_000 + '}')
+    _, elapsed = best_of(3, lambda: parser(tokens))
+    print(f'flat     {len(tokens)} tokens {elapsed:>7.3f} s {elapsed / len(tokens) * 1e6:>7.2f} us/token')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Peak memory of compiling programs with more and more functions.
+
+Run from the repository root:
+
+    python -m benchmarks.pipeline_memory_bench [max_functions]
+
+Each compilation runs in a fresh process that reports its peak RSS. 'stream'
+is `compile_stream` over `tokenize_file`; 'whole' materializes all tokens,
+the whole module, all IR and one assembly string before writing it out.
+"""
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.common import generate_functions
+from src.compiler.assembly_generator import generate_assembly
+from src.compiler.ir import Instruction
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parse_module
+from src.compiler.pipeline import compile_stream
+from src.compiler.stream_tokenizer import tokenize_file
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+
+
+def compile_whole(path: str, output: str) -> None:
+    with open(path) as f:
+        module = parse_module(tokenize(f.read()))
+    symtab = SymTab(locals={}, parent=None)
+    instructions: dict[str, list[Instruction]] = {}
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+        instructions.update(generate_ir(root_types, fun))
+    assert module.expr is not None
+    typecheck(module.expr, symtab)
+    instructions.update(generate_ir(root_types, module.expr))
+    with open(output, 'w') as f:
+        f.write(generate_assembly(instructions))
+
+
+def compile_streaming(path: str, output: str) -> None:
+    with open(output, 'w') as f:
+        for piece in compile_stream(tokenize_file(path)):
+            f.write(piece)
+            f.write('\n')
+
+
+def child(mode: str, path: str) -> None:
+    (compile_streaming if mode == 'stream' else compile_whole)(path, os.devnull)
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+def main() -> None:
+    if len(sys.argv) == 4 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3])
+        return
+    max_functions = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        functions = max_functions // 8
+        while functions <= max_functions:
+            path = os.path.join(workdir, 'program.txt')
+            with open(path, 'w') as f:
+                f.write(generate_functions(functions))
+            size = os.path.getsize(path) / 1024
+            peaks = {}
+            for mode in ('stream', 'whole'):
+                result = subprocess.run([sys.executable, '-m', 'benchmarks.pipeline_memory_bench', '--child', mode, path],
+                                        capture_output=True, text=True, check=True)
+                peaks[mode] = int(result.stdout) / 1024
+            print(f'{functions:>6} functions {size:>8.0f} KB: '
+                  f'stream {peaks["stream"]:>7.1f} MB, whole {peaks["whole"]:>7.1f} MB peak RSS')
+            functions *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Loop-heavy programs through the interpreter, and the type checker and IR generator on them.
+
+Run from the repository root:
+
+    python -m benchmarks.resolver_bench [iterations]
+
+The loop body reads variables declared one to three blocks further out,
+which is where looking names up through scopes costs the most. Parsing,
+and with it resolving, is not included.
+"""
+import sys
+
+from benchmarks.common import best_of
+from src.compiler.interpreter import interpret
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab, interpreter_locals, root_types
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck
+
+loop_template = '''{{
+    var total = 0;
+    var i = 0;
+    var step = 1;
+    while i < {iterations} do {{
+        var j = 0;
+        while j < 10 do {{
+            {{
+                var square = j * j;
+                if square > i then total = total + square - i else total = total + i - square;
+                j = j + step;
+            }}
+        }};
+        i = i + step;
+    }};
+    total
+}}'''
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+    root = parser(tokenize(loop_template.format(iterations=iterations)))
+    typecheck(root, SymTab(locals={}, parent=None))
+
+    runs = {
+        'interpret': lambda: interpret(SymTab(locals=interpreter_locals, parent=None), root),
+        'typecheck': lambda: [typecheck(root, SymTab(locals={}, parent=None)) for _ in range(1000)],
+        'generate_ir': lambda: [generate_ir(root_types, root) for _ in range(1000)],
+    }
+    print(f'{iterations} x 10 iterations; typecheck and generate_ir 1000 times')
+    for name, run in runs.items():
+        _, elapsed = best_of(3, run)
+        print(f'{name:<12} {elapsed:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
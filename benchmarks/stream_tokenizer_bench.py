@@ -0,0 +1,52 @@
+"""Time and peak traced memory of the streaming tokenizers as the input grows.
+
+Run from the repository root:
+
+    python -m benchmarks.stream_tokenizer_bench [size_in_mb ...]
+
+Tokens are counted and dropped as they are produced. Linear time shows as
+a constant tokens/s figure; bounded memory as a constant peak. Pages of the
+memory map are owned by the OS page cache and not traced.
+"""
+import os
+import sys
+import tempfile
+import tracemalloc
+from typing import Callable, Iterator
+
+from benchmarks.common import MB, generate_pieces, timed
+from src.compiler.stream_tokenizer import tokenize_file, tokenize_reader
+from src.compiler.tokenizer import Token
+
+
+def measure(tokens: Callable[[], Iterator[Token]]) -> tuple[int, float, int]:
+    count, elapsed = timed(lambda: sum(1 for _ in tokens()))
+    # Tracing slows the tokenizer down several times, so peak memory is taken in a second run
+    tracemalloc.start()
+    sum(1 for _ in tokens())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    print(f'{"mode":<8} {"input":>7} {"tokens":>10} {"seconds":>9} {"tokens/s":>10} {"peak bytes":>11}')
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'program.txt')
+        for size in sizes:
+            with open(path, 'w') as f:
+                for piece in generate_pieces(size * MB, MB):
+                    f.write(piece)
+
+            def read_chunks() -> Iterator[Token]:
+                with open(path, 'rb') as reader:
+                    yield from tokenize_reader(reader)
+
+            for mode, tokens in [('mmap', lambda: tokenize_file(path)), ('chunked', read_chunks)]:
+                count, elapsed, peak = measure(tokens)
+                print(f'{mode:<8} {size:>5}MB {count:>10} {elapsed:>9.2f} {count / elapsed:>10.0f} {peak:>11}')
+
+
+if __name__ == '__main__':
+    main()
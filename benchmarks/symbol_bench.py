@@ -0,0 +1,55 @@
+"""Compile time of identifier-heavy programs, phase by phase.
+
+Run from the repository root:
+
+    python -m benchmarks.symbol_bench [statements]
+
+The program is one block of variable declarations whose initializers
+reference earlier variables, so most tokens and AST nodes are identifiers.
+Symbol IDs are used up to the type checker; generate_ir and
+generate_assembly work on IRVar names.
+"""
+import random
+import sys
+
+from benchmarks.common import best_of
+from src.compiler.assembly_generator import generate_assembly
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck
+
+
+def generate_program(statements: int) -> str:
+    rand = random.Random(0)
+    lines = ['{', '    var variable_0 = 1;', '    var variable_1 = 2;']
+    for i in range(2, statements):
+        a, b, c, d = (f'variable_{rand.randrange(i)}' for _ in range(4))
+        lines.append(f'    var variable_{i} = {a} + {b} * {c} - {d};')
+    lines.append('    variable_0')
+    lines.append('}')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    source = generate_program(statements)
+
+    symtab = SymTab(locals={}, parent=None)
+    tokens, tokenize_time = best_of(3, lambda: tokenize(source))
+    node, parse_time = best_of(3, lambda: parser(tokens, symbols=symtab.symbols))
+    _, typecheck_time = best_of(3, lambda: typecheck(node, symtab))
+    instructions, ir_time = best_of(3, lambda: generate_ir(dict(root_types), node))
+    _, asm_time = best_of(3, lambda: generate_assembly(instructions))
+
+    print(f'{statements} statements, {len(tokens)} tokens')
+    for phase, elapsed in [('tokenize', tokenize_time), ('parse', parse_time), ('typecheck', typecheck_time),
+                           ('generate_ir', ir_time), ('generate_assembly', asm_time)]:
+        print(f'{phase:<18} {elapsed:>7.3f} s')
+    total = tokenize_time + parse_time + typecheck_time + ir_time + asm_time
+    print(f'{"total":<18} {total:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Memory per token of `tokenize` (list of Token dataclasses) versus `tokenize_compact` (TokenStream).
+
+Run from the repository root:
+
+    python -m benchmarks.token_memory_bench [size_in_mb]
+
+The source string itself is allocated before tracing starts, so the
+figures cover only the token representation.
+"""
+import gc
+import sys
+import tracemalloc
+from typing import Callable, Sized
+
+from benchmarks.common import MB, generate_source, timed
+from src.compiler.token_stream import tokenize_compact
+from src.compiler.tokenizer import tokenize
+
+
+def measure(f: Callable[[], Sized]) -> tuple[int, int, float]:
+    gc.collect()
+    tracemalloc.start()
+    result, elapsed = timed(f)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(result), size, elapsed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    source = generate_source(size * MB)
+    print(f'{"representation":<16} {"tokens":>10} {"bytes":>12} {"bytes/token":>12} {"seconds":>9}')
+    for name, f in [('list[Token]', lambda: tokenize(source)), ('TokenStream', lambda: tokenize_compact(source))]:
+        count, total, elapsed = measure(f)
+        print(f'{name:<16} {count:>10} {total:>12} {total / count:>12.1f} {elapsed:>9.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""Tokenizer throughput on synthetic programs of 1 MB, 10 MB and 100 MB.
+
+Run from the repository root:
+
+    python -m benchmarks.tokenizer_bench [size_in_mb ...]
+
+Inputs larger than 10 MB are fed to `tokenize` in 10 MB pieces so that
+the token lists fit in memory; the reported figure is total tokens over
+total tokenizing time.
+"""
+import sys
+
+from benchmarks.common import MB, generate_pieces, timed
+from src.compiler.tokenizer import tokenize
+
+piece_size = 10 * MB
+
+
+def run(size: int) -> tuple[int, float]:
+    tokens = 0
+    elapsed = 0.0
+    for piece in generate_pieces(size, piece_size):
+        result, seconds = timed(lambda: tokenize(piece))
+        tokens += len(result)
+        elapsed += seconds
+        del result
+    return tokens, elapsed
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1, 10, 100]
+    print(f'{"input":>8} {"tokens":>12} {"seconds":>9} {"tokens/s":>12}')
+    for size in sizes:
+        tokens, elapsed = run(size * MB)
+        print(f'{size:>6}MB {tokens:>12} {elapsed:>9.2f} {tokens / elapsed:>12.0f}')
+
+
+if __name__ == '__main__':
+    main()
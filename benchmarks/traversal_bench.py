@@ -0,0 +1,40 @@
+"""Time of the type checker, the interpreter and the IR generator on one large block.
+
+Run from the repository root:
+
+    python -m benchmarks.traversal_bench [statements]
+
+The program is the random arithmetic of `ast_memory_bench`, with a loop at
+the end. Parsing is not included.
+"""
+import sys
+
+from benchmarks.ast_memory_bench import generate_program
+from benchmarks.common import best_of
+from src.compiler.interpreter import interpret
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab, interpreter_locals, root_types
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck
+
+
+def main() -> None:
+    statements = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    source = generate_program(statements)[:-1] + '    var i = 0;\n    while i < 500 do i = i + 1;\n}'
+    root = parser(tokenize(source))
+    typecheck(root, SymTab(locals={}, parent=None))
+
+    passes = {
+        'typecheck': lambda: typecheck(root, SymTab(locals={}, parent=None)),
+        'interpret': lambda: interpret(SymTab(locals=interpreter_locals, parent=None), root),
+        'generate_ir': lambda: generate_ir(root_types, root),
+    }
+    print(f'{statements} statements')
+    for name, run in passes.items():
+        _, elapsed = best_of(5, run)
+        print(f'{name:<12} {elapsed:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
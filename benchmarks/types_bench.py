@@ -0,0 +1,43 @@
+"""Time of the type checker on call-heavy programs.
+
+Run from the repository root:
+
+    python -m benchmarks.types_bench [functions]
+
+Every function of `generate_functions` calls the one before it, and the
+top-level block calls each of them and some builtins that are not in the
+symbol table. Parsing is not included.
+"""
+import sys
+
+from benchmarks.common import best_of, generate_functions
+from src.compiler import ast
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+
+
+def call_heavy(functions: int) -> str:
+    calls = ''.join(f'    print_int(f_{n}(i, f_{n}(1, 2)) + f_{n}(2, i));\n' for n in range(functions))
+    return generate_functions(functions)[:-len(f'print_int(f_{functions - 1}(1, 2));\n')] + \
+        f'{{\n    var i = 0;\n{calls}}}\n'
+
+
+def typecheck_module(module: ast.Module) -> None:
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+    typecheck(module.expr, symtab)
+
+
+def main() -> None:
+    functions = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    module = parse_module(tokenize(call_heavy(functions)))
+    _, elapsed = best_of(5, lambda: typecheck_module(module))
+    print(f'{functions} functions, {functions * 4} calls')
+    print(f'{"typecheck":<12} {elapsed:>7.3f} s')
+
+
+if __name__ == '__main__':
+    main()
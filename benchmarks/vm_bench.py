@@ -0,0 +1,99 @@
+"""The bytecode VM against the interpreters and a native executable.
+
+Run from the repository root:
+
+    python -m benchmarks.vm_bench [iterations]
+
+'closures' is the closure-compiling interpreter, and includes compiling the
+tree. 'vm' and 'run_ir' include compiling their code from the IR,
+'native' is the run of the executable alone, and 'assemble' is the time to
+build it. Parsing, typechecking and lowering to IR are not included.
+"""
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Callable
+
+from benchmarks.common import best_of, timed
+from src.compiler.assembler import assemble
+from src.compiler.closure_interpreter import interpret_closures_module
+from src.compiler.interpreter import interpret_module
+from src.compiler.ir import Instruction
+from src.compiler.ir_interpreter import run_ir
+from src.compiler.parser import parse_module
+from src.compiler.pipeline import compile_stream, lower_stream
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import tokenize
+from src.compiler.vm import compile_bytecode, run_bytecode
+
+loop = '{{ var i = 0; var s = 0; while i < {n} do {{ i = i + 1; s = s + i * 2 - 1 }}; print_int(s) }}'
+
+# Counts the primes below the bound by trial division; without 'and', which the native backend lacks
+primes = '''{{
+    var count = 0;
+    var n = 2;
+    while n < {n} do {{
+        var d = 2;
+        var prime = true;
+        while d * d <= n do {{
+            if n - n / d * d == 0 then {{ prime = false; d = n }};
+            d = d + 1;
+        }};
+        if prime then count = count + 1;
+        n = n + 1;
+    }};
+    print_int(count)
+}}'''
+
+fib = 'fun fib(n: Int): Int {{ if n < 2 then {{ return n }} else {{ return fib(n - 1) + fib(n - 2) }} }}\n' \
+      'print_int(fib({n}))'
+
+
+def captured(f: Callable[[], object]) -> Callable[[], str]:
+    def run() -> str:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            f()
+        return out.getvalue()
+    return run
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    programs = {
+        'loop': loop.format(n=iterations),
+        'primes': primes.format(n=iterations // 5),
+        'fib': fib.format(n=max(iterations.bit_length() + 3, 2)),
+    }
+    print(f'{"program":<8} {"tree walk":>10} {"closures":>10} {"run_ir":>10} {"vm":>10} {"native":>10} '
+          f'{"assemble":>10}')
+    with tempfile.TemporaryDirectory() as workdir:
+        executable = os.path.join(workdir, 'program')
+        for name, source in programs.items():
+            module = parse_module(tokenize(source))
+            expected, walk_time = best_of(3, captured(
+                lambda: interpret_module(SymTab(locals=interpreter_locals, parent=None), module)))
+            output, closure_time = best_of(3, captured(
+                lambda: interpret_closures_module(SymTab(locals=interpreter_locals, parent=None), module)))
+            assert output == expected
+
+            instructions: dict[str, list[Instruction]] = {}
+            for irs in lower_stream(tokenize(source)):
+                instructions.update(irs)
+            output, ir_time = best_of(3, captured(lambda: run_ir(instructions)))
+            assert output == expected
+            output, vm_time = best_of(3, captured(lambda: run_bytecode(compile_bytecode(instructions))))
+            assert output == expected
+
+            _, assemble_time = timed(lambda: assemble(compile_stream(tokenize(source)), executable))
+            proc, native_time = best_of(3, lambda: subprocess.run([executable], capture_output=True, text=True))
+            assert proc.stdout == expected
+            print(f'{name:<8} {walk_time:>9.3f}s {closure_time:>9.3f}s {ir_time:>9.3f}s {vm_time:>9.3f}s '
+                  f'{native_time:>9.3f}s {assemble_time:>9.3f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,37 @@
 import sys
+from typing import Iterator
 
 from src.compiler.assembler import assemble
-from src.compiler.assembly_generator import generate_assembly
-from src.compiler.interpreter import interpret
-from src.compiler.ir_generator import generate_ir
-from src.compiler.parser import parser
-from src.compiler.symTab import SymTab, root_types
-from src.compiler.tokenizer import tokenize
-from src.compiler.type_checker import typecheck
+from src.compiler.closure_interpreter import interpret_closures_module
+from src.compiler.interpreter import interpret_module
+from src.compiler.ir import Instruction
+from src.compiler.parser import parse_module
+from src.compiler.pipeline import compile_stream, lower_stream
+from src.compiler.stream_tokenizer import tokenize_file, tokenize_reader
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import Token, tokenize
+from src.compiler.vm import compile_bytecode, run_bytecode
 
 # TODO(student): add more commands as needed
 usage = f"""
 Usage: {sys.argv[0]} <command> [source_code_file]
 
 Command 'interpret':
-    Runs the interpreter on source code.
+    Runs the interpreter on source code, with its functions, and prints the value of the program.
+
+Command 'interpret-closures':
+    Like 'interpret', with the program compiled into Python closures first; faster on loops,
+    but deep recursion is limited by the Python stack.
+
+Command 'vm':
+    Compiles the program to bytecode and runs it on the VM, without assembling it.
+
+Command 'tokens':
+    Streams the tokens of the source code, one per line, without reading it into memory.
+
+Commands 'ir', 'asm' and 'compile':
+    Compile the program one function at a time, printing the IR or Assembly code
+    or building the executable 'compile_program'.
 
 Common arguments:
     source_code_file        Optional. Defaults to standard input if missing.
@@ -44,39 +61,45 @@ def main() -> int:
         else:
             return sys.stdin.read()
 
+    def read_tokens() -> Iterator[Token]:
+        if input_file is not None:
+            return tokenize_file(input_file)
+        else:
+            return tokenize_reader(sys.stdin.buffer)
+
     if command is None:
         print(f"Error: command argument missing\n\n{usage}", file=sys.stderr)
         return 1
 
-    if command == 'interpret':
+    if command == 'tokens':
+        for token in read_tokens():
+            location = token.source_location
+            print(f'{location.line}:{location.column} {token.type} {token.text}')
+    elif command == 'interpret':
         source_code = read_source_code()
-        result = interpret(parser(tokenize(source_code)))
+        symtab = SymTab(locals=interpreter_locals, parent=None)
+        result = interpret_module(symtab, parse_module(tokenize(source_code, symtab.symbols)))
         print(result)
-    elif command == 'ir':
+    elif command == 'interpret-closures':
         source_code = read_source_code()
-        tokens = tokenize(source_code)
-        ast_nodes = parser(tokens)
-        typecheck(ast_nodes, SymTab(locals={}, parent=None))
-        irs = generate_ir(root_types, ast_nodes)
-        for func, irs in irs.items():
-            print(f"function : {func}:")
-            print("\n".join([str(ins) for ins in irs]))
+        symtab = SymTab(locals=interpreter_locals, parent=None)
+        result = interpret_closures_module(symtab, parse_module(tokenize(source_code, symtab.symbols)))
+        print(result)
+    elif command == 'ir':
+        for irs in lower_stream(read_tokens()):
+            for func, instructions in irs.items():
+                print(f"function : {func}:")
+                print("\n".join([str(ins) for ins in instructions]))
+    elif command == 'vm':
+        functions: dict[str, list[Instruction]] = {}
+        for irs in lower_stream(read_tokens()):
+            functions.update(irs)
+        run_bytecode(compile_bytecode(functions))
     elif command == 'asm':
-        source_code = read_source_code()
-        tokens = tokenize(source_code)
-        ast_nodes = parser(tokens)
-        typecheck(ast_nodes, SymTab(locals={}, parent=None))
-        irs = generate_ir(root_types, ast_nodes)
-        asm_code = generate_assembly(irs)
-        print(asm_code)
+        for asm_code in compile_stream(read_tokens()):
+            print(asm_code)
     elif command == 'compile':
-        source_code = read_source_code()
-        tokens = tokenize(source_code)
-        ast_nodes = parser(tokens)
-        typecheck(ast_nodes, SymTab(locals={}, parent=None))
-        irs = generate_ir(root_types, ast_nodes)
-        asm_code = generate_assembly(irs)
-        assemble(asm_code, 'compile_program')
+        assemble(compile_stream(read_tokens()), 'compile_program')
     else:
         print(f"Error: unknown command: {command}\n\n{usage}", file=sys.stderr)
         return 1
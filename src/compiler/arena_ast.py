@@ -0,0 +1,321 @@
+from array import array
+from dataclasses import dataclass, field, fields
+from typing import Any
+
+from src.compiler import ast
+from src.compiler.symbols import SymbolTable
+from src.compiler.tokenizer import SourceLocation
+from src.compiler.traversal import DispatchTable, Visit, walk
+from src.compiler.types import Type, BasicType, Unit
+
+# Node kinds; a literal's kind says how to read its value
+(LITERAL_INT, LITERAL_BOOL, LITERAL_UNIT, IDENTIFIER, TREE_OPERATOR, IF_EXPRESSION, UNARY_OP, VAR_DECLARATION,
+ WHILE_LOOP, BLOCK, FUNCTION_CALL, BREAK_CONTINUE, RETURN, OPERATORS, FUNCTION_DEF, MODULE) = range(16)
+
+
+@dataclass
+class AstArena:
+    """All nodes of a tree as rows of flat columns, addressed by index.
+
+    Children are indices in `first`, `second` and `third`, -1 for none. A list of children is an
+    offset into `lists`, where its length is followed by its items. `texts` indexes `names` for
+    identifiers and `strings` for operators and other text, and `values` holds literal values and
+    `signatures` indices. The slot of a variable is in `third`.
+
+    The columns are arrays, so an arena pickles and unpickles as a few buffers rather than one
+    object per node. It is still read into memory when loaded; it is not memory-mapped."""
+    kinds: array = field(default_factory=lambda: array('B'))
+    first: array = field(default_factory=lambda: array('i'))
+    second: array = field(default_factory=lambda: array('i'))
+    third: array = field(default_factory=lambda: array('i'))
+    values: array = field(default_factory=lambda: array('q'))
+    texts: array = field(default_factory=lambda: array('i'))
+    lines: array = field(default_factory=lambda: array('i'))
+    columns: array = field(default_factory=lambda: array('i'))
+    types: list[Type] = field(default_factory=list)
+    lists: array = field(default_factory=lambda: array('i'))
+    strings: list[str] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    symbols: array = field(default_factory=lambda: array('i'))  # the ID of each name, see `bind_symbols`
+    signatures: list[tuple[list[BasicType], BasicType]] = field(default_factory=list)
+    root: int = -1
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {**self.__dict__, 'symbols': array('i')}  # the IDs only mean something to the table that gave them
+
+
+def bind_symbols(arena: AstArena, symbols: SymbolTable) -> None:
+    """Gives the names in `arena` their IDs in `symbols`, which the views of its identifiers return as
+    `symbol`. An arena is bound again after it is unpickled, to the table of the process that loaded it."""
+    arena.symbols = array('i', [symbols.intern(name) for name in arena.names])
+
+
+def pack(root: ast.Expression | ast.FunctionDef | ast.Module) -> AstArena:
+    """Copies a tree into a new arena, children before their parents, on an explicit stack."""
+    arena = AstArena()
+    string_ids: dict[str, int] = {}
+    name_ids: dict[str, int] = {}
+
+    def string(text: str) -> int:
+        if text not in string_ids:
+            string_ids[text] = len(arena.strings)
+            arena.strings.append(text)
+        return string_ids[text]
+
+    def name(text: str) -> int:
+        if text not in name_ids:
+            name_ids[text] = len(arena.names)
+            arena.names.append(text)
+        return name_ids[text]
+
+    def add(kind: int, location: SourceLocation | None, first: int = -1, second: int = -1, third: int = -1,
+            value: int = 0, text: int = -1, type: Type = Unit) -> int:
+        arena.kinds.append(kind)
+        arena.first.append(first)
+        arena.second.append(second)
+        arena.third.append(third)
+        arena.values.append(value)
+        arena.texts.append(text)
+        arena.lines.append(0 if location is None else location.line)
+        arena.columns.append(0 if location is None else location.column)
+        arena.types.append(type)
+        return len(arena.kinds) - 1
+
+    def add_list(nodes: list[Any]) -> Visit:
+        indices = []
+        for node in nodes:
+            indices.append((yield node, None))
+        offset = len(arena.lists)
+        arena.lists.append(len(indices))
+        arena.lists.extend(indices)
+        return offset
+
+    def add_optional(node: ast.Expression | None) -> Visit:
+        return -1 if node is None else (yield node, None)
+
+    def pack_literal(node: ast.Literal, _: None) -> int:
+        if isinstance(node.value, bool):
+            return add(LITERAL_BOOL, node.location, value=int(node.value), type=node.type)
+        elif isinstance(node.value, int):
+            return add(LITERAL_INT, node.location, value=node.value, type=node.type)
+        elif node.value is None:
+            return add(LITERAL_UNIT, node.location, type=node.type)
+        else:
+            raise Exception(f'Unsupported literal: {type(node.value)} at {node.location.__str__()}')
+
+    def pack_tree_operator(node: ast.TreeOperator, _: None) -> Visit:
+        left = yield node.left, None
+        right = yield node.right, None
+        return add(TREE_OPERATOR, node.location, left, right, text=string(node.operator), type=node.type)
+
+    def pack_if_expression(node: ast.IfExpression, _: None) -> Visit:
+        condition = yield node.condition, None
+        then_clause = yield node.then_clause, None
+        else_clause = yield from add_optional(node.else_clause)
+        return add(IF_EXPRESSION, node.location, condition, then_clause, else_clause, type=node.type)
+
+    def pack_unary_op(node: ast.UnaryOp, _: None) -> Visit:
+        expr = yield node.expr, None
+        return add(UNARY_OP, node.location, expr, text=string(node.operator), type=node.type)
+
+    def pack_var_declaration(node: ast.VarDeclaration, _: None) -> Visit:
+        var_type = -1 if node.var_type is None else string('Int' if isinstance(node.var_type, ast.TypeInt)
+                                                           else 'Bool')
+        var_name = yield node.name, None
+        value = yield node.value, None
+        return add(VAR_DECLARATION, node.location, var_name, value, text=var_type, type=node.type)
+
+    def pack_while_loop(node: ast.WhileLoop, _: None) -> Visit:
+        condition = yield node.condition, None
+        do_action = yield node.do_action, None
+        return add(WHILE_LOOP, node.location, condition, do_action, type=node.type)
+
+    def pack_block(node: ast.Block, _: None) -> Visit:
+        statements = yield from add_list(node.statements)
+        return add(BLOCK, node.location, statements, type=node.type)
+
+    def pack_function_call(node: ast.FunctionCall, _: None) -> Visit:
+        call = yield node.call, None
+        args = yield from add_list(node.args)
+        return add(FUNCTION_CALL, node.location, call, args, type=node.type)
+
+    def pack_return(node: ast.Return, _: None) -> Visit:
+        value = yield from add_optional(node.value)
+        return add(RETURN, node.location, value, type=node.type)
+
+    def pack_function_def(node: ast.FunctionDef, _: None) -> Visit:
+        fun_name = yield node.name, None
+        body = yield node.body, None
+        params = yield from add_list(node.params)
+        arena.signatures.append((node.param_types, node.return_type))
+        return add(FUNCTION_DEF, node.location, fun_name, body, params, value=len(arena.signatures) - 1)
+
+    def pack_module(node: ast.Module, _: None) -> Visit:
+        functions = yield from add_list(node.functions)
+        expr = yield from add_optional(node.expr)
+        return add(MODULE, None, functions, expr)
+
+    handlers = DispatchTable({
+        ast.Literal: pack_literal,
+        ast.Identifier: lambda node, _: add(IDENTIFIER, node.location, third=node.slot, text=name(node.name),
+                                            type=node.type),
+        ast.TreeOperator: pack_tree_operator,
+        ast.IfExpression: pack_if_expression,
+        ast.UnaryOp: pack_unary_op,
+        ast.VarDeclaration: pack_var_declaration,
+        ast.WhileLoop: pack_while_loop,
+        ast.Block: pack_block,
+        ast.FunctionCall: pack_function_call,
+        ast.BreakContinue: lambda node, _: add(BREAK_CONTINUE, node.location, text=string(node.name),
+                                               type=node.type),
+        ast.Return: pack_return,
+        ast.Operators: lambda node, _: add(OPERATORS, node.location, text=string(node.operation), type=node.type),
+        ast.FunctionDef: pack_function_def,
+        ast.Module: pack_module,
+    })
+
+    arena.root = walk(handlers, root, None)
+    return arena
+
+
+def get_location(node: Any) -> SourceLocation:
+    return SourceLocation(node.arena.lines[node.index], node.arena.columns[node.index])
+
+
+def get_type(node: Any) -> Type:
+    return node.arena.types[node.index]
+
+
+def set_type(node: Any, type: Type) -> None:
+    node.arena.types[node.index] = type
+
+
+def get_text(node: Any) -> str:
+    return node.arena.strings[node.arena.texts[node.index]]
+
+
+def get_value(node: Any) -> int:
+    return node.arena.values[node.index]
+
+
+def get_name(node: Any) -> str:
+    return node.arena.names[node.arena.texts[node.index]]
+
+
+def get_symbol(node: Any) -> int:
+    arena = node.arena
+    if len(arena.symbols) != len(arena.names):
+        raise Exception(f'The names of the arena have no symbols, see bind_symbols')
+    return arena.symbols[arena.texts[node.index]]  # type: ignore[no-any-return]
+
+
+def get_literal(node: Any) -> int | bool | None:
+    kind = node.arena.kinds[node.index]
+    if kind == LITERAL_UNIT:
+        return None
+    value = node.arena.values[node.index]
+    return bool(value) if kind == LITERAL_BOOL else value
+
+
+def get_var_type(node: Any) -> ast.AstType | None:
+    text = node.arena.texts[node.index]
+    if text < 0:
+        return None
+    name = node.arena.strings[text]
+    return ast.TypeInt(name) if name == 'Int' else ast.TypeBool(name)
+
+
+def child(column: str) -> property:
+    def get(node: Any) -> Any:
+        index = getattr(node.arena, column)[node.index]
+        return None if index < 0 else view(node.arena, index)
+    return property(get)
+
+
+def child_list(column: str) -> property:
+    def get(node: Any) -> list[Any]:
+        arena = node.arena
+        offset = getattr(arena, column)[node.index]
+        return [view(arena, index) for index in arena.lists[offset + 1:offset + 1 + arena.lists[offset]]]
+    return property(get)
+
+
+def view_class(base: type, **properties: property) -> type[Any]:
+    """Subclasses an AST class with properties that read a row of an arena instead of slots."""
+    namespace: dict[str, Any] = {'__slots__': ('arena', 'index'), **properties}
+    if base is not ast.Module:
+        namespace['location'] = property(get_location)
+    if issubclass(base, ast.Expression):
+        namespace['type'] = property(get_type, set_type)
+    return type(f'{base.__name__}View', (base,), namespace)
+
+
+literal_view = view_class(ast.Literal, value=property(get_literal))
+view_classes = {
+    LITERAL_INT: literal_view,
+    LITERAL_BOOL: literal_view,
+    LITERAL_UNIT: literal_view,
+    IDENTIFIER: view_class(ast.Identifier, name=property(get_name), symbol=property(get_symbol),
+                           slot=property(lambda node: node.arena.third[node.index])),
+    TREE_OPERATOR: view_class(ast.TreeOperator, left=child('first'), right=child('second'),
+                              operator=property(get_text)),
+    IF_EXPRESSION: view_class(ast.IfExpression, condition=child('first'), then_clause=child('second'),
+                              else_clause=child('third')),
+    UNARY_OP: view_class(ast.UnaryOp, expr=child('first'), operator=property(get_text)),
+    VAR_DECLARATION: view_class(ast.VarDeclaration, name=child('first'), value=child('second'),
+                                var_type=property(get_var_type)),
+    WHILE_LOOP: view_class(ast.WhileLoop, condition=child('first'), do_action=child('second')),
+    BLOCK: view_class(ast.Block, statements=child_list('first')),
+    FUNCTION_CALL: view_class(ast.FunctionCall, call=child('first'), args=child_list('second')),
+    BREAK_CONTINUE: view_class(ast.BreakContinue, name=property(get_text)),
+    RETURN: view_class(ast.Return, value=child('first')),
+    OPERATORS: view_class(ast.Operators, operation=property(get_text)),
+    FUNCTION_DEF: view_class(ast.FunctionDef, name=child('first'), body=child('second'), params=child_list('third'),
+                             param_types=property(lambda node: node.arena.signatures[get_value(node)][0]),
+                             return_type=property(lambda node: node.arena.signatures[get_value(node)][1])),
+    MODULE: view_class(ast.Module, functions=child_list('first'), expr=child('second')),
+}
+
+
+def view(arena: AstArena, index: int | None = None) -> Any:
+    """Returns node `index` of `arena`, the root by default, as an instance of its AST class.
+
+    A view only holds the arena and the index, and its fields are read from the arena on each access,
+    so `typecheck` and `generate_ir` walk an arena as they walk a tree. Reading a child makes a new
+    view, so a walk still allocates an object per node it visits, but none of them is kept. Assigning
+    `type` writes to the arena; other fields are read-only."""
+    if index is None:
+        index = arena.root
+    cls = view_classes[arena.kinds[index]]
+    node = object.__new__(cls)
+    node.arena = arena
+    node.index = index
+    return node
+
+
+def unpack_view(node: Any, _: None) -> Visit:
+    base = type(node).__mro__[1]
+    values = {}
+    for base_field in fields(base):
+        value = getattr(node, base_field.name)
+        if isinstance(value, list):
+            items = []
+            for item in value:
+                items.append((yield item, None) if hasattr(item, 'arena') else item)
+            value = items
+        elif hasattr(value, 'arena'):
+            value = yield value, None
+        values[base_field.name] = value
+    return base(**values)
+
+
+unpack_handlers = DispatchTable({ast.Expression: unpack_view, ast.FunctionDef: unpack_view, ast.Module: unpack_view})
+
+
+def unpack(node: Any) -> Any:
+    """Copies a view, and the views and lists it holds, back into plain AST nodes."""
+    if isinstance(node, list):
+        return [unpack(item) for item in node]
+    if not hasattr(node, 'arena'):
+        return node
+    return walk(unpack_handlers, node, None)
@@ -2,18 +2,18 @@ import subprocess
 import tempfile
 from contextlib import nullcontext
 from os import path
-from typing import ContextManager
+from typing import ContextManager, Iterable
 
 
 def assemble(
-        assembly_code: str,
+        assembly_code: str | Iterable[str],
         output_file: str,
         workdir: str | None = None,
         tempfile_basename: str = 'program',
         # Give ['c'] to link the C standard library
         extra_libraries: list[str] = [],
 ) -> None:
-    """Invokes 'as' and 'ld' to generate an executable from Assembly code."""
+    """Invokes 'as' and 'ld' to generate an executable from Assembly code, given whole or in pieces."""
     cm: ContextManager[str] = nullcontext(
         workdir) if workdir is not None else tempfile.TemporaryDirectory(prefix='compiler_')  # type: ignore
     with cm as workdir:
@@ -24,7 +24,12 @@ def assemble(
         with open(stdlib_asm, 'w') as f:
             f.write(stdlib_asm_code)
         with open(program_asm, 'w') as f:
-            f.write(assembly_code)
+            if isinstance(assembly_code, str):
+                f.write(assembly_code)
+            else:
+                for piece in assembly_code:
+                    f.write(piece)
+                    f.write('\n')
         subprocess.run(['as', '-g', '-o' +
                         stdlib_obj, stdlib_asm], check=True)
         subprocess.run(['as', '-g', '-o' +
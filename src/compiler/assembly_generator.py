@@ -4,7 +4,8 @@ from src.compiler import ir
 from src.compiler.intrinsics import all_intrinsics, IntrinsicArgs
 
 
-def generate_assembly(instructions: dict[str, list[ir.Instruction]]) -> str:
+def generate_assembly(instructions: dict[str, list[ir.Instruction]], header: bool = True) -> str:
+    """Returns the Assembly code of the given functions, preceded by the declarations if `header` is set."""
     code_lines = []
 
     def emit(line: str) -> None:
@@ -13,11 +14,12 @@ def generate_assembly(instructions: dict[str, list[ir.Instruction]]) -> str:
     locals = Locals(get_all_ir_variables(instructions))
     param_registers = ['%rdi', '%rsi', '%rdx', '%rcx', '%r8', '%r9']
 
-    emit('.global main')
-    emit('.type main @function')
-    emit('.extern print_int')
-    emit('.extern print_bool')
-    emit('.extern read_int')
+    if header:
+        emit('.global main')
+        emit('.type main @function')
+        emit('.extern print_int')
+        emit('.extern print_bool')
+        emit('.extern read_int')
 
     # emit('.section .text')
     # emit('main:')
@@ -43,6 +45,9 @@ def generate_assembly(instructions: dict[str, list[ir.Instruction]]) -> str:
                     # TODO  ^ dosent workt if ins.value is too large
                 case ir.LoadBoolConst():
                     emit(f'movq ${int(ins.value)}, {locals.get_ref(ins.dest)}')
+                case ir.LoadIntParam() | ir.LoadBoolParam():
+                    emit(f'movq {param_registers[param_count]}, {locals.get_ref(ins.dest)}')
+                    param_count += 1
                 case ir.Copy():
                     emit(f'movq  {locals.get_ref(ins.source)}, %rax')
                     emit(f'movq %rax, {locals.get_ref(ins.dest)}')
@@ -4,88 +4,95 @@ from src.compiler.tokenizer import SourceLocation
 from src.compiler.types import Type, Unit, BasicType
 
 
-@dataclass
+@dataclass(slots=True)
 class AstType:
     """Abstract base class for AST tree type node"""
 
 
-@dataclass
+@dataclass(slots=True)
 class TypeInt(AstType):
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TypeBool(AstType):
     type: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression:
     """Abstract base class for AST tree nodes"""
     location: SourceLocation
     type: Type = field(kw_only=True, default=Unit)  # use for type checking
 
 
-@dataclass
+@dataclass(slots=True)
 class Identifier(Expression):
     name: str
+    symbol: int = field(kw_only=True, default=-1, compare=False, repr=False)  # given by the parser
+    slot: int = field(kw_only=True, default=-1, compare=False, repr=False)  # in the frame of a local; -1 for a global
 
+    @property
+    def key(self) -> int | str:
+        """The symbol ID, or the name if the parser had no symbol table."""
+        return self.symbol if self.symbol >= 0 else self.name
 
-@dataclass
+
+@dataclass(slots=True)
 class Literal(Expression):
     value: int | bool | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Operators(Expression):
     operation: str
 
 
-@dataclass
+@dataclass(slots=True)
 class TreeOperator(Expression):
     left: Expression
     operator: str
     right: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class IfExpression(Expression):
     condition: Expression
     then_clause: Expression
     else_clause: Expression | None
 
 
-@dataclass
+@dataclass(slots=True)
 class UnaryOp(Expression):
     operator: str
     expr: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class VarDeclaration(Expression):
     name: Identifier
     var_type: AstType | None
     value: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class WhileLoop(Expression):
     condition: Expression
     do_action: Expression
 
 
-@dataclass
+@dataclass(slots=True)
 class Block(Expression):
     statements: list[Expression]
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionCall(Expression):
     call: Identifier
     args: list[Expression]
 
 
-@dataclass
+@dataclass(slots=True)
 class BreakContinue(Expression):
     name: str
 
@@ -96,12 +103,12 @@ class BreakContinue(Expression):
         return self.name == other.name
 
 
-@dataclass
+@dataclass(slots=True)
 class Return(Expression):
     value: Expression | None
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionDef():
     location: SourceLocation
     name: Identifier
@@ -111,7 +118,7 @@ class FunctionDef():
     return_type: BasicType
 
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     "base class for expressions and fun definitions"
     functions: list[FunctionDef]
@@ -0,0 +1,321 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.compiler import ast
+from src.compiler.interpreter import BreakSignal, ContinueSignal, LoopSignal, ReturnSignal, Value
+from src.compiler.symTab import SymTab, find_context, find_top_level_context
+from src.compiler.symbols import builtin_symbols
+from src.compiler.traversal import DispatchTable, Visit, walk
+
+# Runs one node in a frame of local variables by slot
+Code = Callable[[list[Any]], Any]
+
+
+def fail(message: str) -> Code:
+    def run(slots: list[Any]) -> Any:
+        raise Exception(message)
+    return run
+
+
+@dataclass
+class Function:
+    """A function of the program, compiled after the code that calls it."""
+    code: Code = fail('Function is not compiled')
+    size: int = 0  # slots in its frame, the parameters first
+
+
+@dataclass
+class Compiler:
+    globals: SymTab  # scope of the names that are not local
+    builtins: SymTab  # top-level scope of `globals`, with the operators
+    size: int = 0  # slots in the frame
+    functions: dict[int, Function] = field(default_factory=dict)  # by id of the definition
+    queued: list[tuple[ast.FunctionDef, Function]] = field(default_factory=list)  # called, not yet compiled
+
+    def function(self, fun: ast.FunctionDef) -> Function:
+        function = self.functions.get(id(fun))
+        if function is None:
+            function = self.functions[id(fun)] = Function()
+            self.queued.append((fun, function))
+        return function
+
+
+def compile_closures(st: SymTab, node: ast.Expression) -> Callable[[], Value]:
+    """Compiles a resolved expression into nested closures, with operators, builtins, slots and
+    constants looked up once, and returns a function that runs it in a new frame. The functions
+    in `st` that it calls are compiled too, each once.
+
+    Runs like `interpret(st, node)`. Running nests Python calls as deep as the tree and the calls
+    of functions, so deep recursion is bounded by the Python stack."""
+    compiler = Compiler(globals=st, builtins=find_top_level_context(st))
+    code: Code = walk(compile_handlers, node, compiler)
+    size = compiler.size
+    while compiler.queued:
+        fun, function = compiler.queued.pop()
+        compiler.size = len(fun.params)
+        function.code = walk(compile_handlers, fun.body, compiler)
+        function.size = compiler.size
+
+    def run() -> Value:
+        try:
+            return code([None] * size)  # type: ignore[no-any-return]
+        except LoopSignal:
+            raise Exception('Break or continue outside of a loop')
+        except ReturnSignal:
+            raise Exception('Return outside of a function')
+    return run
+
+
+def compile_module(st: SymTab, module: ast.Module) -> Callable[[], Value]:
+    """Compiles the top-level expressions of a resolved module, which can call its functions."""
+    functions = SymTab(locals={fun.name.key: fun for fun in module.functions}, parent=st)
+    return (lambda: None) if module.expr is None else compile_closures(functions, module.expr)
+
+
+def interpret_closures(st: SymTab, node: ast.Expression) -> Value:
+    return compile_closures(st, node)()
+
+
+def interpret_closures_module(st: SymTab, module: ast.Module) -> Value:
+    """Runs a module like `interpret_module`, compiled into closures first."""
+    return compile_module(st, module)()
+
+
+def local_slot(node: ast.Expression) -> int:
+    return node.slot if isinstance(node, ast.Identifier) else -1
+
+
+def compile_literal(node: ast.Literal, compiler: Compiler) -> Code:
+    value = node.value
+    return lambda slots: value
+
+
+def compile_identifier(node: ast.Identifier, compiler: Compiler) -> Code:
+    slot = node.slot
+    if slot >= 0:
+        compiler.size = max(compiler.size, slot + 1)
+        return lambda slots: slots[slot]
+    symbol = compiler.globals.key(node.key)
+    context = find_context(compiler.globals, symbol)
+    if context is None:
+        return fail(f'Undefined variable name {node.name} at : {node.location.__str__()}')
+    scope = context.locals
+    return lambda slots: scope[symbol]
+
+
+def compile_assignment(node: ast.TreeOperator, compiler: Compiler) -> Visit:
+    value = yield node.right, compiler
+    if not isinstance(node.left, ast.Identifier):
+        message = 'Only identifiers allowed as variable names.'
+    elif node.left.slot >= 0:
+        slot = node.left.slot
+        compiler.size = max(compiler.size, slot + 1)
+
+        def assign_local(slots: list[Any]) -> Any:
+            slots[slot] = result = value(slots)
+            return result
+        return assign_local
+    elif (context := find_context(compiler.globals, symbol := compiler.globals.key(node.left.key))) is not None:
+        scope = context.locals
+
+        def assign_global(slots: list[Any]) -> Any:
+            scope[symbol] = result = value(slots)
+            return result
+        return assign_global
+    else:
+        message = f'Undefined variable name {node.left.name}'
+
+    def assign_fail(slots: list[Any]) -> Any:
+        value(slots)
+        raise Exception(message)
+    return assign_fail
+
+
+def compile_tree_operator(node: ast.TreeOperator, compiler: Compiler) -> Visit:
+    if node.operator == '=':
+        return (yield from compile_assignment(node, compiler))
+    op_symbol = builtin_symbols.get(node.operator, -1)
+    if op_symbol not in compiler.builtins.locals:
+        return lambda slots: None
+    op = compiler.builtins.locals[op_symbol]
+    left = yield node.left, compiler
+    right = yield node.right, compiler
+
+    if not callable(op):
+        message = f'{node.operator} is not a inbuilt function'
+
+        def not_callable(slots: list[Any]) -> Any:
+            left(slots)
+            raise Exception(message)
+        return not_callable
+    elif node.operator == 'and':
+        def run_and(slots: list[Any]) -> Any:
+            a = left(slots)
+            if a is False:
+                return False
+            return op(a, right(slots))
+        return run_and
+    elif node.operator == 'or':
+        def run_or(slots: list[Any]) -> Any:
+            a = left(slots)
+            if a is True:
+                return True
+            return op(a, right(slots))
+        return run_or
+
+    # The common operands, a local variable and a constant, are read in place
+    i = local_slot(node.left)
+    j = local_slot(node.right)
+    if i >= 0 and isinstance(node.right, ast.Literal):
+        constant = node.right.value
+        return lambda slots: op(slots[i], constant)
+    elif i >= 0 and j >= 0:
+        return lambda slots: op(slots[i], slots[j])
+    elif i >= 0:
+        return lambda slots: op(slots[i], right(slots))
+    elif isinstance(node.right, ast.Literal):
+        constant = node.right.value
+        return lambda slots: op(left(slots), constant)
+    return lambda slots: op(left(slots), right(slots))
+
+
+def compile_if_expression(node: ast.IfExpression, compiler: Compiler) -> Visit:
+    condition = yield node.condition, compiler
+    then_clause = yield node.then_clause, compiler
+    if node.else_clause is None:
+        def run_if(slots: list[Any]) -> Any:
+            if condition(slots):
+                return then_clause(slots)
+            return None
+        return run_if
+
+    else_clause = yield node.else_clause, compiler
+
+    def run_if_else(slots: list[Any]) -> Any:
+        if condition(slots):
+            return then_clause(slots)
+        return else_clause(slots)
+    return run_if_else
+
+
+def compile_var_declaration(node: ast.VarDeclaration, compiler: Compiler) -> Visit:
+    value = yield node.value, compiler
+    slot = node.name.slot
+    compiler.size = max(compiler.size, slot + 1)
+
+    def declare(slots: list[Any]) -> Any:
+        slots[slot] = value(slots)
+        return None
+    return declare
+
+
+def compile_block(node: ast.Block, compiler: Compiler) -> Visit:
+    statements: list[Code] = []
+    for statement in node.statements:
+        statements.append((yield statement, compiler))
+    if not statements:
+        return lambda slots: None
+    *init, last = statements
+
+    def run_block(slots: list[Any]) -> Any:
+        for statement in init:
+            statement(slots)
+        return last(slots)
+    return run_block
+
+
+def compile_while_loop(node: ast.WhileLoop, compiler: Compiler) -> Visit:
+    condition = yield node.condition, compiler
+    body = yield node.do_action, compiler
+
+    def run_while(slots: list[Any]) -> Any:
+        while True:
+            cond = condition(slots)
+            if cond is True:
+                try:
+                    body(slots)
+                except BreakSignal:
+                    return None
+                except ContinueSignal:
+                    pass
+            elif cond is False:
+                return None
+            else:
+                raise Exception(f'Failed to evaluate condition')
+    return run_while
+
+
+def compile_function_call(node: ast.FunctionCall, compiler: Compiler) -> Visit:
+    if not isinstance(node.call, ast.Identifier):
+        return fail(f'Function name has to be an Identifier')
+    symbol = compiler.globals.key(node.call.key)
+    context = find_context(compiler.globals, symbol)
+    if context is not None and isinstance(context.locals[symbol], ast.FunctionDef):
+        return (yield from compile_user_call(node, context.locals[symbol], compiler))
+    if symbol not in compiler.builtins.locals:
+        return fail(f'Unknown function call {node.call.name}')
+    fun = compiler.builtins.locals[symbol]
+    if not callable(fun):
+        return fail(f'{node.location}: {fun} is not a function')
+    args: list[Code] = []
+    for arg in node.args:
+        args.append((yield arg, compiler))
+
+    if len(args) == 1:
+        only = args[0]
+        return lambda slots: fun(only(slots))
+    return lambda slots: fun(*[code(slots) for code in args])
+
+
+def compile_user_call(node: ast.FunctionCall, fun: ast.FunctionDef, compiler: Compiler) -> Visit:
+    name = fun.name.name
+    if len(node.args) != len(fun.params):
+        return fail(f'{node.location}: {name} expects {len(fun.params)} arguments')
+    function = compiler.function(fun)
+    args: list[Code] = []
+    for arg in node.args:
+        args.append((yield arg, compiler))
+
+    def call(slots: list[Any]) -> Any:
+        frame = [arg(slots) for arg in args]  # parameters take the first slots
+        frame.extend([None] * (function.size - len(frame)))
+        try:
+            function.code(frame)
+        except ReturnSignal as signal:
+            return signal.value
+        except LoopSignal:
+            raise Exception(f'Break or continue outside of a loop in {name}')
+        return None
+    return call
+
+
+def compile_break_continue(node: ast.BreakContinue, compiler: Compiler) -> Code:
+    signal = BreakSignal if node.name == 'break' else ContinueSignal
+
+    def run(slots: list[Any]) -> Any:
+        raise signal()
+    return run
+
+
+def compile_return(node: ast.Return, compiler: Compiler) -> Visit:
+    value: Code = lambda slots: None
+    if node.value is not None:
+        value = yield node.value, compiler
+
+    def run_return(slots: list[Any]) -> Any:
+        raise ReturnSignal(value(slots))
+    return run_return
+
+
+compile_handlers = DispatchTable({
+    ast.Literal: compile_literal,
+    ast.Identifier: compile_identifier,
+    ast.TreeOperator: compile_tree_operator,
+    ast.IfExpression: compile_if_expression,
+    ast.VarDeclaration: compile_var_declaration,
+    ast.Block: compile_block,
+    ast.WhileLoop: compile_while_loop,
+    ast.FunctionCall: compile_function_call,
+    ast.BreakContinue: compile_break_continue,
+    ast.Return: compile_return,
+})
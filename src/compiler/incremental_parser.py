@@ -0,0 +1,145 @@
+from dataclasses import dataclass, field
+from typing import Sequence
+
+from src.compiler import ast
+from src.compiler.parallel_parser import function_spans
+from src.compiler.parser import parse_module
+from src.compiler.symbols import SymbolTable
+from src.compiler.tokenizer import Token, SourceLocation
+from src.compiler.traversal import DispatchTable, Visit, gc_paused, walk
+
+# Texts, lines relative to the first token, and columns of a function's tokens.
+# The text of a token determines its type, so equal keys parse to equal ASTs up to a line shift.
+SpanKey = tuple[tuple[str, ...], tuple[int, ...], tuple[int, ...]]
+
+
+@dataclass
+class ParseCache:
+    functions: dict[SpanKey, ast.FunctionDef] = field(default_factory=dict)  # at the lines of the last parse
+    symbols: SymbolTable | None = None  # of every parse, which share definitions; see `parser`
+    reused: int = 0  # functions reused by the last parse
+    parsed: int = 0  # functions parsed by the last parse
+
+
+def span_key(tokens: Sequence[Token]) -> SpanKey:
+    first_line = tokens[0].source_location.line
+    return (tuple(token.text for token in tokens),
+            tuple(token.source_location.line - first_line for token in tokens),
+            tuple(token.source_location.column for token in tokens))
+
+
+def moved(location: SourceLocation, lines: int) -> SourceLocation:
+    return SourceLocation(location.line + lines, location.column)
+
+
+# Each handler copies a node and the nodes below it with their locations `lines` lines further down
+def move_tree_operator(node: ast.TreeOperator, lines: int) -> Visit:
+    left = yield node.left, lines
+    right = yield node.right, lines
+    return ast.TreeOperator(moved(node.location, lines), left, node.operator, right, type=node.type)
+
+
+def move_if_expression(node: ast.IfExpression, lines: int) -> Visit:
+    condition = yield node.condition, lines
+    then_clause = yield node.then_clause, lines
+    else_clause = None if node.else_clause is None else (yield node.else_clause, lines)
+    return ast.IfExpression(moved(node.location, lines), condition, then_clause, else_clause, type=node.type)
+
+
+def move_unary_op(node: ast.UnaryOp, lines: int) -> Visit:
+    expr = yield node.expr, lines
+    return ast.UnaryOp(moved(node.location, lines), node.operator, expr, type=node.type)
+
+
+def move_var_declaration(node: ast.VarDeclaration, lines: int) -> Visit:
+    name = yield node.name, lines
+    value = yield node.value, lines
+    return ast.VarDeclaration(moved(node.location, lines), name, node.var_type, value, type=node.type)
+
+
+def move_while_loop(node: ast.WhileLoop, lines: int) -> Visit:
+    condition = yield node.condition, lines
+    do_action = yield node.do_action, lines
+    return ast.WhileLoop(moved(node.location, lines), condition, do_action, type=node.type)
+
+
+def move_block(node: ast.Block, lines: int) -> Visit:
+    statements = []
+    for statement in node.statements:
+        statements.append((yield statement, lines))
+    return ast.Block(moved(node.location, lines), statements, type=node.type)
+
+
+def move_function_call(node: ast.FunctionCall, lines: int) -> Visit:
+    call = yield node.call, lines
+    args = []
+    for arg in node.args:
+        args.append((yield arg, lines))
+    return ast.FunctionCall(moved(node.location, lines), call, args, type=node.type)
+
+
+def move_return(node: ast.Return, lines: int) -> Visit:
+    value = None if node.value is None else (yield node.value, lines)
+    return ast.Return(moved(node.location, lines), value, type=node.type)
+
+
+def move_function_def(node: ast.FunctionDef, lines: int) -> Visit:
+    name = yield node.name, lines
+    params = []
+    for param in node.params:
+        params.append((yield param, lines))
+    body = yield node.body, lines
+    return ast.FunctionDef(moved(node.location, lines), name, params, node.param_types, body, node.return_type)
+
+
+move_handlers = DispatchTable({
+    ast.Literal: lambda node, lines: ast.Literal(moved(node.location, lines), node.value, type=node.type),
+    ast.Identifier: lambda node, lines: ast.Identifier(moved(node.location, lines), node.name, type=node.type,
+                                                       symbol=node.symbol, slot=node.slot),
+    ast.Operators: lambda node, lines: ast.Operators(moved(node.location, lines), node.operation, type=node.type),
+    ast.BreakContinue: lambda node, lines: ast.BreakContinue(moved(node.location, lines), node.name,
+                                                             type=node.type),
+    ast.TreeOperator: move_tree_operator,
+    ast.IfExpression: move_if_expression,
+    ast.UnaryOp: move_unary_op,
+    ast.VarDeclaration: move_var_declaration,
+    ast.WhileLoop: move_while_loop,
+    ast.Block: move_block,
+    ast.FunctionCall: move_function_call,
+    ast.Return: move_return,
+    ast.FunctionDef: move_function_def,
+})
+
+
+def reparse_module(tokens: Sequence[Token], cache: ParseCache) -> ast.Module:
+    """Parses like `parse_module`, reusing the `FunctionDef`s in `cache` for function spans whose
+    tokens are unchanged since the last call, and leaves the functions of this parse in `cache`.
+
+    A reused definition is the cached object if it is still at the same lines, and otherwise a copy
+    of it at the new lines; the trees and tokens of earlier parses are never changed."""
+    functions: list[ast.FunctionDef] = []
+    cached: dict[SpanKey, ast.FunctionDef] = {}
+    rest: list[Token] = []
+    previous_end = 0
+    cache.reused = cache.parsed = 0
+    for start, end in function_spans(tokens):
+        rest.extend(tokens[previous_end:start])
+        previous_end = end
+        span = tokens[start:end]
+        key = span_key(span)
+        fun = cache.functions.pop(key, None)  # each cached definition is reused at most once
+        if fun is None:
+            fun = parse_module(span, symbols=cache.symbols).functions[0]
+            cache.parsed += 1
+        else:
+            lines = span[0].source_location.line - fun.location.line
+            if lines:
+                with gc_paused():
+                    fun = walk(move_handlers, fun, lines)
+            cache.reused += 1
+        cached[key] = fun
+        functions.append(fun)
+    rest.extend(tokens[previous_end:])
+
+    cache.functions = cached
+    return ast.Module(functions=functions, expr=parse_module(rest, symbols=cache.symbols).expr)
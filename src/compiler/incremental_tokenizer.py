@@ -0,0 +1,100 @@
+from bisect import bisect_left
+
+from src.compiler.tokenizer import Token, SourceLocation, token_rex, word_types
+
+
+def token_position(token: Token) -> tuple[int, int]:
+    return token.source_location.line, token.source_location.column
+
+
+def offset_position(source_code: str, offset: int) -> tuple[int, int]:
+    """Returns the (line, column) of an offset."""
+    line = source_code.count('\n', 0, offset) + 1
+    return line, offset - (source_code.rfind('\n', 0, offset) + 1) + 1
+
+
+def position_offset(source_code: str, position: tuple[int, int], near: int, near_line: int) -> int:
+    """Returns the offset of a (line, column) at or above the line `near_line` that contains offset `near`."""
+    line, column = position
+    line_start = source_code.rfind('\n', 0, near) + 1
+    for _ in range(near_line - line):
+        line_start = source_code.rfind('\n', 0, line_start - 1) + 1
+    return line_start + column - 1
+
+
+def retokenize(source_code: str, tokens: list[Token], offset: int, removed: int,
+               inserted: str) -> tuple[str, list[Token]]:
+    """Applies an edit to `source_code` and updates `tokens` in place to match `tokenize` of the result.
+
+    Lexing restarts at the token before the edit, which is never inside a comment, and stops as
+    soon as a token lines up with an unchanged token of the old stream. The source locations of the
+    tokens after that point are patched in place, so `tokens` and the locations it holds describe
+    the new source afterwards. Returns the new source and `tokens`."""
+    new_source = source_code[:offset] + inserted + source_code[offset + removed:]
+    edit_position = offset_position(source_code, offset)
+    old_end_line, old_end_column = offset_position(source_code, offset + removed)
+    new_end = offset + len(inserted)
+    new_end_line, new_end_column = offset_position(new_source, new_end)
+    line_delta = new_end_line - old_end_line
+    column_delta = new_end_column - old_end_column
+
+    def new_position(token: Token) -> tuple[int, int]:
+        line, column = token_position(token)
+        if line == old_end_line:
+            return new_end_line, column + column_delta
+        return line + line_delta, column
+
+    # Restart at the last token that starts before the edit; it may merge with the inserted text
+    restart = max(bisect_left(tokens, edit_position, key=token_position) - 1, 0)
+    if restart < len(tokens) and token_position(tokens[restart]) < edit_position:
+        line_num, column = token_position(tokens[restart])
+        position = position_offset(source_code, (line_num, column), offset, edit_position[0])
+        line_start = position - column + 1
+    else:
+        line_num, position, line_start = 1, 0, 0
+
+    # Old tokens that start after the edit, in order, are the candidates to resynchronize with
+    old = bisect_left(tokens, (old_end_line, old_end_column), key=token_position)
+    relexed: list[Token] = []
+    synchronized = False
+    for match in token_rex.finditer(new_source, position):
+        kind = match.lastgroup
+        text = match.group()
+        start = match.start()
+        if kind == 'whitespace' or kind == 'comment':
+            newlines = text.count('\n')
+            if newlines:
+                line_num += newlines
+                line_start = start + text.rindex('\n') + 1
+            continue
+        if kind == 'error':
+            raise Exception(
+                f'Tokenization failed at line {line_num}, column {start - line_start + 1}: '
+                f'near {new_source[start:(start + 10)]}')
+        token_type = word_types.get(text, 'identifier') if kind == 'word' else kind
+        column = start - line_start + 1
+        if start >= new_end:
+            while old < len(tokens) and new_position(tokens[old]) < (line_num, column):
+                old += 1
+            if (old < len(tokens) and new_position(tokens[old]) == (line_num, column)
+                    and tokens[old].type == token_type and tokens[old].text == text):
+                synchronized = True
+                break
+        relexed.append(Token(type=token_type, text=text,  # type: ignore
+                             source_location=SourceLocation(line=line_num, column=column)))
+
+    if not synchronized:
+        tokens[restart:] = relexed
+        return new_source, tokens
+
+    tokens[restart:old] = relexed
+    for i in range(restart + len(relexed), len(tokens)):
+        location = tokens[i].source_location
+        if location.line == old_end_line:
+            location.line = new_end_line
+            location.column += column_delta
+        elif line_delta == 0:
+            break
+        else:
+            location.line += line_delta
+    return new_source, tokens
@@ -0,0 +1,83 @@
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.compiler import ast
+from src.compiler.symTab import SymTab
+from src.compiler.traversal import DispatchTable, preorder
+from src.compiler.type_checker import declare_function, typecheck, typecheck_body
+from src.compiler.types import Type, Unit
+
+# What the type checker reads from one node besides its children, and how many children it has
+node_labels = DispatchTable({
+    ast.Literal: lambda node, _: (ast.Literal, type(node.value), node.value),
+    ast.Identifier: lambda node, _: (ast.Identifier, node.name, node.slot),
+    ast.TreeOperator: lambda node, _: (ast.TreeOperator, node.operator),
+    ast.IfExpression: lambda node, _: (ast.IfExpression, node.else_clause is None),
+    ast.UnaryOp: lambda node, _: (ast.UnaryOp, node.operator),
+    ast.VarDeclaration: lambda node, _: (ast.VarDeclaration, type(node.var_type)),
+    ast.WhileLoop: lambda node, _: (ast.WhileLoop,),
+    ast.Block: lambda node, _: (ast.Block, len(node.statements)),
+    ast.FunctionCall: lambda node, _: (ast.FunctionCall, len(node.args)),
+    ast.BreakContinue: lambda node, _: (ast.BreakContinue, node.name),
+    ast.Return: lambda node, _: (ast.Return, node.value is None),
+})
+
+# The signature of a function and the labels of its body in preorder; equal keys typecheck alike
+# as long as the names the body takes from the symtab have the same types
+BodyKey = tuple[Any, ...]
+
+
+@dataclass
+class BodyInfo:
+    key: BodyKey
+    nodes: list[ast.Expression]  # the body in preorder
+    names: tuple[str, ...]  # the names that are not local
+
+
+@dataclass
+class TypeCache:
+    # Each checked body by key: the types its names had, and the types of its nodes in preorder
+    functions: dict[BodyKey, tuple[tuple[Type | None, ...], list[Type]]] = field(default_factory=dict)
+    # The definitions checked by the last call by id, kept so that the ids stay theirs
+    definitions: dict[int, tuple[ast.FunctionDef, BodyInfo]] = field(default_factory=dict)
+    reused: int = 0  # functions not checked again by the last call
+    checked: int = 0  # functions checked by the last call
+
+
+def body_info(fun: ast.FunctionDef) -> BodyInfo:
+    lookup = node_labels.__getitem__
+    nodes = list(preorder(fun.body))
+    key = (tuple(fun.param_types), fun.return_type, tuple([lookup(type(node))(node, None) for node in nodes]))
+    names = tuple(dict.fromkeys(node.name for node in nodes if type(node) is ast.Identifier and node.slot < 0))
+    return BodyInfo(key, nodes, names)
+
+
+def retypecheck_module(module: ast.Module, symtab: SymTab, cache: TypeCache) -> Type:
+    """Typechecks like `typecheck_function` on each function in order and then `typecheck` on the
+    top-level expressions, whose type is returned. A body equal to one checked by the last call,
+    whose names have the same types in `symtab`, is not checked again: its node types are copied
+    from `cache`, or kept if it is the same definition. Leaves the functions of this call in `cache`."""
+    functions: dict[BodyKey, tuple[tuple[Type | None, ...], list[Type]]] = {}
+    definitions: dict[int, tuple[ast.FunctionDef, BodyInfo]] = {}
+    cache.reused = cache.checked = 0
+    for fun in module.functions:
+        declare_function(fun, symtab)
+        known = cache.definitions.get(id(fun))
+        info = known[1] if known is not None and known[0] is fun else body_info(fun)
+        names = tuple(symtab.require(name) for name in info.names)
+        entry = cache.functions.get(info.key)
+        if entry is not None and entry[0] == names:
+            if known is None or known[0] is not fun:
+                for node, type in zip(info.nodes, entry[1]):
+                    node.type = type
+            cache.reused += 1
+        else:
+            typecheck_body(fun, symtab)
+            entry = names, [node.type for node in info.nodes]
+            cache.checked += 1
+        functions[info.key] = entry
+        definitions[id(fun)] = fun, info
+
+    cache.functions = functions
+    cache.definitions = definitions
+    return Unit if module.expr is None else typecheck(module.expr, symtab)
@@ -1,138 +1,204 @@
 from typing import Any
 
 from src.compiler import ast
-from src.compiler.symTab import find_top_level_context, SymTab, find_context
+from src.compiler.resolver import Frame, store
+from src.compiler.symTab import SymTab, find_context
+from src.compiler.symbols import builtin_symbols
+from src.compiler.traversal import DispatchTable, Visit, walk
 
 Value = int | bool | None
 
 
-def interpret(st: SymTab, node: ast.Expression) -> Value:
-    operators = {
-        '+': lambda x, y: x + y,
-        '-': lambda x, y: x - y,
-        '*': lambda x, y: x * y,
-        '/': lambda x, y: x // y,
-        '<': lambda x, y: x < y,
-        # Add more operators as needed
-    }
-
-    top_context = find_top_level_context(st)
-
-    match node:
-        case ast.Literal():
-            return node.value
-
-        case ast.Identifier():
-            context = find_context(st, node.name)
-            if context is not None:
-                return context.locals[node.name]
-            else:
-                raise Exception(f'Undefined variable name {node.name} at : {node.location.__str__()}')
-
-        case ast.TreeOperator():
-            if node.operator == '=':
-                value = interpret(st, node.right)
-                if isinstance(node.left, ast.Identifier):
-                    context = find_context(st, node.left.name)
-                    if context is not None:
-                        context.locals[node.left.name] = value
-                        return value
-                    else:
-                        raise Exception(f'Undefined variable name {node.left.name}')
-
-                else:
-                    raise Exception(f'Only identifiers allowed as variable names.')
-
-            elif node.operator in top_context.locals:
-
-                a: Any = interpret(st, node.left)
-                # if node.operator in operators:
-                #     return operators[node.operator](a, b)
-                # if node.operator == '+':
-                #     return a + b
-                # elif node.operator == '-':
-                #     return a - b
-                # elif node.operator == '*':
-                #     return a * b
-                # elif node.operator == '/':
-                #     return a // b
-                # elif node.operator == '<':
-                #     return a < b
-                # elif node.operator == '>':
-                #     return a > b
-                op = top_context.locals[node.operator]
-
-                if not callable(op):
-                    raise Exception(f'{node.operator} is not a inbuilt function')
-                elif node.op == 'and':  # optimizing 'and & 'or' operation with one arg evaluating
-                    if a is False:
-                        return False
-                elif node.op == 'or':
-                    if a is True:
-                        return True
-                b: Any = interpret(st, node.right)
-
-                return op(a, b)
-
-        case ast.IfExpression():
-            if node.else_clause is not None:
-                if interpret(st, node.condition):
-                    return interpret(st, node.then_clause)
-                else:
-                    return interpret(st, node.else_clause)
-            else:
-                if interpret(st, node.condition):
-                    return interpret(st, node.then_clause)
-                else:
-                    return None
-
-        case ast.VarDeclaration():
-            if not isinstance(node.name, ast.Identifier):
-                raise Exception('Only identifiers allowed as variable names')
-            elif node.name.name in st.locals:
-                raise Exception(f'Variable {node.name.name} already exists.')
-            else:
-                st.locals[node.name.name] = interpret(st, node.value)
-                return None
+class LoopSignal(Exception):
+    """Raised by `break` and `continue` and caught by the innermost loop, through `walk`."""
 
-        case ast.Block():
-            result = None
-            context = SymTab(locals={}, parent=st)
-            for statement in node.statements:
-                result = interpret(context, statement)
 
-            return result
+class BreakSignal(LoopSignal):
+    pass
 
-        case ast.WhileLoop():
-            cond = interpret(st, node.condition)
-            if cond is True:
-                interpret(st, node.do_action)
-                return interpret(st, node)
-            elif cond is False:
-                return None
-            else:
-                raise Exception(
-                    f'Failed to evaluate condition')
-
-        case ast.FunctionCall():
-            if isinstance(node.call, ast.Identifier):
-                name = node.call.name
-                if name in top_context.locals:  # only built in functions supported for now
-                    fun = top_context.locals[name]
-                    if not callable(fun):
-                        raise Exception(
-                            f'{node.location}: {fun} is not a function')
-                    args = []
-                    for arg in node.args:
-                        args.append(interpret(st, arg))
-                    result = fun(*args)
-                    return result
-                else:
-                    raise Exception(
-                        f'Unknown function call {name}')
+
+class ContinueSignal(LoopSignal):
+    pass
+
+
+class ReturnSignal(Exception):
+    """Raised by `return` and caught by the call of the function."""
+    def __init__(self, value: Value) -> None:
+        self.value = value
+
+
+def interpret(st: SymTab, node: ast.Expression) -> Value:
+    """Runs a resolved expression, with `st` as the scope of the names that are not local and its
+    top-level scope holding the builtins.
+
+    Loops and calls of functions in `st` run on the explicit stack of `walk`, so neither the number
+    of iterations nor the depth of recursion is bounded by the Python stack."""
+    try:
+        return walk(interpret_handlers, node, Frame(slots=[], globals=st))  # type: ignore[no-any-return]
+    except LoopSignal:
+        raise Exception('Break or continue outside of a loop')
+    except ReturnSignal:
+        raise Exception('Return outside of a function')
+
+
+def interpret_module(st: SymTab, module: ast.Module) -> Value:
+    """Runs the top-level expressions of a resolved module, which can call its functions."""
+    functions = SymTab(locals={fun.name.key: fun for fun in module.functions}, parent=st)
+    return None if module.expr is None else interpret(functions, module.expr)
+
+
+def interpret_literal(node: ast.Literal, frame: Frame) -> Value:
+    return node.value
+
+
+def interpret_identifier(node: ast.Identifier, frame: Frame) -> Value:
+    if node.slot >= 0:
+        return frame.slots[node.slot]  # type: ignore[no-any-return]
+    symbol = frame.globals.key(node.key)
+    context = find_context(frame.globals, symbol)
+    if context is not None:
+        return context.locals[symbol]  # type: ignore[no-any-return]
+    else:
+        raise Exception(f'Undefined variable name {node.name} at : {node.location.__str__()}')
+
+
+def interpret_tree_operator(node: ast.TreeOperator, frame: Frame) -> Visit:
+    if node.operator == '=':
+        value = yield node.right, frame
+        if isinstance(node.left, ast.Identifier):
+            if node.left.slot >= 0:
+                frame.slots[node.left.slot] = value
+                return value
+            symbol = frame.globals.key(node.left.key)
+            context = find_context(frame.globals, symbol)
+            if context is not None:
+                context.locals[symbol] = value
+                return value
             else:
+                raise Exception(f'Undefined variable name {node.left.name}')
+
+        else:
+            raise Exception(f'Only identifiers allowed as variable names.')
+
+    elif (op_symbol := builtin_symbols.get(node.operator, -1)) in frame.builtins.locals:
+
+        a: Any = yield node.left, frame
+        op = frame.builtins.locals[op_symbol]
+
+        if not callable(op):
+            raise Exception(f'{node.operator} is not a inbuilt function')
+        elif node.operator == 'and':  # optimizing 'and & 'or' operation with one arg evaluating
+            if a is False:
+                return False
+        elif node.operator == 'or':
+            if a is True:
+                return True
+        b: Any = yield node.right, frame
+
+        return op(a, b)
+    return None
+
+
+def interpret_if_expression(node: ast.IfExpression, frame: Frame) -> Visit:
+    if node.else_clause is not None:
+        if (yield node.condition, frame):
+            return (yield node.then_clause, frame)
+        else:
+            return (yield node.else_clause, frame)
+    else:
+        if (yield node.condition, frame):
+            return (yield node.then_clause, frame)
+        else:
+            return None
+
+
+def interpret_var_declaration(node: ast.VarDeclaration, frame: Frame) -> Visit:
+    if not isinstance(node.name, ast.Identifier):
+        raise Exception('Only identifiers allowed as variable names')
+    else:
+        store(frame.slots, node.name.slot, (yield node.value, frame))
+        return None
+
+
+def interpret_block(node: ast.Block, frame: Frame) -> Visit:
+    result = None
+    for statement in node.statements:
+        result = yield statement, frame
+
+    return result
+
+
+def interpret_while_loop(node: ast.WhileLoop, frame: Frame) -> Visit:
+    while True:
+        cond = yield node.condition, frame
+        if cond is True:
+            try:
+                yield node.do_action, frame
+            except BreakSignal:
+                return None
+            except ContinueSignal:
+                pass
+        elif cond is False:
+            return None
+        else:
+            raise Exception(
+                f'Failed to evaluate condition')
+
+
+def interpret_function_call(node: ast.FunctionCall, frame: Frame) -> Visit:
+    if isinstance(node.call, ast.Identifier):
+        name = node.call.name
+        symbol = frame.globals.key(node.call.key)
+        context = find_context(frame.globals, symbol)
+        if context is not None and isinstance(context.locals[symbol], ast.FunctionDef):
+            fun = context.locals[symbol]
+            if len(node.args) != len(fun.params):
+                raise Exception(f'{node.location}: {name} expects {len(fun.params)} arguments')
+            args = []
+            for arg in node.args:
+                args.append((yield arg, frame))
+            try:
+                yield fun.body, frame.call(args)  # parameters take the first slots
+            except ReturnSignal as signal:
+                return signal.value
+            except LoopSignal:
+                raise Exception(f'Break or continue outside of a loop in {name}')
+            return None
+        elif symbol in frame.builtins.locals:
+            fun = frame.builtins.locals[symbol]
+            if not callable(fun):
                 raise Exception(
-                    f'Function name has to be an Identifier')
-
-        case _:
-            raise Exception(f'Unsupported AST node {node}')
+                    f'{node.location}: {fun} is not a function')
+            args = []
+            for arg in node.args:
+                args.append((yield arg, frame))
+            result = fun(*args)
+            return result
+        else:
+            raise Exception(
+                f'Unknown function call {name}')
+    else:
+        raise Exception(
+            f'Function name has to be an Identifier')
+
+
+def interpret_break_continue(node: ast.BreakContinue, frame: Frame) -> Value:
+    raise BreakSignal() if node.name == 'break' else ContinueSignal()
+
+
+def interpret_return(node: ast.Return, frame: Frame) -> Visit:
+    raise ReturnSignal(None if node.value is None else (yield node.value, frame))
+
+
+interpret_handlers = DispatchTable({
+    ast.Literal: interpret_literal,
+    ast.Identifier: interpret_identifier,
+    ast.TreeOperator: interpret_tree_operator,
+    ast.IfExpression: interpret_if_expression,
+    ast.VarDeclaration: interpret_var_declaration,
+    ast.Block: interpret_block,
+    ast.WhileLoop: interpret_while_loop,
+    ast.FunctionCall: interpret_function_call,
+    ast.BreakContinue: interpret_break_continue,
+    ast.Return: interpret_return,
+})
@@ -5,10 +5,18 @@ from typing import Any
 from src.compiler.tokenizer import SourceLocation
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class IRVar:
+    """A variable of the IR, compared and hashed by name. Most are temporaries, which have no symbol
+    ID; a string caches its hash, so an ID would only save the comparison of equal names."""
     name: str
 
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IRVar) and self.name == other.name
+
+    def __hash__(self) -> int:
+        return hash(self.name)
+
     def __repr__(self) -> str:
         return self.name
 
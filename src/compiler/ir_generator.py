@@ -1,12 +1,26 @@
 from src.compiler import ir, ast
 from src.compiler.ir import IRVar, Instruction, Label
 
+from src.compiler.resolver import Frame, store
 from src.compiler.symTab import SymTab
 from src.compiler.tokenizer import SourceLocation
+from src.compiler.traversal import DispatchTable, Visit, walk
+from src.compiler.type_checker import (
+    check_if_condition, check_loop_condition, declare_function, function_call_type, global_type, if_expression_type,
+    return_value_type, set_node_type, tree_operator_type, typecheck_literal, unary_op_type, var_declaration_type)
 from src.compiler.types import Bool, Int, Type, Unit
 
 
-def generate_ir(root_types: dict[IRVar, Type], root_node: ast.Expression) -> dict[str, list[Instruction]]:
+def generate_ir(root_types: dict[IRVar, Type], root_node: ast.Expression | ast.FunctionDef,
+                symtab: SymTab | None = None, module: bool = False) -> dict[str, list[Instruction]]:
+    """Lowers an expression into function 'main', or a function definition into a function of its name.
+
+    'main' prints the value of the expression if it is an Int or a Bool. With `module`, the expression
+    is the block of a module's top-level expressions, and it is the value of the last of them that is
+    printed.
+
+    With `symtab`, the tree is typechecked in the same walk, as `typecheck` or `typecheck_function`
+    would with that symtab; otherwise it must have been typechecked already."""
     var_types: dict[IRVar, Type] = root_types.copy()  # take a local copy
     # 'var_unit' is used when an expression's type is 'Unit'.
     var_unit = IRVar('unit')
@@ -14,8 +28,12 @@ def generate_ir(root_types: dict[IRVar, Type], root_node: ast.Expression) -> dic
 
     next_var_num = 1
     next_lbl_num = 1
-    instructions: dict[str, list[ir.Instruction]] = {'main': []}
+    label_prefix = ''  # keeps the labels of separately lowered functions apart
+    func_name = 'main'  # the function the handlers append to
+    instructions: dict[str, list[ir.Instruction]] = {}
     loop_labels: list[tuple[ir.Label, ir.Label]] = []
+    return_label: Label | None = None
+    return_type: Type | None = None  # of the function, when typechecking
 
     def new_var(type: Type) -> IRVar:
         nonlocal next_var_num
@@ -26,173 +44,265 @@ def generate_ir(root_types: dict[IRVar, Type], root_node: ast.Expression) -> dic
 
     def new_lbl(location: SourceLocation) -> Label:
         nonlocal next_lbl_num
-        label = Label(location, f'L{next_lbl_num}')
+        label = Label(location, f'{label_prefix}L{next_lbl_num}')
         next_lbl_num += 1
         return label
 
-    def visit(st: SymTab, node: ast.Expression, func_name: str) -> IRVar:
-        match node:
-            case ast.Literal():
-                match node.value:
-                    case bool():
-                        var = new_var(Bool)
-                        instructions[func_name].append(ir.LoadBoolConst(node.location, node.value, var))
-                    case int():
-                        var = new_var(Int)
-                        instructions[func_name].append(ir.LoadIntConst(node.location, node.value, var))
-                    case None:
-                        var = var_unit
-                    case _:
-                        raise Exception(f"Unsupported literal: {type(node.value)} at {node.location.__str__()}")
-                return var
-
-            case ast.Identifier():
-                return st.require(node.name)
-
-            case ast.TreeOperator():
-                var_left = visit(st, node.left, func_name)
-
-                var_op = st.require(node.operator)
-                loc = node.location
-                if node.operator in ('and', 'or'):
-                    l_right = new_lbl(loc)
-                    l_skip = new_lbl(loc)
-                    l_end = new_lbl(loc)
-                    if node.operator == 'and':
-                        instructions[func_name].append(ir.CondJump(loc, var_left, l_right, l_skip))
-                    else:
-                        instructions[func_name].append(ir.CondJump(loc, var_left, l_skip, l_right))
-                    instructions[func_name].append(l_right)
-                    var_right = visit(st, node.right, func_name)
-                    result = new_var(Bool)
-                    instructions[func_name].append(ir.Copy(loc, var_right, result))
-                    instructions[func_name].append(ir.Jump(loc, l_end))
-
-                    instructions[func_name].append(l_skip)
-                    if node.operator == 'and':
-                        instructions[func_name].append(ir.LoadBoolConst(loc, False, result))
-                    else:
-                        instructions[func_name].append(ir.LoadBoolConst(loc, True, result))
-                    instructions[func_name].append(ir.Jump(loc, l_end))
-
-                    instructions[func_name].append(l_end)
-
-                var_right = visit(st, node.right, func_name)
-                if node.operator == '=':
-                    if not isinstance(node.left, ast.Identifier):
-                        raise Exception(f'Expected an identifier at {node.location.__str__()}')
-                    instructions[func_name].append(ir.Copy(node.location, var_right, var_left))
-                    return var_right
-                else:
-                    var_result = new_var(node.type)
-                    instructions[func_name].append(ir.Call(
-                        node.location,
-                        func=IRVar(node.operator),
-                        args=[var_left, var_right],
-                        dest=var_result
-                    ))
-                    return var_result
-            case ast.IfExpression():
-                if node.else_clause is None:
-                    l_then = new_lbl(node.location)
-                    l_end = new_lbl(node.location)
-                    var_cond = visit(st, node.condition, func_name)
-                    instructions[func_name].append(ir.CondJump(node.location, var_cond, l_then, l_end))
-                    instructions[func_name].append(l_then)
-                    visit(st, node.true_branch, func_name)
-                    instructions[func_name].append(l_end)
-                    return var_unit
-                else:
-                    lbl_then = new_lbl(node.location)
-                    lbl_else = new_lbl(node.location)
-                    lbl_end = new_lbl(node.location)
-
-                    var_cond = visit(st, node.condition, func_name)
-                    instructions[func_name].append(ir.CondJump(node.location, var_cond, lbl_then, lbl_else))
-                    instructions[func_name].append(lbl_then)
-                    var_result = visit(st, node.then_clause, func_name)
-                    instructions[func_name].append(ir.Jump(node.location, lbl_end))
-
-                    instructions[func_name].append(lbl_else)
-                    var_else_result = visit(st, node.else_clause, func_name)
-                    instructions[func_name].append(ir.Copy(node.location, var_else_result, var_result))
-                    instructions[func_name].append(lbl_end)
-                    return var_result
-            case ast.UnaryOp():
-                var_op = st.require('unary_' + node.operator)
-                var_value = visit(st, node.expr, func_name)
-                if node.operator == 'not':
-                    var_result = new_var(Bool)
-                elif node.operator == '-':
-                    var_result = new_var(Int)
-                else:
-                    raise Exception(f'Invalid unary operator {node.operator}')
-                instructions[func_name].append(ir.Call(node.location, var_op, [var_value], var_result))
-                return var_result
-
-            case ast.VarDeclaration():
-                value = visit(st, node.value, func_name)
-                var = new_var(node.value.type)
-                st.add_local(node.name.name, var)
-                instructions[func_name].append(ir.Copy(node.location, value, var))
-                return var_unit
-
-            case ast.Block():
-                stb = SymTab(locals=root_types, parent=st)
-                for statement in node.statements:
-                    visit(stb, statement, func_name)
-                return var_unit
-
-            case ast.FunctionCall():
-                if node.call is None:
-                    raise Exception(f'Function has no name')
-                f_var = st.require(node.call.name)
-                arg_vars = []
-                for arg in node.args:
-                    arg_var = visit(st, arg, func_name)
-                    arg_vars.append(arg_var)
-                result_var = new_var(Unit)
-                instructions[func_name].append(ir.Call(node.location, f_var, arg_vars, result_var))
-                return result_var
-
-            case ast.WhileLoop():
-                l_start = new_lbl(node.location)
-                l_do_action = new_lbl(node.location)
-                l_end = new_lbl(node.location)
-
-                loop_labels.append((l_start, l_end))
-
-                instructions[func_name].append(l_start)
-                condition = visit(st, node.condition, func_name)
-                instructions[func_name].append(ir.CondJump(node.location, condition, l_do_action, l_end))
-
-                instructions[func_name].append(l_do_action)
-                visit(st, node.do_action, func_name)
-                instructions[func_name].append(ir.Jump(node.location, l_start))
-
-                instructions[func_name].append(l_end)
-                loop_labels.pop()
-
-                return var_unit
-
-            case ast.BreakContinue():
-                if not loop_labels:
-                    raise Exception(f"While loop not available at {node.location.__str__()}")
-
-                l_start, l_end = loop_labels[-1]
-                if node.name == 'break':
-                    instructions[func_name].append(ir.Jump(node.location, l_end))
-                else:
-                    instructions[func_name].append(ir.Jump(node.location, l_start))
-                return var_unit
+    def type_of(node: ast.Expression, var: IRVar) -> Type:
+        """The type of a child that was lowered into `var`, when typechecking."""
+        if isinstance(node, ast.Identifier):  # not stored in the node, see `typecheck_identifier`
+            assert symtab is not None
+            return var_types[var] if node.slot >= 0 else global_type(node, symtab)
+        return node.type
 
+    def visit_literal(node: ast.Literal, frame: Frame) -> IRVar:
+        if symtab is not None:
+            typecheck_literal(node, frame)
+        match node.value:
+            case bool():
+                var = new_var(Bool)
+                instructions[func_name].append(ir.LoadBoolConst(node.location, node.value, var))
+            case int():
+                var = new_var(Int)
+                instructions[func_name].append(ir.LoadIntConst(node.location, node.value, var))
+            case None:
+                var = var_unit
             case _:
-                raise Exception(f"Unsupported AST Node: {node} at {node.location.__str__()}")
+                raise Exception(f"Unsupported literal: {type(node.value)} at {node.location.__str__()}")
+        return var
+
+    def visit_identifier(node: ast.Identifier, frame: Frame) -> IRVar:
+        if node.slot >= 0:
+            return frame.slots[node.slot]  # type: ignore[no-any-return]
+        if symtab is not None:
+            global_type(node, symtab)
+        return frame.globals.require(node.key)  # type: ignore[no-any-return]
+
+    def visit_tree_operator(node: ast.TreeOperator, frame: Frame) -> Visit:
+        var_left = yield node.left, frame
+
+        var_op = frame.globals.require(node.operator)
+        loc = node.location
+        if node.operator in ('and', 'or'):
+            l_right = new_lbl(loc)
+            l_skip = new_lbl(loc)
+            l_end = new_lbl(loc)
+            if node.operator == 'and':
+                instructions[func_name].append(ir.CondJump(loc, var_left, l_right, l_skip))
+            else:
+                instructions[func_name].append(ir.CondJump(loc, var_left, l_skip, l_right))
+            instructions[func_name].append(l_right)
+            var_right = yield node.right, frame
+            result = new_var(Bool)
+            instructions[func_name].append(ir.Copy(loc, var_right, result))
+            instructions[func_name].append(ir.Jump(loc, l_end))
+
+            instructions[func_name].append(l_skip)
+            if node.operator == 'and':
+                instructions[func_name].append(ir.LoadBoolConst(loc, False, result))
+            else:
+                instructions[func_name].append(ir.LoadBoolConst(loc, True, result))
+            instructions[func_name].append(ir.Jump(loc, l_end))
+
+            instructions[func_name].append(l_end)
+
+        var_right = yield node.right, frame
+        if symtab is not None:
+            tree_operator_type(node, type_of(node.left, var_left), type_of(node.right, var_right))
+        if node.operator == '=':
+            if not isinstance(node.left, ast.Identifier):
+                raise Exception(f'Expected an identifier at {node.location.__str__()}')
+            instructions[func_name].append(ir.Copy(node.location, var_right, var_left))
+            return var_right
+        else:
+            var_result = new_var(node.type)
+            instructions[func_name].append(ir.Call(
+                node.location,
+                func=var_op,
+                args=[var_left, var_right],
+                dest=var_result
+            ))
+            return var_result
+
+    def visit_if_expression(node: ast.IfExpression, frame: Frame) -> Visit:
+        if node.else_clause is None:
+            l_then = new_lbl(node.location)
+            l_end = new_lbl(node.location)
+            var_cond = yield node.condition, frame
+            if symtab is not None:
+                check_if_condition(node, type_of(node.condition, var_cond))
+            instructions[func_name].append(ir.CondJump(node.location, var_cond, l_then, l_end))
+            instructions[func_name].append(l_then)
+            var_then = yield node.then_clause, frame
+            if symtab is not None:
+                if_expression_type(node, type_of(node.then_clause, var_then), None)
+            instructions[func_name].append(l_end)
+            return var_unit
+        else:
+            lbl_then = new_lbl(node.location)
+            lbl_else = new_lbl(node.location)
+            lbl_end = new_lbl(node.location)
+
+            var_cond = yield node.condition, frame
+            if symtab is not None:
+                check_if_condition(node, type_of(node.condition, var_cond))
+            instructions[func_name].append(ir.CondJump(node.location, var_cond, lbl_then, lbl_else))
+            instructions[func_name].append(lbl_then)
+            var_result = yield node.then_clause, frame
+            instructions[func_name].append(ir.Jump(node.location, lbl_end))
+
+            instructions[func_name].append(lbl_else)
+            var_else_result = yield node.else_clause, frame
+            if symtab is not None:
+                if_expression_type(node, type_of(node.then_clause, var_result),
+                                   type_of(node.else_clause, var_else_result))
+            instructions[func_name].append(ir.Copy(node.location, var_else_result, var_result))
+            instructions[func_name].append(lbl_end)
+            return var_result
+
+    def visit_unary_op(node: ast.UnaryOp, frame: Frame) -> Visit:
+        var_op = frame.globals.require('unary_' + node.operator)
+        if var_op is None:
+            raise Exception(f'{node.location}: unknown unary operator {node.operator}')
+        var_value = yield node.expr, frame
+        if symtab is not None:
+            unary_op_type(node, type_of(node.expr, var_value))
+        if node.operator == 'not':
+            var_result = new_var(Bool)
+        elif node.operator == '-':
+            var_result = new_var(Int)
+        else:
+            raise Exception(f'Invalid unary operator {node.operator}')
+        instructions[func_name].append(ir.Call(node.location, var_op, [var_value], var_result))
+        return var_result
+
+    def visit_var_declaration(node: ast.VarDeclaration, frame: Frame) -> Visit:
+        value = yield node.value, frame
+        var_type = var_types[value]  # an identifier does not hold its type, see `typecheck_identifier`
+        if symtab is not None:
+            var_type = var_declaration_type(node, type_of(node.value, value))
+        var = new_var(var_type)
+        store(frame.slots, node.name.slot, var)
+        instructions[func_name].append(ir.Copy(node.location, value, var))
+        return var_unit
 
-    root_symtab = SymTab(locals={str: IRVar}, parent=None)
+    def visit_block(node: ast.Block, frame: Frame) -> Visit:
+        for statement in node.statements:
+            yield statement, frame
+        if symtab is not None:
+            set_node_type(node, Unit)
+        return var_unit
+
+    def visit_function_call(node: ast.FunctionCall, frame: Frame) -> Visit:
+        if node.call is None:
+            raise Exception(f'Function has no name')
+        f_var = frame.globals.require(node.call.key)
+        if f_var is None:  # a function defined in the program
+            f_var = IRVar(node.call.name)
+        arg_vars = []
+        for arg in node.args:
+            arg_var = yield arg, frame
+            arg_vars.append(arg_var)
+        if symtab is not None:
+            function_call_type(node, tuple(type_of(arg, var) for arg, var in zip(node.args, arg_vars)), symtab)
+        result_var = new_var(node.type)
+        instructions[func_name].append(ir.Call(node.location, f_var, arg_vars, result_var))
+        return result_var
+
+    def visit_while_loop(node: ast.WhileLoop, frame: Frame) -> Visit:
+        l_start = new_lbl(node.location)
+        l_do_action = new_lbl(node.location)
+        l_end = new_lbl(node.location)
+
+        loop_labels.append((l_start, l_end))
+
+        instructions[func_name].append(l_start)
+        condition = yield node.condition, frame
+        if symtab is not None:
+            check_loop_condition(node, type_of(node.condition, condition))
+        instructions[func_name].append(ir.CondJump(node.location, condition, l_do_action, l_end))
+
+        instructions[func_name].append(l_do_action)
+        yield node.do_action, frame
+        instructions[func_name].append(ir.Jump(node.location, l_start))
+
+        instructions[func_name].append(l_end)
+        loop_labels.pop()
+        if symtab is not None:
+            set_node_type(node, Unit)
+
+        return var_unit
+
+    def visit_break_continue(node: ast.BreakContinue, frame: Frame) -> IRVar:
+        if not loop_labels:
+            raise Exception(f"While loop not available at {node.location.__str__()}")
+
+        l_start, l_end = loop_labels[-1]
+        if node.name == 'break':
+            instructions[func_name].append(ir.Jump(node.location, l_end))
+        else:
+            instructions[func_name].append(ir.Jump(node.location, l_start))
+        if symtab is not None:
+            set_node_type(node, Unit)
+        return var_unit
+
+    def visit_return(node: ast.Return, frame: Frame) -> Visit:
+        if return_label is None:
+            raise Exception(f"Return outside of a function at {node.location.__str__()}")
+        value = var_unit if node.value is None else (yield node.value, frame)
+        if symtab is not None:
+            return_value_type(node, var_types[value] if node.value is None else type_of(node.value, value), return_type)
+        instructions[func_name].append(ir.Return(node.location, value))
+        instructions[func_name].append(ir.Jump(node.location, return_label))
+        return var_unit
+
+    handlers = DispatchTable({
+        ast.Literal: visit_literal,
+        ast.Identifier: visit_identifier,
+        ast.TreeOperator: visit_tree_operator,
+        ast.IfExpression: visit_if_expression,
+        ast.UnaryOp: visit_unary_op,
+        ast.VarDeclaration: visit_var_declaration,
+        ast.Block: visit_block,
+        ast.FunctionCall: visit_function_call,
+        ast.WhileLoop: visit_while_loop,
+        ast.BreakContinue: visit_break_continue,
+        ast.Return: visit_return,
+    })
+
+    root_symtab = SymTab(locals={}, parent=None)
     for v in root_types.keys():
         root_symtab.add_local(v.name, v)
-    res = visit(root_symtab, root_node, 'main')
+
+    if isinstance(root_node, ast.FunctionDef):
+        func_name = root_node.name.name
+        if symtab is not None:
+            declare_function(root_node, symtab)
+            return_type = root_node.return_type
+        instructions[func_name] = []
+        label_prefix = f'{func_name}_'
+        return_label = new_lbl(root_node.location)
+        frame = Frame(slots=[], globals=root_symtab)
+        for param, param_type in zip(root_node.params, root_node.param_types):
+            var = new_var(param_type)
+            store(frame.slots, param.slot, var)
+            if param_type == Bool:
+                instructions[func_name].append(ir.LoadBoolParam(param.location, IRVar(param.name), var))
+            else:
+                instructions[func_name].append(ir.LoadIntParam(param.location, IRVar(param.name), var))
+        walk(handlers, root_node.body, frame)
+        instructions[func_name].append(return_label)
+        return instructions
+
+    instructions[func_name] = []
+    frame = Frame(slots=[], globals=root_symtab)
+    if module:
+        assert isinstance(root_node, ast.Block)
+        res = var_unit
+        for statement in root_node.statements:  # in one scope, as `visit_block` would
+            res = walk(handlers, statement, frame)
+    else:
+        res = walk(handlers, root_node, frame)
 
     # handle boolean and unit result
     if var_types[res] == Int:
@@ -0,0 +1,148 @@
+import operator
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from src.compiler import ir
+from src.compiler.symTab import interpreter_locals
+
+
+def divide(a: int, b: int) -> int:
+    """Division rounding towards zero, like `idivq`."""
+    quotient = abs(a) // abs(b)
+    return quotient if (a < 0) == (b < 0) else -quotient
+
+
+# The intrinsics, computed as their machine code does; truth values are 0 and 1
+intrinsic_operations: dict[str, Callable[..., int]] = {
+    'unary_-': operator.neg,
+    'unary_not': lambda a: a ^ 1,
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': divide,
+    '%': lambda a, b: a - b * divide(a, b),
+    '==': lambda a, b: int(a == b),
+    '!=': lambda a, b: int(a != b),
+    '<': lambda a, b: int(a < b),
+    '<=': lambda a, b: int(a <= b),
+    '>': lambda a, b: int(a > b),
+    '>=': lambda a, b: int(a >= b),
+}
+
+# The functions a program can call besides its own, by name
+ir_builtins: dict[str, Any] = {**interpreter_locals}
+ir_builtins.update(intrinsic_operations)
+
+# Opcodes of the instructions of an `IRFunction`; see `compile_function`
+CONST, COPY, CALL_BUILTIN, CALL_BUILTIN_2, CALL, JUMP, COND_JUMP, RETURN = range(8)
+
+
+@dataclass
+class IRFunction:
+    # Tuples of an opcode and its operands, with variables as register numbers and labels as indices
+    code: list[tuple[Any, ...]] = field(default_factory=list)
+    registers: dict[ir.IRVar, int] = field(default_factory=dict)
+    params: list[int] = field(default_factory=list)  # registers of the parameters, in order
+
+
+def compile_function(instructions: list[ir.Instruction], functions: dict[str, list[ir.Instruction]],
+                     builtins: dict[str, Callable[..., Any]]) -> IRFunction:
+    """Translates the instructions of one function for `run_ir`. Labels and parameter loads take no
+    instruction of their own."""
+    fun = IRFunction()
+
+    def register(var: ir.IRVar) -> int:
+        number = fun.registers.get(var)
+        if number is None:
+            number = fun.registers[var] = len(fun.registers)
+        return number
+
+    labels: dict[str, int] = {}  # index of the instruction after each label
+    index = 0
+    for ins in instructions:
+        if isinstance(ins, ir.Label):
+            labels[ins.name] = index
+        elif not isinstance(ins, (ir.LoadIntParam, ir.LoadBoolParam)):
+            index += 1
+
+    for ins in instructions:
+        match ins:
+            case ir.Label():
+                pass
+            case ir.LoadIntParam() | ir.LoadBoolParam():
+                fun.params.append(register(ins.dest))
+            case ir.LoadIntConst() | ir.LoadBoolConst():
+                fun.code.append((CONST, int(ins.value), register(ins.dest)))
+            case ir.Copy():
+                fun.code.append((COPY, register(ins.source), register(ins.dest)))
+            case ir.Call():
+                args = [register(arg) for arg in ins.args]
+                if ins.func.name in builtins and len(args) == 2:
+                    fun.code.append((CALL_BUILTIN_2, builtins[ins.func.name], args[0], args[1], register(ins.dest)))
+                elif ins.func.name in builtins:
+                    fun.code.append((CALL_BUILTIN, builtins[ins.func.name], args, register(ins.dest)))
+                elif ins.func.name in functions:
+                    fun.code.append((CALL, ins.func.name, args, register(ins.dest)))
+                else:
+                    raise Exception(f'{ins.location}: unknown function {ins.func.name}')
+            case ir.Jump():
+                fun.code.append((JUMP, labels[ins.label.name]))
+            case ir.CondJump():
+                fun.code.append((COND_JUMP, register(ins.cond), labels[ins.then_label.name],
+                                 labels[ins.else_label.name]))
+            case ir.Return():
+                fun.code.append((RETURN, register(ins.value)))
+            case _:
+                raise Exception(f'Unknown Instruction : {type(ins)}')
+    return fun
+
+
+def run_ir(functions: dict[str, list[ir.Instruction]],
+           builtins: dict[str, Callable[..., Any]] = ir_builtins) -> None:
+    """Runs function 'main' of the output of `generate_ir`, or of several such outputs merged,
+    like the executable that `generate_assembly` and `assemble` would build from them.
+
+    Calls run on a stack of frames here rather than on the Python stack."""
+    program = {name: compile_function(instructions, functions, builtins) for name, instructions in functions.items()}
+    fun = program['main']
+    code = fun.code
+    registers: list[Any] = [None] * len(fun.registers)
+    pc = 0
+    result: Any = None  # the value of the last `Return` of the running function
+    frames: list[tuple[list[tuple[Any, ...]], list[Any], int, int, Any]] = []  # the callers
+
+    while True:
+        if pc == len(code):
+            if not frames:
+                return
+            value = result
+            code, registers, pc, dest, result = frames.pop()
+            registers[dest] = value
+            continue
+        ins = code[pc]
+        pc += 1
+        op = ins[0]
+        if op == CALL_BUILTIN_2:
+            registers[ins[4]] = ins[1](registers[ins[2]], registers[ins[3]])
+        elif op == COPY:
+            registers[ins[2]] = registers[ins[1]]
+        elif op == CONST:
+            registers[ins[2]] = ins[1]
+        elif op == COND_JUMP:
+            pc = ins[2] if registers[ins[1]] else ins[3]
+        elif op == JUMP:
+            pc = ins[1]
+        elif op == CALL_BUILTIN:
+            registers[ins[3]] = ins[1](*[registers[arg] for arg in ins[2]])
+        elif op == CALL:
+            callee = program[ins[1]]
+            args = [registers[arg] for arg in ins[2]]
+            frames.append((code, registers, pc, ins[3], result))
+            code = callee.code
+            registers = [None] * len(callee.registers)
+            for param, arg in zip(callee.params, args):
+                registers[param] = arg
+            pc = 0
+            result = None
+        else:  # RETURN
+            result = registers[ins[1]]
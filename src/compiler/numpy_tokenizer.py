@@ -0,0 +1,139 @@
+"""Lexer that classifies the source with NumPy array operations.
+
+NumPy is an optional dependency of this module only; install it separately
+(`pip install numpy`) to use `tokenize_numpy`.
+"""
+import re
+
+from src.compiler.tokenizer import Token, TokenType, SourceLocation, comment_rex, tokenize, word_types
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None  # type: ignore
+
+# Character classes
+OTHER, SPACE, ALPHA, DIGIT, OPERATOR, PARENTHESIS, PUNCTUATION = range(7)
+
+class_names: dict[int, TokenType] = {
+    OPERATOR: 'operators',
+    PARENTHESIS: 'parenthesis',
+    PUNCTUATION: 'punctuation',
+}
+
+operator_rex = re.compile(r'==|!=|<=|>=|[+\-*=<>]|/(?!\*)')
+
+
+def character_classes() -> 'np.ndarray':
+    table = np.full(256, OTHER, dtype=np.uint8)
+    # The ASCII characters that str.isspace() accepts, as `\s` does in the regex tokenizer
+    for c in '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f ':
+        table[ord(c)] = SPACE
+    for c in 'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_':
+        table[ord(c)] = ALPHA
+    for c in '0123456789':
+        table[ord(c)] = DIGIT
+    for c in '+-*/=<>!':
+        table[ord(c)] = OPERATOR
+    for c in '(){}':
+        table[ord(c)] = PARENTHESIS
+    for c in ',:;':
+        table[ord(c)] = PUNCTUATION
+    return table
+
+
+def tokenize_numpy(source_code: str) -> list[Token]:
+    """Tokenizes like `tokenize`, finding token boundaries with vectorized operations.
+
+    Python only handles comments (through a regex), runs of several operator
+    characters such as '==' and '<=', and the final construction of `Token`s.
+    Non-ASCII sources are passed on to `tokenize`."""
+    if np is None:
+        raise Exception('tokenize_numpy requires NumPy')
+    if not source_code.isascii():
+        return tokenize(source_code)
+
+    codes = np.frombuffer(source_code.encode('ascii'), dtype=np.uint8)
+    classes = character_classes()[codes]
+    length = len(classes)
+
+    # Blank out comments so that they act as whitespace
+    comments = np.array([match.span() for match in comment_rex.finditer(source_code)], dtype=np.int64)
+    depth = np.zeros(length + 1, dtype=np.int32)
+    if len(comments):
+        np.add.at(depth, comments[:, 0], 1)
+        np.add.at(depth, comments[:, 1], -1)
+    classes[np.cumsum(depth[:-1]) > 0] = SPACE
+
+    # Starts of runs of the same class
+    index = np.arange(length)
+    run_start = np.ones(length, dtype=bool)
+    run_start[1:] = classes[1:] != classes[:-1]
+    alnum = (classes == ALPHA) | (classes == DIGIT)
+    alnum_start = alnum.copy()
+    alnum_start[1:] &= ~alnum[:-1]
+
+    # Inside a run of letters and digits, everything from the first letter on is one word;
+    # digits before it form an integer literal
+    starts_of_run = np.maximum.accumulate(np.where(alnum_start, index, 0))
+    last_alpha = np.maximum.accumulate(np.where(classes == ALPHA, index, -1))
+    in_word = alnum & (last_alpha >= starts_of_run)
+    word_start = in_word.copy()
+    word_start[1:] &= ~in_word[:-1]
+    int_start = alnum_start & (classes == DIGIT)
+
+    # Parentheses and punctuation are single characters; operator runs of length one too
+    single = (classes == PARENTHESIS) | (classes == PUNCTUATION)
+    operator_start = run_start & (classes == OPERATOR)
+    operator_end = np.ones(length, dtype=bool)
+    operator_end[:-1] = classes[1:] != OPERATOR
+    lone_operator = operator_start & operator_end & (codes != ord('!'))
+    long_operator = operator_start & ~lone_operator
+
+    errors = np.flatnonzero(classes == OTHER)
+    boundaries = np.flatnonzero(word_start | int_start | single | lone_operator | long_operator)
+
+    # A token ends where the next segment starts: a class change, the first letter of an
+    # alphanumeric run, or the next parenthesis or punctuation character
+    segments = np.flatnonzero(alnum_start | word_start | single | (run_start & ~alnum))
+    ends = np.append(segments, length)[np.searchsorted(segments, boundaries, side='right')]
+
+    newlines = np.flatnonzero(codes == ord('\n'))
+    lines = np.searchsorted(newlines, boundaries, side='left')
+    line_starts = np.concatenate(([-1], newlines))[lines] + 1
+
+    first_error = errors[0] if len(errors) else length
+    result: list[Token] = []
+    for start, end, line, line_start, kind in zip(boundaries.tolist(), ends.tolist(), lines.tolist(),
+                                                  line_starts.tolist(), classes[boundaries].tolist()):
+        if start > first_error:
+            break
+        if kind == ALPHA:
+            text = source_code[start:end]
+            result.append(Token(type=word_types.get(text, 'identifier'), text=text,
+                                source_location=SourceLocation(line=line + 1, column=start - line_start + 1)))
+        elif kind == DIGIT:
+            result.append(Token(type='int_literal', text=source_code[start:end],
+                                source_location=SourceLocation(line=line + 1, column=start - line_start + 1)))
+        elif kind == OPERATOR and end - start > 1 or source_code[start] == '!':
+            # Several operator characters in a row: split them like the regex tokenizer does
+            position = start
+            while position < end:
+                match = operator_rex.match(source_code, position, end)
+                if match is None:
+                    first_error = min(first_error, position)
+                    break
+                result.append(Token(type='operators', text=match.group(), source_location=SourceLocation(
+                    line=line + 1, column=position - line_start + 1)))
+                position = match.end()
+        else:
+            result.append(Token(type=class_names[kind], text=source_code[start:end],
+                                source_location=SourceLocation(line=line + 1, column=start - line_start + 1)))
+
+    if first_error < length:
+        line = source_code.count('\n', 0, first_error) + 1
+        column = first_error - (source_code.rfind('\n', 0, first_error) + 1) + 1
+        raise Exception(
+            f'Tokenization failed at line {line}, column {column}: '
+            f'near {source_code[first_error:(first_error + 10)]}')
+    return result
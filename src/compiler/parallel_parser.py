@@ -0,0 +1,93 @@
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Sequence
+
+from src.compiler import ast
+from src.compiler.parser import parse_module
+from src.compiler.symbols import SymbolTable
+from src.compiler.tokenizer import Token, SourceLocation
+from src.compiler.traversal import gc_paused
+
+TokenColumns = tuple[list[str], list[str], array, array, array]
+
+
+def function_spans(tokens: Sequence[Token]) -> list[tuple[int, int]]:
+    """Returns the (start, end) token indices of the top-level function definitions, by brace matching."""
+    spans = []
+    start = -1
+    depth = 0
+    in_body = False
+    for i, token in enumerate(tokens):
+        text = token.text
+        if start < 0:
+            if text == 'fun':
+                start = i
+        elif text == '(' or text == '{':
+            in_body = in_body or (text == '{' and depth == 0)
+            depth += 1
+        elif text == ')' or text == '}':
+            depth -= 1
+            if depth == 0 and in_body:
+                spans.append((start, i + 1))
+                start = -1
+                in_body = False
+    if start >= 0:
+        spans.append((start, len(tokens)))  # unfinished; the parser reports where
+    return spans
+
+
+def token_columns(tokens: Sequence[Token], symbols: SymbolTable | None = None) -> TokenColumns:
+    """Returns tokens as columns, which pickle far faster than `Token` objects.
+
+    Identifiers that have no symbol ID yet get it here, from `symbols` if given."""
+    if symbols is None:
+        return ([token.type for token in tokens], [token.text for token in tokens],
+                array('i', [token.source_location.line for token in tokens]),
+                array('i', [token.source_location.column for token in tokens]),
+                array('i', [token.symbol for token in tokens]))
+    intern = symbols.intern
+    return ([token.type for token in tokens], [token.text for token in tokens],
+            array('i', [token.source_location.line for token in tokens]),
+            array('i', [token.source_location.column for token in tokens]),
+            array('i', [intern(token.text) if token.symbol < 0 and token.type == 'identifier' else token.symbol
+                        for token in tokens]))
+
+
+def parse_functions(columns: TokenColumns) -> list[ast.FunctionDef]:
+    """Parses a run of function definitions sent as columns.
+
+    Identifiers keep the symbol IDs the sending process gave them. Those without one are not given
+    one here, as IDs from a table of the worker would mean nothing to it; they are looked up by name."""
+    with gc_paused():
+        tokens = [Token(type=token_type, text=text, source_location=SourceLocation(line=line, column=column),  # type: ignore
+                        symbol=symbol)
+                  for token_type, text, line, column, symbol in zip(*columns)]
+        return parse_module(tokens).functions
+
+
+def parse_parallel(tokens: Sequence[Token], workers: int = 4, symbols: SymbolTable | None = None) -> ast.Module:
+    """Parses like `parse_module`, with the function definitions split between a process pool.
+
+    The top-level expressions are parsed here, from the tokens outside the functions. Identifiers get
+    their symbol IDs as in `parser`."""
+    if workers <= 1:
+        return parse_module(tokens, symbols=symbols)
+    spans = function_spans(tokens)
+    rest: list[Token] = []
+    previous_end = 0
+    for start, end in spans:
+        rest.extend(tokens[previous_end:start])
+        previous_end = end
+    rest.extend(tokens[previous_end:])
+
+    # A few batches per worker, each a run of consecutive functions
+    batch_count = min(len(spans), workers * 4)
+    batches = [spans[len(spans) * i // batch_count:len(spans) * (i + 1) // batch_count] for i in range(batch_count)]
+    functions: list[ast.FunctionDef] = []
+    with ProcessPoolExecutor(workers) as pool, gc_paused():
+        jobs = [token_columns([token for start, end in batch for token in tokens[start:end]], symbols)
+                for batch in batches]
+        for batch_functions in pool.map(parse_functions, jobs):
+            functions.extend(batch_functions)
+
+    return ast.Module(functions=functions, expr=parse_module(rest, symbols=symbols).expr)
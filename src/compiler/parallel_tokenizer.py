@@ -0,0 +1,62 @@
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from src.compiler.tokenizer import Token, SourceLocation, comment_rex, scan, tokenize
+
+
+def split_points(source_code: str, parts: int) -> list[int]:
+    """Returns offsets that divide the source into about `parts` chunks.
+
+    Every offset is just after a newline that is not inside a block comment."""
+    block_comments = [match.span() for match in comment_rex.finditer(source_code)
+                      if match.group().startswith('/*')]
+    comment_starts = [start for start, _ in block_comments]
+    points = [0]
+    for part in range(1, parts):
+        position = max(len(source_code) * part // parts, points[-1])
+        while True:
+            newline = source_code.find('\n', position)
+            if newline == -1:
+                break
+            comment = bisect_right(comment_starts, newline) - 1
+            if comment >= 0 and newline < block_comments[comment][1]:
+                position = block_comments[comment][1]
+                continue
+            if newline + 1 > points[-1]:
+                points.append(newline + 1)
+            break
+    return points
+
+
+def tokenize_chunk(chunk: str, first_line: int) -> tuple[list[str], list[str], array, array]:
+    """Returns the tokens of a chunk as columns, which pickle far faster than `Token` objects."""
+    types: list[str] = []
+    texts: list[str] = []
+    lines = array('i')
+    columns = array('i')
+    for token_type, text, line, column in scan(chunk, first_line):
+        types.append(token_type)
+        texts.append(text)
+        lines.append(line)
+        columns.append(column)
+    return types, texts, lines, columns
+
+
+def tokenize_parallel(source_code: str, workers: int = 4) -> list[Token]:
+    """Tokenizes newline-aligned chunks of the source in a process pool; same result as `tokenize`."""
+    if workers <= 1:
+        return tokenize(source_code)
+    points = split_points(source_code, workers) + [len(source_code)]
+    chunks = [source_code[start:end] for start, end in zip(points, points[1:])]
+    first_lines = [1]
+    for chunk in chunks[:-1]:
+        first_lines.append(first_lines[-1] + chunk.count('\n'))
+
+    result: list[Token] = []
+    with ProcessPoolExecutor(workers) as pool:
+        for types, texts, lines, columns in pool.map(tokenize_chunk, chunks, first_lines):
+            result.extend(Token(type=token_type, text=text,  # type: ignore
+                                source_location=SourceLocation(line=line, column=column))
+                          for token_type, text, line, column in zip(types, texts, lines, columns))
+    return result
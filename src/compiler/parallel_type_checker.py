@@ -0,0 +1,64 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from src.compiler import ast
+from src.compiler.symTab import SymTab
+from src.compiler.traversal import gc_paused, preorder
+from src.compiler.type_checker import declare_function, typecheck, typecheck_body
+from src.compiler.types import Type, Unit
+
+# The module being checked, in each worker of the pool
+worker_functions: list[ast.FunctionDef] = []
+worker_symtab = SymTab(locals={}, parent=None)
+
+
+def start_worker(functions: list[ast.FunctionDef], symtab: SymTab) -> None:
+    """Keeps the functions and their signatures in the worker. Forked workers inherit them instead
+    of having them pickled."""
+    global worker_functions, worker_symtab
+    worker_functions = functions
+    worker_symtab = symtab
+
+
+def check_functions(span: tuple[int, int], annotate: bool = True) -> list[Type]:
+    """Typechecks the bodies of a run of functions and returns the types of their nodes in preorder,
+    or nothing if not `annotate`. A type error is raised again in the caller."""
+    start, end = span
+    types: list[Type] = []
+    for fun in worker_functions[start:end]:
+        typecheck_body(fun, worker_symtab)
+        if annotate:
+            types.extend(node.type for node in preorder(fun.body))
+    return types
+
+
+def check_only(span: tuple[int, int]) -> list[Type]:
+    return check_functions(span, annotate=False)
+
+
+def typecheck_parallel(module: ast.Module, symtab: SymTab, workers: int = 4, annotate: bool = True) -> Type:
+    """Declares every function of `module` in `symtab`, typechecks their bodies in a process pool
+    and then the top-level expressions here, whose type is returned.
+
+    Since all signatures are declared first, a function can call the ones defined after it. The
+    types of the nodes in the function bodies are copied back unless `annotate` is false, which
+    is enough to find type errors."""
+    for fun in module.functions:
+        declare_function(fun, symtab)
+
+    functions = module.functions
+    if workers <= 1 or len(functions) < 2:
+        for fun in functions:
+            typecheck_body(fun, symtab)
+    else:
+        # A few batches per worker, each a run of consecutive functions
+        batch_count = min(len(functions), workers * 4)
+        spans = [(len(functions) * i // batch_count, len(functions) * (i + 1) // batch_count)
+                 for i in range(batch_count)]
+        with ProcessPoolExecutor(workers, initializer=start_worker, initargs=(functions, symtab)) as pool, \
+                gc_paused():
+            for (start, end), types in zip(spans, pool.map(check_functions if annotate else check_only, spans)):
+                nodes = (node for fun in functions[start:end] for node in preorder(fun.body))
+                for node, type in zip(nodes, types):
+                    node.type = type
+
+    return Unit if module.expr is None else typecheck(module.expr, symtab)
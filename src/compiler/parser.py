@@ -1,15 +1,99 @@
-from typing import List
+import sys
+from dataclasses import dataclass, field
+from typing import Any, List, Sequence
 
 from src.compiler import ast
 from src.compiler.ast import Identifier
+from src.compiler.resolver import resolve
+from src.compiler.symbols import SymbolTable
+from src.compiler.traversal import Rule, gc_paused, run
 
 from src.compiler.tokenizer import Token, SourceLocation
-from src.compiler.types import Type
-
-
-def parser(tokens: list[Token]) -> ast.Expression:
+from src.compiler.types import Int, Bool, Unit
+
+# The type checker compares types by identity
+basic_types = {basic_type.name: basic_type for basic_type in (Int, Bool, Unit)}
+
+# Binary operators by binding power; a higher power binds tighter. All are left-associative.
+# '=' is handled separately in parse_expression.
+binding_powers: dict[str, int] = {
+    'or': 1,
+    'and': 2,
+    '==': 3, '!=': 3,
+    '<': 4, '>': 4, '<=': 4, '>=': 4,
+    '+': 5, '-': 5,
+    '*': 6, '/': 6, '%': 6,
+}
+
+
+@dataclass
+class SharedNodes:
+    """Hash-consing table: the side-effect-free subtrees parsed so far, keyed by structure.
+
+    Literals, variables and operator trees of them are shared. Their types do not depend on
+    where they occur, except for variables, whose type the type checker does not store."""
+    nodes: dict[tuple[Any, ...], ast.Expression] = field(default_factory=dict)
+    ids: set[int] = field(default_factory=set)  # of the nodes in `nodes`
+    shared: int = 0  # occurrences replaced by a node from `nodes`
+    saved_bytes: int = 0  # size of the replaced nodes
+
+    def share(self, node: ast.Expression) -> ast.Expression:
+        """Returns the node equal to `node` from the table, adding `node` if there is none.
+
+        A shared node keeps the location of its first occurrence."""
+        match node:
+            case ast.Literal():
+                key: tuple[Any, ...] = ('literal', type(node.value), node.value)
+            case ast.Identifier():
+                key = ('identifier', node.key)
+            case ast.TreeOperator() if node.operator in binding_powers:
+                if id(node.left) not in self.ids or id(node.right) not in self.ids:
+                    return node
+                key = ('operator', node.operator, id(node.left), id(node.right))
+            case _:
+                return node
+
+        existing = self.nodes.get(key)
+        if existing is None:
+            self.nodes[key] = node
+            self.ids.add(id(node))
+            return node
+        self.shared += 1
+        self.saved_bytes += sys.getsizeof(node)
+        return existing
+
+
+def parser(tokens: Sequence[Token], shared: SharedNodes | None = None,
+           symbols: SymbolTable | None = None) -> ast.Expression:
+    """Parses one expression, to any nesting depth, and resolves its variables, sharing equal
+    subtrees through `shared` if given.
+
+    Identifiers keep the symbol IDs of their tokens. Those that have none get theirs from `symbols`
+    if given, usually the `symbols` of the `SymTab` the tree is checked in; otherwise they keep -1
+    and are looked up by name."""
+    expression = parse(tokens, module=False, shared=shared, symbols=symbols)
+    assert isinstance(expression, ast.Expression)
+    return expression
+
+
+def parse_module(tokens: Sequence[Token], shared: SharedNodes | None = None,
+                 symbols: SymbolTable | None = None) -> ast.Module:
+    """Parses function definitions and top-level expressions up to the end of `tokens`, like `parser`."""
+    module = parse(tokens, module=True, shared=shared, symbols=symbols)
+    assert isinstance(module, ast.Module)
+    return module
+
+
+def parse(tokens: Sequence[Token], module: bool, shared: SharedNodes | None = None,
+          symbols: SymbolTable | None = None) -> ast.Expression | ast.Module:
+    """Every rule that can nest is a generator that yields the rules it needs, driven by `run`,
+    so nesting depth is limited by memory rather than the recursion limit. Literals and variables
+    are parsed without a rule of their own."""
     pos = 0
 
+    def share(node: ast.Expression) -> ast.Expression:
+        return node if shared is None else shared.share(node)
+
     def peek() -> Token:
         if pos < len(tokens):
             return tokens[pos]
@@ -27,21 +111,25 @@ def parser(tokens: list[Token]) -> ast.Expression:
         pos += 1
         return token
 
-    def parse_module() -> ast.Module:
+    def parse_module() -> Rule:
         expressions: List[ast.Expression] = []
         functions: List[ast.FunctionDef] = []
 
         while pos < len(tokens):
             if peek().text == 'fun':
-                fun = parse_fun_definition()
+                fun = yield parse_fun_definition()
                 functions.append(fun)
             else:
-                expression = parse_expression()
+                expression = yield parse_expression()
                 expressions.append(expression)
+                if peek().text == ';':
+                    consume(';')
+                elif pos < len(tokens) and tokens[pos - 1].text != '}':
+                    raise Exception(f'{peek().source_location}: expected ";"')
 
         return ast.Module(functions=functions, expr=ast.Block(SourceLocation(line=1, column=1), expressions))
 
-    def parse_fun_definition() -> ast.FunctionDef:
+    def parse_fun_definition() -> Rule:
         token = peek()
         consume('fun')
         name = parse_identifier()
@@ -54,25 +142,32 @@ def parser(tokens: list[Token]) -> ast.Expression:
                 consume(',')
             param = parse_identifier()
             consume(':')
-            param_type = ast.BasicType(consume().text)
+            param_type = parse_basic_type()
 
             params.append(param)
             param_types.append(param_type)
 
         consume(')')
-        consume(':')
-        return_type = ast.BasicType(consume().text)
-        body = parse_blocks()
-        return ast.FunctionDef(token.source_location, name, param_types, body, return_type)
+        if peek().text == ':':
+            consume(':')
+            return_type = parse_basic_type()
+        else:
+            return_type = Unit
+        body = yield parse_blocks()
+        return ast.FunctionDef(token.source_location, name, params, param_types, body, return_type)
 
-    def parse_return() -> ast.Return:
+    def parse_basic_type() -> ast.BasicType:
+        name = consume().text
+        return basic_types.get(name, ast.BasicType(name))
+
+    def parse_return() -> Rule:
         token = peek()
         consume('return')
-        if peek().text == '}':
+        if peek().text in ('}', ';'):
             value = None
         else:
-            value = parse_expression()
-        if peek().text != '}':
+            value = yield parse_expression()
+        if peek().text not in ('}', ';'):
             raise Exception(f'Return statement must be the last statement in a block')
         return ast.Return(token.source_location, value)
 
@@ -88,7 +183,8 @@ def parser(tokens: list[Token]) -> ast.Expression:
         token = peek()
         if token.type == 'identifier':
             consume()
-            return ast.Identifier(name=token.text, location=token.source_location)
+            symbol = token.symbol if token.symbol >= 0 or symbols is None else symbols.intern(token.text)
+            return ast.Identifier(name=token.text, location=token.source_location, symbol=symbol)
         else:
             raise Exception(f'Expected identifier, Found "{token.text}"')
 
@@ -117,47 +213,52 @@ def parser(tokens: list[Token]) -> ast.Expression:
 
         return ast.Literal(value=value, location=token.source_location)
 
-    def parse_unary() -> ast.Expression:
+    def parse_atom() -> ast.Expression | None:
+        """Parses a literal or a variable, if that is what comes next."""
         token = peek()
-        if peek().text in ['-', 'not']:
-            operator_token = consume()
-            operator = operator_token.text
-            expr = parse_factors()
-            return ast.UnaryOp(token.source_location, operator, expr)
-
-    def parse_factors() -> ast.Expression:
-        if peek().text == '(':
-            return parse_parenthesize_expression()
+        if token.type == 'int_literal':
+            return share(parse_literal())
+        elif token.type == 'bool_literal':
+            return share(parse_bool_literal())
+        elif token.type == 'identifier' and (pos + 1 == len(tokens) or tokens[pos + 1].text != '('):
+            return share(parse_identifier())
+        return None
+
+    def parse_unary() -> Rule:
+        token = peek()
+        operator_token = consume()
+        operator = operator_token.text
+        expr = yield parse_factors()
+        return ast.UnaryOp(token.source_location, operator, expr)
+
+    def parse_factors() -> Rule:
+        atom = parse_atom()
+        if atom is not None:
+            return atom
+        elif peek().text == '(':
+            return (yield parse_parenthesize_expression())
         elif peek().text == '{':
-            return parse_blocks()
+            return (yield parse_blocks())
         elif peek().type == 'keyword':
             if peek().text == 'var':
-                return parse_var_declaration()
+                return (yield parse_var_declaration())
             elif peek().text == 'if':
-                return parse_if_expression()
+                return (yield parse_if_expression())
             elif peek().text == 'while':
-                return parse_while_loop()
+                return (yield parse_while_loop())
             elif peek().text in ['break', 'continue']:
                 return parse_break_and_continue()
-        elif peek().type == 'identifier':
+        elif peek().type == 'identifier':  # function calls
             identifier = parse_identifier()
-            if peek().text == '(':  # function calls
-                function_call = parse_function_call(identifier)
-                function_call.name = identifier
-                return function_call
-            return identifier
-        elif peek().type == 'int_literal':
-            return parse_literal()
-        elif peek().type == 'bool_literal':
-            return parse_bool_literal()
+            return (yield parse_function_call(identifier))
         if peek().text in ['-', 'not']:
-            return parse_unary()
+            return (yield parse_unary())
         else:
             raise Exception(f'Unexpected "{peek().text}" ')
 
-    def parse_parenthesize_expression() -> ast.Expression:
+    def parse_parenthesize_expression() -> Rule:
         consume('(')
-        expr = parse_expression()
+        expr = yield parse_expression()
         consume(')')
         return expr
 
@@ -220,80 +321,73 @@ def parser(tokens: list[Token]) -> ast.Expression:
     #
     #     return left
 
-    def parse_binary_expression(operators: list[str], next_level_parser) -> ast.Expression:
-        left: ast.Expression = next_level_parser()
+    def parse_binary_expression(min_power: int, left: ast.Expression | None = None) -> Rule:
+        """Parses operators that bind at least as tightly as `min_power`, left-associatively,
+        after `left` if it has already been parsed."""
+        if left is None:
+            left = parse_atom()
+        if left is None:
+            left = yield parse_factors()
 
-        while peek().text in operators:
+        while True:
             token = peek()
-            op = consume()
-            right = next_level_parser()
-            left = ast.TreeOperator(token.source_location, left, op.text, right)
-
-        return left
-
-    def parse_terms() -> ast.Expression:
-        return parse_binary_expression(['*', '/', '%'], parse_factors)
-
-    def parse_polynomial() -> ast.Expression:
-        return parse_binary_expression(['+', '-'], parse_terms)
-
-    def parse_comparison() -> ast.Expression:
-        return parse_binary_expression(['<', '>', '<=', '>='], parse_polynomial)
-
-    def parse_equality() -> ast.Expression:
-        return parse_binary_expression(['==', '!='], parse_comparison)
-
-    def parse_and() -> ast.Expression:
-        return parse_binary_expression(['and'], parse_equality)
-
-    def parse_or() -> ast.Expression:
-        return parse_binary_expression(['or'], parse_and)
-
-    def parse_expression() -> ast.Expression:
-        left: ast.Expression = parse_or()
+            power = binding_powers.get(token.text)
+            if power is None or power < min_power:
+                return left
+            consume()
+            right = parse_atom()
+            next_power = binding_powers.get(peek().text)
+            if right is None or next_power is not None and next_power > power:
+                right = yield parse_binary_expression(power + 1, right)
+            left = share(ast.TreeOperator(token.source_location, left, token.text, right))
+
+    def parse_expression() -> Rule:
+        left = parse_atom()
+        if left is None or peek().text in binding_powers:
+            left = yield parse_binary_expression(binding_powers['or'], left)
         while peek().text in ['=']:
             token = peek()
             op = consume()
-            right = parse_expression_right()
+            right = yield parse_expression_right()
             left = ast.TreeOperator(token.source_location, left, op.text, right)
 
         return left
 
-    def parse_expression_right() -> ast.Expression:
-        left: ast.Expression = parse_equality()
+    def parse_expression_right() -> Rule:
+        left = yield parse_binary_expression(binding_powers['=='])
         if peek().text in ['=']:
             token = peek()
             op = consume()
-            right = parse_expression_right()
+            right = yield parse_expression_right()
             return ast.TreeOperator(token.source_location, left, op.text, right)
 
         return left
 
-    def parse_if_expression() -> ast.Expression:
+    def parse_if_expression() -> Rule:
         token = peek()
         consume('if')
-        condition = parse_expression()
+        condition = yield parse_expression()
         consume('then')
-        then_clause = parse_expression()
+        then_clause = yield parse_expression()
         if peek().text == 'else':
             consume('else')
-            else_clause = parse_expression()
+            else_clause = yield parse_expression()
         else:
             else_clause = None
 
         return ast.IfExpression(token.source_location, condition, then_clause, else_clause)
 
-    def parse_var_declaration() -> ast.VarDeclaration:
+    def parse_var_declaration() -> Rule:
         token = peek()
         consume('var')
         name = parse_identifier()
         var_type = parse_var_type()
         consume('=')
-        value = parse_expression()
+        value = yield parse_expression()
 
         return ast.VarDeclaration(token.source_location, name, var_type, value)
 
-    def parse_var_type() -> Type | None:
+    def parse_var_type() -> ast.AstType | None:
         if peek().text == ':':
             consume(':')
             if peek().text == 'Int':
@@ -306,22 +400,22 @@ def parser(tokens: list[Token]) -> ast.Expression:
 
             elif peek().text == '=':
                 raise Exception(
-                    f'{peek().location}: missing type declaration')
+                    f'{peek().source_location}: missing type declaration')
             else:
                 raise Exception(
-                    f'{peek().location}: invalid type declaration "{peek().text}"')
+                    f'{peek().source_location}: invalid type declaration "{peek().text}"')
         else:
             return None
 
-    def parse_while_loop() -> ast.WhileLoop:
+    def parse_while_loop() -> Rule:
         token = peek()
         consume('while')
-        condition = parse_expression()
+        condition = yield parse_expression()
         consume('do')
-        do_action = parse_expression()
+        do_action = yield parse_expression()
         return ast.WhileLoop(token.source_location, condition, do_action)
 
-    def parse_blocks() -> ast.Block:
+    def parse_blocks() -> Rule:
         location = peek().source_location
         consume('{')
         block = ast.Block(location, statements=[])
@@ -330,10 +424,9 @@ def parser(tokens: list[Token]) -> ast.Expression:
             if peek().type == 'end':
                 raise Exception(f'{peek().source_location}: expected a "}}"')
             if peek().text == 'return':
-                block.statements.append(parse_return())
-                semicolon = False
+                block.statements.append((yield parse_return()))
             else :
-                statement = parse_expression()
+                statement = yield parse_expression()
                 block.statements.append(statement)
 
             # block.statements.append(parse_expression())
@@ -351,7 +444,7 @@ def parser(tokens: list[Token]) -> ast.Expression:
 
         return block
 
-    def parse_function_call(identifier) -> ast.FunctionCall:
+    def parse_function_call(identifier: ast.Identifier) -> Rule:
         consume('(')
         func = ast.FunctionCall(
             location=identifier.location,
@@ -363,10 +456,11 @@ def parser(tokens: list[Token]) -> ast.Expression:
             if peek().text == ',':
                 consume(',')
 
-            func.args.append(parse_expression())
+            func.args.append((yield parse_expression()))
 
         consume(')')
         return func
 
-    return parse_expression()
-
+    with gc_paused():
+        root = run(parse_module() if module else parse_expression())
+        return resolve(root, shared=shared is not None)
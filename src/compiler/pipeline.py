@@ -0,0 +1,82 @@
+from typing import Iterable, Iterator
+
+from src.compiler import ast
+from src.compiler.assembly_generator import generate_assembly
+from src.compiler.ir import Instruction
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.tokenizer import Token
+from src.compiler.type_checker import typecheck, typecheck_function
+
+
+def split_module(tokens: Iterable[Token]) -> Iterator[list[Token]]:
+    """Yields the tokens of each top-level function definition as soon as its body is closed.
+
+    The tokens of the top-level expressions are collected and yielded last, even if there are none."""
+    main: list[Token] = []
+    function: list[Token] | None = None
+    depth = 0
+    in_body = False
+    for token in tokens:
+        if function is None:
+            if token.text == 'fun':
+                function = [token]
+            else:
+                main.append(token)
+            continue
+
+        function.append(token)
+        if token.text in ('(', '{'):
+            in_body = in_body or (token.text == '{' and depth == 0)
+            depth += 1
+        elif token.text in (')', '}'):
+            depth -= 1
+            if depth == 0 and in_body:
+                yield function
+                function = None
+                in_body = False
+
+    if function is not None:
+        yield function  # unfinished; the parser reports where
+    yield main
+
+
+def lower_stream(tokens: Iterable[Token], fused: bool = True) -> Iterator[dict[str, list[Instruction]]]:
+    """Parses, typechecks and lowers a program one function at a time, then the top-level expressions as 'main'.
+
+    Only the signatures of the functions seen so far are kept between functions, so a function
+    can call itself and the functions defined above it, and 'main' can call all of them.
+
+    The top-level expressions are separated by ';'. 'main' prints the value of the last of them if
+    it is an Int or a Bool and no ';' follows it. With `fused`, each tree is typechecked while it
+    is lowered instead of in a walk of its own."""
+    symtab = SymTab(locals={}, parent=None)  # its symbols give a name the same ID in every piece
+    for item in split_module(tokens):
+        module = parse_module(item, symbols=symtab.symbols)
+        for fun in module.functions:
+            if fused:
+                yield generate_ir(root_types, fun, symtab)
+                continue
+            typecheck_function(fun, symtab)
+            yield generate_ir(root_types, fun)
+        if module.functions:
+            continue
+
+        main = module.expr
+        assert isinstance(main, ast.Block)
+        if item and item[-1].text == ';':
+            main.statements.append(ast.Literal(item[-1].source_location, value=None))
+        if fused:
+            yield generate_ir(root_types, main, symtab, module=True)
+        else:
+            typecheck(main, symtab)
+            yield generate_ir(root_types, main, module=True)
+
+
+def compile_stream(tokens: Iterable[Token]) -> Iterator[str]:
+    """Yields the Assembly code of a program one function at a time; see `lower_stream`."""
+    header = True
+    for instructions in lower_stream(tokens):
+        yield generate_assembly(instructions, header=header)
+        header = False
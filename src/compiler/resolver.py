@@ -0,0 +1,171 @@
+from copy import copy
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+from src.compiler import ast
+from src.compiler.symTab import SymTab, find_top_level_context
+from src.compiler.traversal import DispatchTable, Visit, walk
+
+
+@dataclass(slots=True)
+class Frame:
+    """Context of a pass over one function or the top-level expressions: the values of its local
+    variables by slot, and the scope of everything else."""
+    slots: list[Any]
+    globals: SymTab
+    return_type: Any = None  # of the function, while typechecking one
+    builtins: SymTab = field(init=False)  # top-level scope of `globals`, found once per frame
+
+    def __post_init__(self) -> None:
+        self.builtins = find_top_level_context(self.globals)
+
+    def call(self, slots: list[Any]) -> 'Frame':
+        """Frame of a function called from this one, with the same scopes."""
+        frame = copy(self)
+        frame.slots = slots
+        return frame
+
+
+def store(slots: list[Any], slot: int, value: Any) -> None:
+    """Sets a slot, growing the frame up to it; slots are numbered in declaration order."""
+    if slot >= len(slots):
+        slots.extend([None] * (slot + 1 - len(slots)))
+    slots[slot] = value
+
+
+@dataclass
+class Resolution:
+    scopes: list[dict[int | str, int]] = field(default_factory=list)  # symbol, or name, to slot, innermost last
+    size: int = 0  # slots taken in the current frame
+    shared: bool = False  # whether nodes may be shared between scopes, see `SharedNodes`
+    seen: set[int] = field(default_factory=set)  # ids of the shareable nodes resolved so far
+
+    def declare(self, name: ast.Identifier) -> None:
+        if name.key in self.scopes[-1]:
+            raise Exception(f'Variable {name.name} has already been declared')
+        self.scopes[-1][name.key] = name.slot = self.size
+        self.size += 1
+
+    def lookup(self, symbol: int | str) -> int:
+        for scope in reversed(self.scopes):
+            if symbol in scope:
+                return scope[symbol]
+        return -1
+
+
+def resolve(root: ast.Expression | ast.Module, shared: bool = False) -> ast.Expression | ast.Module:
+    """Gives every local variable a slot in the frame of its function, or of the top-level
+    expressions, and sets it on its declaration and every use. Names that are not declared
+    locally (functions, builtins) keep slot -1.
+
+    With `shared`, a node that is already resolved and would get different slots where it occurs
+    again is copied for that occurrence. Returns `root`, or its copy."""
+    resolution = Resolution(shared=shared)
+    if isinstance(root, ast.Module):
+        for fun in root.functions:
+            resolve_function(fun, resolution)
+        if root.expr is not None:
+            root.expr = resolve_frame(root.expr, resolution)
+        return root
+    return resolve_frame(root, resolution)
+
+
+def resolve_frame(node: ast.Expression, resolution: Resolution) -> ast.Expression:
+    resolution.scopes = [{}]
+    resolution.size = 0
+    return walk(resolve_handlers, node, resolution)  # type: ignore[no-any-return]
+
+
+def resolve_function(fun: ast.FunctionDef, resolution: Resolution) -> None:
+    resolution.scopes = [{}]
+    resolution.size = 0
+    for param in fun.params:
+        resolution.declare(param)
+    fun.body = walk(resolve_handlers, fun.body, resolution)
+
+
+def resolve_leaf(node: ast.Expression, resolution: Resolution) -> ast.Expression:
+    return node
+
+
+def resolve_identifier(node: ast.Identifier, resolution: Resolution) -> ast.Identifier:
+    slot = resolution.lookup(node.key)
+    if resolution.shared:
+        if node.slot != slot and id(node) in resolution.seen:
+            return replace(node, slot=slot)
+        resolution.seen.add(id(node))
+    node.slot = slot
+    return node
+
+
+def resolve_tree_operator(node: ast.TreeOperator, resolution: Resolution) -> Visit:
+    left = yield node.left, resolution
+    right = yield node.right, resolution
+    if left is not node.left or right is not node.right:
+        if id(node) in resolution.seen:
+            return replace(node, left=left, right=right)  # shared, and resolved before with other children
+        node.left = left
+        node.right = right
+    if resolution.shared:
+        resolution.seen.add(id(node))
+    return node
+
+
+def resolve_if_expression(node: ast.IfExpression, resolution: Resolution) -> Visit:
+    node.condition = yield node.condition, resolution
+    node.then_clause = yield node.then_clause, resolution
+    if node.else_clause is not None:
+        node.else_clause = yield node.else_clause, resolution
+    return node
+
+
+def resolve_unary_op(node: ast.UnaryOp, resolution: Resolution) -> Visit:
+    node.expr = yield node.expr, resolution
+    return node
+
+
+def resolve_var_declaration(node: ast.VarDeclaration, resolution: Resolution) -> Visit:
+    node.value = yield node.value, resolution  # before the name is in scope
+    resolution.declare(node.name)
+    return node
+
+
+def resolve_while_loop(node: ast.WhileLoop, resolution: Resolution) -> Visit:
+    node.condition = yield node.condition, resolution
+    node.do_action = yield node.do_action, resolution
+    return node
+
+
+def resolve_block(node: ast.Block, resolution: Resolution) -> Visit:
+    resolution.scopes.append({})
+    for i, statement in enumerate(node.statements):
+        node.statements[i] = yield statement, resolution
+    resolution.scopes.pop()
+    return node
+
+
+def resolve_function_call(node: ast.FunctionCall, resolution: Resolution) -> Visit:
+    for i, arg in enumerate(node.args):
+        node.args[i] = yield arg, resolution
+    return node
+
+
+def resolve_return(node: ast.Return, resolution: Resolution) -> Visit:
+    if node.value is not None:
+        node.value = yield node.value, resolution
+    return node
+
+
+resolve_handlers = DispatchTable({
+    ast.Literal: resolve_leaf,
+    ast.BreakContinue: resolve_leaf,
+    ast.Identifier: resolve_identifier,
+    ast.TreeOperator: resolve_tree_operator,
+    ast.IfExpression: resolve_if_expression,
+    ast.UnaryOp: resolve_unary_op,
+    ast.VarDeclaration: resolve_var_declaration,
+    ast.WhileLoop: resolve_while_loop,
+    ast.Block: resolve_block,
+    ast.FunctionCall: resolve_function_call,
+    ast.Return: resolve_return,
+})
@@ -0,0 +1,122 @@
+import mmap
+import os
+import re
+from dataclasses import dataclass
+from typing import BinaryIO, Iterator
+
+from src.compiler.tokenizer import Token, SourceLocation, token_pattern, word_types
+
+# Same token grammar as `tokenize`, over bytes. Columns count bytes.
+byte_token_rex = re.compile(token_pattern.encode(), re.VERBOSE | re.DOTALL)
+
+Buffer = bytes | mmap.mmap
+
+
+@dataclass
+class ScanState:
+    line_num: int = 1
+    line_start: int = 0  # stream offset of the first byte of the current line
+    offset: int = 0  # stream offset of the first byte of the current buffer
+    consumed: int = 0  # bytes of the current buffer that have been fully lexed
+
+
+def count_lines(state: ScanState, text: bytes, start: int) -> None:
+    """Advances the line counter over skipped text found at `start` in the current buffer."""
+    newlines = text.count(b'\n')
+    if newlines:
+        state.line_num += newlines
+        state.line_start = state.offset + start + text.rindex(b'\n') + 1
+
+
+def tokenization_error(state: ScanState, buffer: Buffer, start: int) -> Exception:
+    column = state.offset + start - state.line_start + 1
+    near = bytes(buffer[start:start + 10]).decode(errors='replace')
+    return Exception(f'Tokenization failed at line {state.line_num}, column {column}: near {near}')
+
+
+def scan_bytes(buffer: Buffer, state: ScanState, final: bool) -> Iterator[Token]:
+    """Yields the tokens in `buffer`.
+
+    Unless `final` is set, stops before the first lexeme that could continue past the end of the
+    buffer and leaves its position in `state.consumed`."""
+    length = len(buffer)
+    state.consumed = length
+    for match in byte_token_rex.finditer(buffer):
+        kind = match.lastgroup
+        start, end = match.span()
+        if not final and end == length and kind == 'whitespace':
+            count_lines(state, match.group(), start)  # joins no token, so it is not carried over
+            return
+        if not final and (end == length or kind == 'error' and buffer[start:start + 2] == b'/*'):
+            state.consumed = start
+            return
+        text = match.group()
+        if kind == 'whitespace' or kind == 'comment':
+            count_lines(state, text, start)
+            continue
+        if kind == 'error':
+            raise tokenization_error(state, buffer, start)
+        word = text.decode()
+        token_type = word_types.get(word, 'identifier') if kind == 'word' else kind
+        yield Token(type=token_type, text=word,  # type: ignore
+                    source_location=SourceLocation(line=state.line_num,
+                                                   column=state.offset + start - state.line_start + 1))
+
+
+def tokenize_file(path: str) -> Iterator[Token]:
+    """Tokenizes a file through a read-only memory map without reading it into a string."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        # Not closed explicitly: match objects may still export its buffer when the generator is dropped
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    yield from scan_bytes(mapped, ScanState(), final=True)
+
+
+def tokenize_reader(reader: BinaryIO, chunk_size: int = 64 * 1024) -> Iterator[Token]:
+    """Tokenizes a binary stream chunk by chunk.
+
+    Only an unfinished token at the end of a chunk is carried over; whitespace and comments are
+    skipped as they are read, so memory stays bounded by the chunk size and the longest token."""
+    state = ScanState()
+    buffer = b''
+    skip_until: bytes | None = None  # terminator of the comment being skipped
+    comment_error: Exception | None = None
+    while True:
+        chunk = reader.read(chunk_size)
+        final = not chunk
+        buffer += chunk
+
+        if skip_until is not None:
+            end = buffer.find(skip_until)
+            if end == -1:
+                if final:
+                    if comment_error is not None:
+                        raise comment_error
+                    return
+                skip = max(len(buffer) - len(skip_until) + 1, 0)  # keep a possibly split terminator
+            else:
+                skip = end + len(b'*/') if skip_until == b'*/' else end
+                skip_until = None
+            count_lines(state, buffer[:skip], 0)
+            state.offset += skip
+            buffer = buffer[skip:]
+            if skip_until is not None:
+                continue
+
+        yield from scan_bytes(buffer, state, final)
+        if final:
+            return
+
+        state.offset += state.consumed
+        buffer = buffer[state.consumed:]
+        if buffer.startswith(b'/*'):
+            comment_error = tokenization_error(state, buffer, 0)
+            skip_until = b'*/'
+        elif buffer.startswith(b'//'):
+            comment_error = None
+            skip_until = b'\n'
+        else:
+            continue
+        state.offset += 2
+        buffer = buffer[2:]
@@ -1,28 +1,46 @@
 import operator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
-from src.compiler.types import Bool, Int, Type, Unit
+from src.compiler.symbols import SymbolTable
+from src.compiler.types import Bool, Int, Type, Unit, FunctionType, PrintInt, PrintBool, ReadInt
 from src.compiler.ir import IRVar
 
 
 @dataclass
 class SymTab:
+    """Scope of names, keyed by symbol ID. Names may also be given as strings, in `locals` too:
+    they are interned in `symbols`, the table of the root scope, which every child shares.
+
+    The trees checked or run in a scope are parsed with its `symbols`, or with no table, in which
+    case their identifiers are looked up by name."""
     locals: dict
     parent: 'SymTab | None'
-
-    def require(self, name: str) -> Any:
-        if name in self.locals:
-            return self.locals[name]
-        elif self.parent is not None:
-            return self.parent.require(name)
-        else:
-            return None
-
-    def add_local(self, name: str, value: Any) -> None:
-        if name in self.locals:
+    symbols: SymbolTable = field(default_factory=SymbolTable, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.parent is not None:
+            self.symbols = self.parent.symbols
+        self.locals = {self.key(name): value for name, value in self.locals.items()}
+
+    def key(self, name: str | int) -> int:
+        """The symbol ID of a name, or the ID itself."""
+        return name if isinstance(name, int) else self.symbols.intern(name)
+
+    def require(self, name: str | int) -> Any:
+        symbol = self.key(name)
+        symtab: SymTab | None = self
+        while symtab is not None:
+            if symbol in symtab.locals:
+                return symtab.locals[symbol]
+            symtab = symtab.parent
+        return None
+
+    def add_local(self, name: str | int, value: Any) -> None:
+        symbol = self.key(name)
+        if symbol in self.locals:
             raise Exception(f'{name} is already defined')
         else:
-            self.locals[name] = value
+            self.locals[symbol] = value
 
 
 def print_int(i: int) -> None:
@@ -77,24 +95,31 @@ root_types: dict[IRVar, Type] = {
     IRVar('>='): Bool,
     IRVar('%'): Int,
     IRVar('unary_-'): Int,
-    IRVar('not'): Bool,
+    IRVar('unary_not'): Bool,
     IRVar('print_int'): Unit,
     IRVar('print_bool'): Unit,
     IRVar('read_int'): Unit,
 }
 
+# Types of the builtin functions, for the type checker when its scope does not define them
+builtin_function_types: dict[str, FunctionType] = {
+    'print_int': PrintInt,
+    'print_bool': PrintBool,
+    'read_int': ReadInt,
+}
+
 
 def find_top_level_context(symtab: SymTab) -> SymTab:
-    if symtab.parent is not None:
-        return find_top_level_context(symtab.parent)
+    while symtab.parent is not None:
+        symtab = symtab.parent
     return symtab
 
 
-def find_context(symtab: SymTab, name: str) -> SymTab | None:
-    if name in symtab.locals:
-        return symtab
-    else:
-        if symtab.parent is not None:
-            return find_context(symtab.parent, name)
-        else:
-            return None
+def find_context(symtab: SymTab, name: str | int) -> SymTab | None:
+    symbol = symtab.key(name)
+    context: SymTab | None = symtab
+    while context is not None:
+        if symbol in context.locals:
+            return context
+        context = context.parent
+    return None
@@ -0,0 +1,30 @@
+# The operators and builtin functions, which have the same ID in every table
+builtin_names = ('+', '-', '*', '/', '%', 'or', 'and', '==', '!=', '<', '>', '<=', '>=', '=', 'not',
+                 'unary_-', 'unary_not', 'print_int', 'print_bool', 'read_int')
+
+builtin_symbols = {name: symbol for symbol, name in enumerate(builtin_names)}
+
+
+class SymbolTable:
+    """Gives every distinct name a small integer ID, so that the phases on the AST (resolver, type
+    checker, interpreters) hash and compare ints. The IR does not use them, see `IRVar`.
+
+    There is one table per compilation, the `symbols` of its root `SymTab`: the IDs of the names
+    that are not builtins only mean something together with the table that gave them."""
+    ids: dict[str, int]
+    names: list[str]
+
+    def __init__(self) -> None:
+        self.ids = dict(builtin_symbols)
+        self.names = list(builtin_names)
+
+    def intern(self, name: str) -> int:
+        symbol = self.ids.get(name)
+        if symbol is None:
+            symbol = len(self.names)
+            self.ids[name] = symbol
+            self.names.append(name)
+        return symbol
+
+    def name(self, symbol: int) -> str:
+        return self.names[symbol]
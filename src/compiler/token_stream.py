@@ -0,0 +1,97 @@
+import re
+from array import array
+from bisect import bisect_right
+from typing import Sequence, overload
+
+from src.compiler.tokenizer import Token, TokenType, SourceLocation, token_rex, word_types
+
+# Token types in column order; a token's kind is its index in this tuple
+token_types: tuple[TokenType, ...] = (
+    'int_literal', 'bool_literal', 'bool_operator', 'operators', 'identifier', 'parenthesis', 'keyword',
+    'null_literal', 'unary_operator', 'punctuation')
+
+type_codes: dict[str, int] = {token_type: code for code, token_type in enumerate(token_types)}
+word_codes: dict[str, int] = {word: type_codes[token_type] for word, token_type in word_types.items()}
+identifier_code = type_codes['identifier']
+
+newline_rex = re.compile(r'\n')
+
+
+class TokenStream(Sequence[Token]):
+    """Compact token list: parallel int columns of kind, start offset and length over the source.
+
+    `Token` objects and their `SourceLocation`s are only built when indexed."""
+    source_code: str
+    kinds: array
+    starts: array
+    lengths: array
+    line_starts: array
+
+    def __init__(self, source_code: str) -> None:
+        self.source_code = source_code
+        self.kinds = array('i')
+        self.starts = array('i')
+        self.lengths = array('i')
+        self.line_starts = array('i', [0])
+        self.line_starts.extend(m.end() for m in newline_rex.finditer(source_code))
+        self._last_index = -1
+        self._last_token: Token | None = None
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    @overload
+    def __getitem__(self, index: int) -> Token: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Token]: ...
+
+    def __getitem__(self, index: int | slice) -> Token | list[Token]:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if index == self._last_index and self._last_token is not None:
+            return self._last_token  # the parser peeks at the same token many times
+        token = Token(type=self.type(index), text=self.text(index), source_location=self.location(index))
+        self._last_index = index
+        self._last_token = token
+        return token
+
+    def type(self, index: int) -> TokenType:
+        return token_types[self.kinds[index]]
+
+    def text(self, index: int) -> str:
+        start = self.starts[index]
+        return self.source_code[start:start + self.lengths[index]]
+
+    def location(self, index: int) -> SourceLocation:
+        return self.offset_location(self.starts[index])
+
+    def offset_location(self, offset: int) -> SourceLocation:
+        line = bisect_right(self.line_starts, offset)
+        return SourceLocation(line=line, column=offset - self.line_starts[line - 1] + 1)
+
+
+def tokenize_compact(source_code: str) -> TokenStream:
+    stream = TokenStream(source_code)
+    kinds = stream.kinds
+    starts = stream.starts
+    lengths = stream.lengths
+    for match in token_rex.finditer(source_code):
+        kind = match.lastgroup
+        if kind == 'whitespace' or kind == 'comment':
+            continue
+        start, end = match.span()
+        if kind == 'word':
+            kinds.append(word_codes.get(match.group(), identifier_code))
+        elif kind == 'error':
+            location = stream.offset_location(start)
+            raise Exception(
+                f'Tokenization failed at line {location.line}, column {location.column}: '
+                f'near {source_code[start:(start + 10)]}')
+        else:
+            kinds.append(type_codes[kind])  # type: ignore
+        starts.append(start)
+        lengths.append(end - start)
+    return stream
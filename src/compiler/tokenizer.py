@@ -1,13 +1,15 @@
 import re
-from dataclasses import dataclass
-from typing import Literal
+from dataclasses import dataclass, field
+from typing import Iterator, Literal
+
+from src.compiler.symbols import SymbolTable
 
 TokenType = Literal[
-    "int_literal", "bool_literal", "bool_operators", "operators", "identifier", "parenthesis", "comment", "keyword",
-    "null_literal", "unary_operator", "punctuation", "end"]
+    "int_literal", "bool_literal", "bool_operators", "bool_operator", "operators", "identifier", "parenthesis",
+    "comment", "keyword", "null_literal", "unary_operator", "punctuation", "end"]
 
 
-@dataclass
+@dataclass(slots=True)
 class SourceLocation:
     line: int
     column: int
@@ -22,113 +24,95 @@ class DummyLocation(SourceLocation):  # for skip location validation in test
         return isinstance(other, SourceLocation)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Token:
     type: TokenType
     text: str
     source_location: SourceLocation
-
-
-def add_token(result: list[Token], token_type: TokenType, text: str, line_num: int, column_num: int) -> int:
-    result.append(Token(type=token_type, text=text, source_location=SourceLocation(line=line_num, column=column_num)))
-    return len(text)
-
-
-def tokenize(source_code: str) -> list[Token]:
-    whitespace_rex = re.compile(r'\s+')
-    integer_rex = re.compile(r'[0-9]+')
-    bool_rex = re.compile(r'true|false')
-    bool_operator_rex = re.compile(r'and|or')
-    unary_rex = re.compile(r'not')
-    identifier_rex = re.compile(r'[a-zA-Z_][a-zA-Z0-9_]*')
-    operator_rex = re.compile(r'==|!=|<=|>=|[+\-*/=<>]')
-    parenthesis_rex = re.compile(r'[(){}]')
-    punctuation_rex = re.compile(r'[,:;]')
-    single_line_comment_rex = re.compile(r'//.*?(?:\n|$)')
-    multi_line_comment_rex = re.compile(r'/\*.*?\*/', re.DOTALL)
-    keywords_rex = re.compile(r'if|then|else|while|do|var|return|break|continue|fun')
-    null_rex = re.compile(r'null')
-
-    position = 0
-    line_num = 1
-    column_num = 1
-    result: list[Token] = []
-    in_multi_line_comment = False
-
-    while position < len(source_code):
-
-        match = whitespace_rex.match(source_code, position)
-        if match is not None:
-            if '\n' in match.group():
-                lines = match.group().split('\n')
-                line_num += len(lines) - 1
-                column_num = len(lines[-1]) + 1
-            else:
-                column_num += len(match.group())
-            position = match.end()
+    symbol: int = field(default=-1, compare=False, repr=False)  # symbol ID of an identifier
+
+
+# Comments on their own. There are no string literals, so every '/' outside a comment
+# starts a token and a scan with this pattern agrees with `tokenize` about where comments are.
+comment_pattern = r'//[^\n]*|/\*.*?\*/'
+
+comment_rex = re.compile(comment_pattern, re.DOTALL)
+
+# One alternation of named groups, tried left to right at every position.
+# Comments come before operators so that '//' and '/*' win over '/'.
+# A '/*' without a matching '*/' is reported as an error. Braces are doubled for the f-string.
+token_pattern = rf'''
+    (?P<whitespace>\s+)
+  | (?P<comment>{comment_pattern})
+  | (?P<word>[a-zA-Z_][a-zA-Z0-9_]*)
+  | (?P<int_literal>[0-9]+)
+  | (?P<operators>==|!=|<=|>=|[+\-*=<>]|/(?!\*))
+  | (?P<parenthesis>[(){{}}])
+  | (?P<punctuation>[,:;])
+  | (?P<error>.)
+'''
+
+token_rex = re.compile(token_pattern, re.VERBOSE | re.DOTALL)
+
+# Identifier-shaped words that are classified as something else
+word_types: dict[str, TokenType] = {
+    'if': 'keyword',
+    'then': 'keyword',
+    'else': 'keyword',
+    'while': 'keyword',
+    'do': 'keyword',
+    'var': 'keyword',
+    'return': 'keyword',
+    'break': 'keyword',
+    'continue': 'keyword',
+    'fun': 'keyword',
+    'true': 'bool_literal',
+    'false': 'bool_literal',
+    'and': 'bool_operator',
+    'or': 'bool_operator',
+    'not': 'unary_operator',
+    'null': 'null_literal',
+}
+
+
+def scan(source_code: str, line_num: int = 1) -> Iterator[tuple[TokenType, str, int, int]]:
+    """Yields (type, text, line, column) for every token, skipping whitespace and comments."""
+    line_start = 0
+    for match in token_rex.finditer(source_code):
+        kind = match.lastgroup
+        text = match.group()
+        if kind == 'whitespace' or kind == 'comment':
+            newlines = text.count('\n')
+            if newlines:
+                line_num += newlines
+                line_start = match.start() + text.rindex('\n') + 1
             continue
+        start = match.start()
+        if kind == 'word':
+            yield word_types.get(text, 'identifier'), text, line_num, start - line_start + 1
+        elif kind == 'error':
+            raise Exception(
+                f'Tokenization failed at line {line_num}, column {start - line_start + 1}: '
+                f'near {source_code[start:(start + 10)]}')
+        else:
+            yield kind, text, line_num, start - line_start + 1  # type: ignore
 
-        if not in_multi_line_comment:
-            # Match single-line comments
-            match = single_line_comment_rex.match(source_code, position)
-            if match is not None:
-                # result.append(Token(type='comment', text=match.group(), line=line_num, column=column_num))
-                if '\n' in match.group():
-                    lines = match.group().split('\n')
-                    line_num += len(lines) - 1
-                    column_num = len(lines[-1]) + 1
-                else:
-                    column_num += len(match.group())
-                position = match.end()
-                continue
-
-        # Match multi-line comments
-        match = multi_line_comment_rex.match(source_code, position)
-        if match is not None:
-            if not in_multi_line_comment:
-                in_multi_line_comment = True
-            if '\n' in match.group():  # get all lines
-                lines = match.group().split('\n')
-                for line in lines[:-1]:
-                    line_num += 1
-                    column_num = 1
-                if lines[-1]:  # last line
-                    column_num = len(lines[-1]) - 2
-            else:  # single line
-                column_num += len(match.group())
-            position = match.end() - 2
-            continue
 
-        # Check if multi-line comment ends
-        if in_multi_line_comment:
-            end_match = re.search(r'\*/', source_code[position:])
-            if end_match:
-                end_index = position + end_match.start() + 2  # Move to the end of '*/'
-                line_num += source_code[position:end_index].count('\n')
-                if '\n' in source_code[position:end_index]:
-                    column_num = len(source_code[position:end_index].split('\n')[-1]) + 1
-                else:
-                    column_num += end_match.start()
-                position = end_index
-                in_multi_line_comment = False
-                continue
-            else:
-                position = len(source_code)
-                continue
-
-        # Match tokens and add to result using the add_token function
-        for token_rex, token_type in [(keywords_rex, 'keyword'), (bool_rex, 'bool_literal'),
-                                      (bool_operator_rex, 'bool_operator'), (unary_rex, 'unary_operator'),
-                                      (null_rex, 'null_literal'), (identifier_rex, 'identifier'),
-                                      (integer_rex, 'int_literal'), (operator_rex, 'operators'),
-                                      (parenthesis_rex, 'parenthesis'), (punctuation_rex, 'punctuation')]:
-            match = token_rex.match(source_code, position)
-            if match is not None:
-                column_num += add_token(result, token_type, match.group(), line_num, column_num)
-                position = match.end()
-                break
+def tokenize(source_code: str, symbols: SymbolTable | None = None) -> list[Token]:
+    """Tokenizes a whole source. With `symbols`, identifiers get their IDs from it; otherwise the
+    parser gives them theirs."""
+    if symbols is None:
+        return [Token(type=token_type, text=text, source_location=SourceLocation(line=line, column=column))
+                for token_type, text, line, column in scan(source_code)]
+    result: list[Token] = []
+    ids = symbols.ids
+    for token_type, text, line, column in scan(source_code):
+        location = SourceLocation(line=line, column=column)
+        if token_type == 'identifier':
+            symbol = ids.get(text)
+            if symbol is None:
+                symbol = symbols.intern(text)
+            result.append(Token(type=token_type, text=text, source_location=location, symbol=symbol))
         else:
-            raise Exception(
-                f'Tokenization failed at line {line_num}, column {column_num}: near {source_code[position:(position + 10)]}')
-
+            result.append(Token(type=token_type, text=text, source_location=location))
     return result
@@ -0,0 +1,162 @@
+import gc
+from contextlib import contextmanager
+from types import GeneratorType
+from typing import Any, Callable, Generator, Iterator
+
+from src.compiler import ast
+
+# A handler is called with a node and a context. It returns the node's result, or is a generator
+# that yields (child, context) pairs, is sent each child's result, and returns the node's result.
+Handler = Callable[[Any, Any], Any]
+Visit = Generator[tuple[Any, Any], Any, Any]
+
+# A grammar rule that yields the rules it needs parsed and is sent back their results
+Rule = Generator['Rule', Any, Any]
+
+
+def unsupported(node: Any, context: Any) -> Any:
+    raise Exception(f'Unsupported AST Node: {node}')
+
+
+class DispatchTable(dict[type, Handler]):
+    """Handlers by node class. A class without a handler of its own gets the one of its nearest
+    base class, which is looked up once and then stored for the class."""
+
+    def __missing__(self, cls: type) -> Handler:
+        handler: Handler = unsupported
+        for base in cls.__mro__[1:]:
+            if dict.__contains__(self, base):
+                handler = dict.__getitem__(self, base)
+                break
+        self[cls] = handler
+        return handler
+
+
+def walk(handlers: DispatchTable, node: Any, context: Any) -> Any:
+    """Runs the handler of `node` and the handlers of the children it yields, on an explicit stack
+    instead of the Python call stack, and returns the result for `node`.
+
+    An exception raised for a child is thrown into the handler that yielded it, which may catch it
+    and go on, as a loop does with `break`."""
+    lookup = handlers.__getitem__
+    stack: list[Visit] = []  # the suspended handlers below `top`
+    top: Visit | None = None
+    error: Exception | None = None  # raised for the node last yielded by `top`
+    value = None
+    result = lookup(type(node))(node, context)
+    while True:
+        if error is None:
+            if type(result) is GeneratorType:
+                if top is not None:
+                    stack.append(top)
+                top = result
+                value = None
+            else:
+                value = result
+        while True:
+            if top is None:
+                if error is not None:
+                    raise error
+                return value
+            try:
+                if error is None:
+                    node, context = top.send(value)
+                else:
+                    thrown, error = error, None
+                    node, context = top.throw(thrown)
+                break
+            except StopIteration as stop:
+                value = stop.value
+                top = stack.pop() if stack else None
+            except Exception as raised:
+                error = raised
+                top = stack.pop() if stack else None
+        try:
+            result = lookup(type(node))(node, context)
+        except Exception as raised:
+            error = raised
+
+
+def run(rule: Rule) -> Any:
+    """Drives `rule` and the rules it yields on an explicit stack instead of the Python call stack,
+    and returns the result of `rule`."""
+    stack: list[Rule] = []  # the suspended rules below `top`
+    top = rule
+    value: Any = None
+    while True:
+        try:
+            child = top.send(value)
+        except StopIteration as result:
+            if not stack:
+                return result.value
+            top = stack.pop()
+            value = result.value
+            continue
+        stack.append(top)
+        top = child
+        value = None
+
+
+@contextmanager
+def gc_paused() -> Iterator[None]:
+    """Pauses the cyclic garbage collector, which would otherwise rescan the heap over and over
+    while hundreds of thousands of acyclic AST nodes are built or unpickled."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def no_children(node: Any, context: Any) -> list[Any]:
+    return []
+
+
+# The child nodes of a node in source order
+child_nodes = DispatchTable({
+    ast.Literal: no_children,
+    ast.Identifier: no_children,
+    ast.Operators: no_children,
+    ast.BreakContinue: no_children,
+    ast.TreeOperator: lambda node, _: [node.left, node.right],
+    ast.IfExpression: lambda node, _: ([node.condition, node.then_clause] if node.else_clause is None
+                                       else [node.condition, node.then_clause, node.else_clause]),
+    ast.UnaryOp: lambda node, _: [node.expr],
+    ast.VarDeclaration: lambda node, _: [node.name, node.value],
+    ast.WhileLoop: lambda node, _: [node.condition, node.do_action],
+    ast.Block: lambda node, _: node.statements,
+    ast.FunctionCall: lambda node, _: [node.call, *node.args],
+    ast.Return: lambda node, _: [] if node.value is None else [node.value],
+    ast.FunctionDef: lambda node, _: [node.name, *node.params, node.body],
+    ast.Module: lambda node, _: node.functions if node.expr is None else [*node.functions, node.expr],
+})
+
+
+def children(node: Any) -> list[Any]:
+    return child_nodes[type(node)](node, None)  # type: ignore[no-any-return]
+
+
+def preorder(root: Any) -> Iterator[Any]:
+    """Yields `root` and its descendants, each node before its children."""
+    lookup = child_nodes.__getitem__
+    stack = [root]
+    pop = stack.pop
+    extend = stack.extend
+    while stack:
+        node = pop()
+        yield node
+        extend(reversed(lookup(type(node))(node, None)))
+
+
+def postorder(root: Any) -> Iterator[Any]:
+    """Yields the descendants of `root` and then `root`, each node after its children."""
+    stack: list[tuple[Any, bool]] = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(children(node)))
@@ -1,173 +1,265 @@
 from src.compiler import ast
-from src.compiler.symTab import SymTab, find_context
+from src.compiler.resolver import Frame, store
+from src.compiler.symTab import SymTab, builtin_function_types, find_context
+from src.compiler.traversal import DispatchTable, Visit, walk
 from src.compiler.types import Type, Int, Bool, Unit, FunctionType
 
 
 def typecheck(node: ast.Expression | None, symtab: SymTab) -> Type:
-    def set_node_type(node: ast.Expression, type: Type) -> Type:
-        node.type = type
-        return type
-
-    match node:
-        case ast.Literal():
-            if isinstance(node.value, bool):
-                return set_node_type(node, Bool)
-            elif isinstance(node.value, int):
-                return set_node_type(node, Int)
-            elif node.value is None:
-                return set_node_type(node, Unit)
-            else:
-                raise Exception(f"Can not determine the type of literal {node.value} at {node.location.__str__()}")
-
-        case ast.TreeOperator():
-            l = typecheck(node.left, symtab)
-            r = typecheck(node.right, symtab)
-
-            if node.operator in ['+', '-', '*', '/']:
-                if l is not Int or r is not Int:
-                    raise Exception(
-                        f"Operator {node.operator} expected two Ints, got {l} and {r} at {node.location.__str__()}")
-                else:
-                    return set_node_type(node, Int)
-
-            elif node.operator in ['<', '>', '<=', '>=']:
-                if l is not Int or r is not Int:
-                    raise Exception(
-                        f"Operator {node.operator} expected two Ints, got {l} and {r} at {node.location.__str__()}")
-                else:
-                    return set_node_type(node, Bool)
-
-            elif node.operator in ['or', 'and']:
-                if l is not Bool or r is not Bool:
-                    raise Exception(
-                        f"Operator {node.operator} expected two Bool, got {l} and {r} at {node.location.__str__()}")
-                else:
-                    return set_node_type(node, Bool)
-
-            elif node.operator in ['==', '!=']:
-                if l not in [Int, Bool] or r not in [Int, Bool]:
-                    raise Exception(
-                        f'Types must be either Int or Bool at {node.location.__str__()}')
-                if l != r:
-                    raise Exception(
-                        f'Types {l} and {r} do not match at {node.location.__str__()}')
-                else:
-                    return set_node_type(node, Bool)
-
-            elif node.operator == '=':
-                if l != r:
-                    raise Exception(
-                        f'Types {l} and {r} do not match at {node.location.__str__()}')
-                else:
-                    return set_node_type(node, l)
-
-            else:
-                raise Exception(f"Unknown operator {node.operator} at {node.location.__str__()}")
-
-        case ast.IfExpression():
-            con = typecheck(node.condition, symtab)
-            if con is not Bool:
-                raise Exception(f"'If' statement condition was {con} at {node.location.__str__()} ")
-            then_cl = typecheck(node.then_clause, symtab)
-            if node.else_clause is None:
-                return set_node_type(node, Unit)
-            else_cl = typecheck(node.else_clause, symtab)
-            if then_cl != else_cl:
-                raise Exception(
-                    f"'then' and 'else' having different types: {then_cl} and {else_cl} at {node.location.__str__()}")
-            return set_node_type(node, then_cl)
-
-        case ast.Identifier():
-            context = find_context(symtab, node.name)
-            if context is not None:
-                return context.locals[node.name]
-            else:
-                raise Exception(f'Unknown identifier {node.name}')
-
-        case ast.VarDeclaration():
-            if node.name.name in symtab.locals:
-                raise Exception(
-                    f'Variable {node.name.name} has already been declared')
-
-            value_type = typecheck(node.value, symtab)
-
-            if node.var_type is None:
-                symtab.locals[node.name.name] = value_type
-                return set_node_type(node, Unit)
-
-            elif isinstance(node.var_type, ast.TypeInt):
-                if value_type != Int:
-                    raise Exception(
-                        f'{node.location}: type error, expected Int')
-                symtab.locals[node.name.name] = Int
-                return set_node_type(node, Int)
-
-            elif isinstance(node.var_type, ast.TypeBool):
-                if value_type != Bool:
-                    raise Exception(
-                        f'{node.location}: type error, expected Bool')
-                symtab.locals[node.name.name] = Bool
-                return set_node_type(node, Bool)
-
-            else:
-                raise Exception(f'{node.location}: unknown type {node.type}')
-
-        case ast.UnaryOp():
-            value_type = typecheck(node.expr, symtab)
-
-            if node.operator == 'not' and value_type is not Bool:
-                raise Exception(
-                    f'Expected type Bool, got {value_type} at {node.location.__str__()}')
-            elif node.operator == '-' and value_type is not Int:
-                raise Exception(
-                    f'Expected type Int, got {value_type} at {node.location.__str__()}')
-            return set_node_type(node, value_type)
-
-        case ast.Block():
-            context = symtab
-            if symtab.parent is not None:
-                context = SymTab(locals={}, parent=symtab)
-
-            for statement in node.statements:
-                typecheck(statement, context)
-
-            return set_node_type(node, Unit)
-
-        case ast.FunctionCall():
-            args = []
-            return_type = Unit
-
-            for arg in node.args:
-                arg_type = typecheck(arg, symtab)
-                args.append(arg_type)
-
-            if node.name is not None:
-                fun_type = FunctionType(args, return_type)
-                symtab.locals[node.name.name] = fun_type
-                return set_node_type(node, fun_type)
-            else:
-                raise Exception(f'Function call has no name at {node.location.__str__()}')
-
-        case ast.WhileLoop():
-            condition = typecheck(node.condition, symtab)
-            if condition is not Bool:
-                raise Exception(
-                    f'{node.location}: while loop condition must be type Bool, got {condition} at {node.location.__str__()}')
-
-            typecheck(node.do_action, symtab)
-
-            return set_node_type(node, Unit)
-
-        case ast.BreakContinue():
-            return set_node_type(node, Unit)
-
-        # case ast.Return():
-        #     if node.value is None:
-        #         return set_node_type(node, Unit)
-        #     return set_node_type(node.value, symtab)
-
-        case _:
-            raise Exception(f"Unsupported TAS Node {node} at {node.location.__str__()}")
-
-# TODO Add type error exceptions separately
-# Add type to AST node
+    """Typechecks resolved top-level expressions, with `symtab` as the scope of the names that are not local."""
+    return walk(typecheck_handlers, node, Frame(slots=[], globals=symtab))  # type: ignore[no-any-return]
+
+
+arithmetic_operators = frozenset(['+', '-', '*', '/'])
+comparison_operators = frozenset(['<', '>', '<=', '>='])
+logical_operators = frozenset(['or', 'and'])
+equality_operators = frozenset(['==', '!='])
+
+
+def set_node_type(node: ast.Expression, type: Type) -> Type:
+    node.type = type
+    return type
+
+
+def typecheck_literal(node: ast.Literal, frame: Frame) -> Type:
+    if isinstance(node.value, bool):
+        return set_node_type(node, Bool)
+    elif isinstance(node.value, int):
+        return set_node_type(node, Int)
+    elif node.value is None:
+        return set_node_type(node, Unit)
+    else:
+        raise Exception(f"Can not determine the type of literal {node.value} at {node.location.__str__()}")
+
+
+def typecheck_tree_operator(node: ast.TreeOperator, frame: Frame) -> Visit:
+    l = yield node.left, frame
+    r = yield node.right, frame
+    return tree_operator_type(node, l, r)
+
+
+def tree_operator_type(node: ast.TreeOperator, l: Type, r: Type) -> Type:
+    """Like the other `*_type` and `check_*` functions, applies the rule of one node to the types of
+    its children, so that `generate_ir` can typecheck a tree in its own walk."""
+    if node.operator in arithmetic_operators:
+        if l is not Int or r is not Int:
+            raise Exception(
+                f"Operator {node.operator} expected two Ints, got {l} and {r} at {node.location.__str__()}")
+        else:
+            return set_node_type(node, Int)
+
+    elif node.operator in comparison_operators:
+        if l is not Int or r is not Int:
+            raise Exception(
+                f"Operator {node.operator} expected two Ints, got {l} and {r} at {node.location.__str__()}")
+        else:
+            return set_node_type(node, Bool)
+
+    elif node.operator in logical_operators:
+        if l is not Bool or r is not Bool:
+            raise Exception(
+                f"Operator {node.operator} expected two Bool, got {l} and {r} at {node.location.__str__()}")
+        else:
+            return set_node_type(node, Bool)
+
+    elif node.operator in equality_operators:
+        if l is not Int and l is not Bool:
+            raise Exception(
+                f'Types must be either Int or Bool at {node.location.__str__()}')
+        if l is not r:
+            raise Exception(
+                f'Types {l} and {r} do not match at {node.location.__str__()}')
+        else:
+            return set_node_type(node, Bool)
+
+    elif node.operator == '=':
+        if l is not r:
+            raise Exception(
+                f'Types {l} and {r} do not match at {node.location.__str__()}')
+        else:
+            return set_node_type(node, l)
+
+    else:
+        raise Exception(f"Unknown operator {node.operator} at {node.location.__str__()}")
+
+
+def typecheck_if_expression(node: ast.IfExpression, frame: Frame) -> Visit:
+    check_if_condition(node, (yield node.condition, frame))
+    then_cl = yield node.then_clause, frame
+    else_cl = None if node.else_clause is None else (yield node.else_clause, frame)
+    return if_expression_type(node, then_cl, else_cl)
+
+
+def check_if_condition(node: ast.IfExpression, con: Type) -> None:
+    if con is not Bool:
+        raise Exception(f"'If' statement condition was {con} at {node.location.__str__()} ")
+
+
+def if_expression_type(node: ast.IfExpression, then_cl: Type, else_cl: Type | None) -> Type:
+    if else_cl is None:
+        return set_node_type(node, Unit)
+    if then_cl is not else_cl:
+        raise Exception(
+            f"'then' and 'else' having different types: {then_cl} and {else_cl} at {node.location.__str__()}")
+    return set_node_type(node, then_cl)
+
+
+def typecheck_identifier(node: ast.Identifier, frame: Frame) -> Type:
+    # Not stored in the node: the parser may share one variable node between scopes
+    if node.slot >= 0:
+        return frame.slots[node.slot]  # type: ignore[no-any-return]
+    return global_type(node, frame.globals)
+
+
+def global_type(node: ast.Identifier, symtab: SymTab) -> Type:
+    symbol = symtab.key(node.key)
+    context = find_context(symtab, symbol)
+    if context is not None:
+        return context.locals[symbol]  # type: ignore[no-any-return]
+    else:
+        raise Exception(f'Unknown identifier {node.name}')
+
+
+def typecheck_var_declaration(node: ast.VarDeclaration, frame: Frame) -> Visit:
+    value_type = yield node.value, frame
+    store(frame.slots, node.name.slot, var_declaration_type(node, value_type))
+    return node.type
+
+
+def var_declaration_type(node: ast.VarDeclaration, value_type: Type) -> Type:
+    """Checks the value against the declared type and sets the type of the declaration.
+    Returns the type of the variable."""
+    if node.var_type is None:
+        set_node_type(node, Unit)
+        return value_type
+
+    elif isinstance(node.var_type, ast.TypeInt):
+        if value_type is not Int:
+            raise Exception(
+                f'{node.location}: type error, expected Int')
+        return set_node_type(node, Int)
+
+    elif isinstance(node.var_type, ast.TypeBool):
+        if value_type is not Bool:
+            raise Exception(
+                f'{node.location}: type error, expected Bool')
+        return set_node_type(node, Bool)
+
+    else:
+        raise Exception(f'{node.location}: unknown type {node.type}')
+
+
+def typecheck_unary_op(node: ast.UnaryOp, frame: Frame) -> Visit:
+    return unary_op_type(node, (yield node.expr, frame))
+
+
+def unary_op_type(node: ast.UnaryOp, value_type: Type) -> Type:
+    if node.operator == 'not' and value_type is not Bool:
+        raise Exception(
+            f'Expected type Bool, got {value_type} at {node.location.__str__()}')
+    elif node.operator == '-' and value_type is not Int:
+        raise Exception(
+            f'Expected type Int, got {value_type} at {node.location.__str__()}')
+    return set_node_type(node, value_type)
+
+
+def typecheck_block(node: ast.Block, frame: Frame) -> Visit:
+    for statement in node.statements:
+        yield statement, frame
+
+    return set_node_type(node, Unit)
+
+
+def typecheck_function_call(node: ast.FunctionCall, frame: Frame) -> Visit:
+    arg_types = []
+    for arg in node.args:
+        arg_type = yield arg, frame
+        arg_types.append(arg_type)
+    return function_call_type(node, tuple(arg_types), frame.globals)
+
+
+def function_call_type(node: ast.FunctionCall, args: tuple[Type, ...], symtab: SymTab) -> Type:
+    if node.call is None:
+        raise Exception(f'Function call has no name at {node.location.__str__()}')
+    fun_type = symtab.require(node.call.key)
+    if fun_type is None and node.call.name in builtin_function_types:
+        # The builtins take any value, as before: print_int(true) prints 1
+        return set_node_type(node, builtin_function_types[node.call.name].return_type)
+    if not isinstance(fun_type, FunctionType):
+        raise Exception(f'Unknown function {node.call.name} at {node.location.__str__()}')
+    if args != fun_type.params:
+        raise Exception(
+            f'Function {node.call.name} expected arguments {fun_type.params}, got {args} at {node.location.__str__()}')
+    return set_node_type(node, fun_type.return_type)
+
+
+def typecheck_while_loop(node: ast.WhileLoop, frame: Frame) -> Visit:
+    check_loop_condition(node, (yield node.condition, frame))
+    yield node.do_action, frame
+    return set_node_type(node, Unit)
+
+
+def check_loop_condition(node: ast.WhileLoop, condition: Type) -> None:
+    if condition is not Bool:
+        raise Exception(
+            f'{node.location}: while loop condition must be type Bool, got {condition} at {node.location.__str__()}')
+
+
+def typecheck_break_continue(node: ast.BreakContinue, frame: Frame) -> Type:
+    return set_node_type(node, Unit)
+
+
+def typecheck_return(node: ast.Return, frame: Frame) -> Visit:
+    value_type = Unit if node.value is None else (yield node.value, frame)
+    return return_value_type(node, value_type, frame.return_type)
+
+
+def return_value_type(node: ast.Return, value_type: Type, return_type: Type | None) -> Type:
+    if return_type is None:
+        raise Exception(f'Return outside of a function at {node.location.__str__()}')
+    if value_type is not return_type:
+        raise Exception(
+            f'Expected return type {return_type}, got {value_type} at {node.location.__str__()}')
+    return set_node_type(node, value_type)
+
+
+typecheck_handlers = DispatchTable({
+    ast.Literal: typecheck_literal,
+    ast.TreeOperator: typecheck_tree_operator,
+    ast.IfExpression: typecheck_if_expression,
+    ast.Identifier: typecheck_identifier,
+    ast.VarDeclaration: typecheck_var_declaration,
+    ast.UnaryOp: typecheck_unary_op,
+    ast.Block: typecheck_block,
+    ast.FunctionCall: typecheck_function_call,
+    ast.WhileLoop: typecheck_while_loop,
+    ast.BreakContinue: typecheck_break_continue,
+    ast.Return: typecheck_return,
+})
+
+
+def typecheck_function(fun: ast.FunctionDef, symtab: SymTab) -> FunctionType:
+    """Declares `fun` in `symtab`, then typechecks its body with the parameters in scope."""
+    fun_type = declare_function(fun, symtab)
+    typecheck_body(fun, symtab)
+    return fun_type
+
+
+def typecheck_body(fun: ast.FunctionDef, symtab: SymTab) -> None:
+    """Typechecks the body of a declared function."""
+    frame = Frame(slots=[], globals=symtab, return_type=fun.return_type)
+    for param, param_type in zip(fun.params, fun.param_types):
+        store(frame.slots, param.slot, param_type)
+    walk(typecheck_handlers, fun.body, frame)
+
+
+def declare_function(fun: ast.FunctionDef, symtab: SymTab) -> FunctionType:
+    """Adds the type of `fun` to `symtab` and sets the types of its parameters."""
+    fun_type = FunctionType(tuple(fun.param_types), fun.return_type)
+    symbol = symtab.key(fun.name.key)
+    if symbol in symtab.locals:
+        raise Exception(f'{fun.name.name} is already defined')
+    symtab.add_local(symbol, fun_type)
+    for param, param_type in zip(fun.params, fun.param_types):
+        param.type = param_type
+    return fun_type
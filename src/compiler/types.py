@@ -1,19 +1,41 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from typing import Any
 
 
-@dataclass(frozen=True)
-class Type:
+class Interned(type):
+    """Metaclass that gives one instance per distinct value, so that types compare and hash by identity.
+    List arguments are taken as tuples."""
+    def __call__(cls, *args: Any, **kwargs: Any) -> Any:
+        if kwargs:
+            args += tuple(kwargs.pop(field.name) for field in fields(cls)[len(args):])  # type: ignore[arg-type]
+        key = (cls, *(tuple(arg) if isinstance(arg, list) else arg for arg in args))
+        instance = interned.get(key)
+        if instance is None:
+            instance = interned[key] = super().__call__(*key[1:])
+        return instance
+
+
+# Every type created so far, by class and field values
+interned: dict[tuple[Any, ...], Any] = {}
+
+
+@dataclass(frozen=True, eq=False)
+class Type(metaclass=Interned):
     """Base class of the main types"""
 
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Unpickled through the constructor, to get the interned instance of this process
+        return type(self), tuple(getattr(self, field.name) for field in fields(self))
+
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class BasicType(Type):
     name: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, eq=False)
 class FunctionType(Type):
-    params: list[BasicType]
+    params: tuple[BasicType, ...]
     return_type: BasicType
 
 
@@ -22,10 +44,10 @@ Bool = BasicType('Bool')
 Unit = BasicType('Unit')
 
 # Function types
-Arithmetic = FunctionType([Int, Int], Int)
-Comparison = FunctionType([Int, Int], Bool)
-Logical = FunctionType([Bool, Bool], Bool)
+Arithmetic = FunctionType((Int, Int), Int)
+Comparison = FunctionType((Int, Int), Bool)
+Logical = FunctionType((Bool, Bool), Bool)
 
-PrintInt = FunctionType([Int], Unit)
-PrintBool = FunctionType([Bool], Unit)
-ReadInt = FunctionType([], Int)
+PrintInt = FunctionType((Int,), Unit)
+PrintBool = FunctionType((Bool,), Unit)
+ReadInt = FunctionType((), Int)
@@ -0,0 +1,298 @@
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator
+
+from src.compiler import ir
+from src.compiler.ir_interpreter import ir_builtins
+
+# Opcodes, each followed in the code by its operands: register numbers, constants, offsets in the
+# code of the function, indices of builtins and functions, and argument counts
+(CONST, COPY, ADD, SUB, MUL, DIV, EQ, NE, LT, LE, GT, GE, JUMP_EQ, JUMP_NE, JUMP_LT, JUMP_LE, JUMP_GT, JUMP_GE,
+ BUILTIN_1, BUILTIN_2, BUILTIN, CALL, JUMP, COND_JUMP, RETURN, END) = range(26)
+
+opcode_names = ['CONST', 'COPY', 'ADD', 'SUB', 'MUL', 'DIV', 'EQ', 'NE', 'LT', 'LE', 'GT', 'GE', 'JUMP_EQ', 'JUMP_NE',
+                'JUMP_LT', 'JUMP_LE', 'JUMP_GT', 'JUMP_GE', 'BUILTIN_1', 'BUILTIN_2', 'BUILTIN', 'CALL', 'JUMP',
+                'COND_JUMP', 'RETURN', 'END']
+
+# Operands of each opcode; BUILTIN and CALL have one per argument more
+operand_counts = [2, 2, 3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 4, 4, 4, 4, 4, 4, 3, 4, 3, 3, 1, 3, 1, 0]
+
+# The intrinsics run in the dispatch loop rather than called
+binary_opcodes = {'+': ADD, '-': SUB, '*': MUL, '/': DIV, '==': EQ, '!=': NE, '<': LT, '<=': LE, '>': GT, '>=': GE}
+
+# Comparisons followed by a branch on their result, fused
+compare_jumps = {EQ: JUMP_EQ, NE: JUMP_NE, LT: JUMP_LT, LE: JUMP_LE, GT: JUMP_GT, GE: JUMP_GE}
+
+
+@dataclass
+class BytecodeFunction:
+    name: str
+    code: 'array[int]' = field(default_factory=lambda: array('q'))
+    registers: list[Any] = field(default_factory=list)  # the register file a call starts with
+    params: int = 0  # passed in the first registers
+
+
+@dataclass
+class Bytecode:
+    functions: list[BytecodeFunction]
+    builtins: list[Callable[..., Any]]  # the ones the functions call, by the index in their code
+    main: int  # index of 'main'
+
+
+def compile_bytecode(functions: dict[str, list[ir.Instruction]],
+                     builtins: dict[str, Callable[..., Any]] = ir_builtins) -> Bytecode:
+    """Compiles the output of `generate_ir`, or of several such outputs merged, for `run_bytecode`.
+    Calls go to `builtins` first, as in `run_ir`, except that the arithmetic and comparison
+    intrinsics are always computed by the VM."""
+    index = {name: i for i, name in enumerate(functions)}
+    used: list[Callable[..., Any]] = []
+    builtin_index: dict[str, int] = {}
+
+    def builtin(name: str) -> int:
+        if name not in builtin_index:
+            builtin_index[name] = len(used)
+            used.append(builtins[name])
+        return builtin_index[name]
+
+    compiled = [compile_function(name, instructions, index, builtins, builtin)
+                for name, instructions in functions.items()]
+    return Bytecode(compiled, used, index['main'])
+
+
+def compile_function(name: str, instructions: list[ir.Instruction], functions: dict[str, int],
+                     builtins: dict[str, Callable[..., Any]], builtin: Callable[[str], int]) -> BytecodeFunction:
+    """Translates one function. A constant loaded into a variable that is set nowhere else starts
+    in its register and takes no instruction, and a temporary that is only copied into a variable
+    or branched on is not written at all: the copy or the branch is fused into the instruction
+    that computes it. Code that follows a jump or return before the next label is dropped."""
+    fun = BytecodeFunction(name)
+    code = fun.code
+    registers: dict[ir.IRVar, int] = {}
+
+    def register(var: ir.IRVar) -> int:
+        number = registers.get(var)
+        if number is None:
+            number = registers[var] = len(registers)
+        return number
+
+    writes: dict[ir.IRVar, int] = {}
+    reads: dict[ir.IRVar, int] = {}
+    for ins in instructions:
+        match ins:
+            case ir.Call():
+                for arg in ins.args:
+                    reads[arg] = reads.get(arg, 0) + 1
+            case ir.Copy():
+                reads[ins.source] = reads.get(ins.source, 0) + 1
+            case ir.CondJump():
+                reads[ins.cond] = reads.get(ins.cond, 0) + 1
+            case ir.Return():
+                reads[ins.value] = reads.get(ins.value, 0) + 1
+        dest = getattr(ins, 'dest', None)
+        if dest is not None:
+            writes[dest] = writes.get(dest, 0) + 1
+        if isinstance(ins, (ir.LoadIntParam, ir.LoadBoolParam)):
+            register(ins.dest)  # parameters first, in order
+            fun.params += 1
+
+    def temporary(var: ir.IRVar) -> bool:
+        return reads.get(var) == 1 and writes[var] == 1
+
+    constants: dict[int, int] = {}
+    labels: dict[str, int] = {}
+    fixups: list[tuple[int, str]] = []  # offsets of jump targets, and their labels
+
+    def target(label: ir.Label) -> None:
+        fixups.append((len(code), label.name))
+        code.append(-1)
+
+    def falls_through(i: int, label: ir.Label) -> bool:
+        # Whether the instructions after i up to `label` are all labels
+        for ins in instructions[i + 1:]:
+            if not isinstance(ins, ir.Label):
+                return False
+            if ins.name == label.name:
+                return True
+        return False
+
+    reachable = True
+    i = 0
+    while i < len(instructions):
+        ins = instructions[i]
+        following = instructions[i + 1] if i + 1 < len(instructions) else None
+        i += 1
+        if isinstance(ins, ir.Label):
+            labels[ins.name] = len(code)
+            reachable = True
+            continue
+        if not reachable:
+            continue
+        match ins:
+            case ir.LoadIntParam() | ir.LoadBoolParam():
+                pass
+            case ir.LoadIntConst() | ir.LoadBoolConst():
+                if writes[ins.dest] == 1:
+                    constants[register(ins.dest)] = int(ins.value)
+                else:
+                    code.extend((CONST, int(ins.value), register(ins.dest)))
+            case ir.Copy():
+                if ins.source != ins.dest:
+                    code.extend((COPY, register(ins.source), register(ins.dest)))
+            case ir.Call():
+                dest = ins.dest
+                if isinstance(following, ir.Copy) and following.source == dest and temporary(dest):
+                    dest = following.dest
+                    i += 1
+                args = [register(arg) for arg in ins.args]
+                op = binary_opcodes.get(ins.func.name, -1)
+                if op >= 0 and len(args) == 2:
+                    if op in compare_jumps and isinstance(following, ir.CondJump) and following.cond == dest \
+                            and temporary(dest):
+                        code.extend((compare_jumps[op], args[0], args[1]))
+                        target(following.then_label)
+                        target(following.else_label)
+                        i += 1
+                        reachable = False
+                    else:
+                        code.extend((op, args[0], args[1], register(dest)))
+                elif ins.func.name in builtins and len(args) == 1:
+                    code.extend((BUILTIN_1, builtin(ins.func.name), args[0], register(dest)))
+                elif ins.func.name in builtins and len(args) == 2:
+                    code.extend((BUILTIN_2, builtin(ins.func.name), args[0], args[1], register(dest)))
+                elif ins.func.name in builtins:
+                    code.extend((BUILTIN, builtin(ins.func.name), len(args), *args, register(dest)))
+                elif ins.func.name in functions:
+                    code.extend((CALL, functions[ins.func.name], len(args), *args, register(dest)))
+                else:
+                    raise Exception(f'{ins.location}: unknown function {ins.func.name}')
+            case ir.Jump():
+                if not falls_through(i - 1, ins.label):
+                    code.append(JUMP)
+                    target(ins.label)
+                reachable = False
+            case ir.CondJump():
+                code.extend((COND_JUMP, register(ins.cond)))
+                target(ins.then_label)
+                target(ins.else_label)
+                reachable = False
+            case ir.Return():
+                code.extend((RETURN, register(ins.value)))
+                reachable = False
+            case _:
+                raise Exception(f'Unknown Instruction : {type(ins)}')
+    code.append(END)
+
+    for offset, label in fixups:
+        code[offset] = labels[label]
+    fun.registers = [None] * len(registers)
+    for number, value in constants.items():
+        fun.registers[number] = value
+    return fun
+
+
+def disassemble(fun: BytecodeFunction) -> Iterator[tuple[int, str, list[int]]]:
+    """Yields the offset, opcode name and operands of each instruction of `fun`."""
+    code = fun.code
+    pc = 0
+    while pc < len(code):
+        op = code[pc]
+        count = operand_counts[op] + (code[pc + 2] if op in (BUILTIN, CALL) else 0)
+        yield pc, opcode_names[op], list(code[pc + 1:pc + 1 + count])
+        pc += 1 + count
+
+
+def run_bytecode(bytecode: Bytecode) -> Any:
+    """Runs 'main' like `run_ir` does, and returns what it returns.
+
+    Calls run on a stack of frames here rather than on the Python stack."""
+    functions = bytecode.functions
+    builtins = bytecode.builtins
+    codes = [fun.code.tolist() for fun in functions]  # lists index faster than arrays
+    code = codes[bytecode.main]
+    regs = functions[bytecode.main].registers[:]
+    pc = 0
+    frames: list[tuple[list[int], list[Any], int]] = []  # the callers, at the dest of their call
+
+    while True:
+        op = code[pc]
+        if op == JUMP_LT:
+            pc = code[pc + 3] if regs[code[pc + 1]] < regs[code[pc + 2]] else code[pc + 4]
+        elif op == ADD:
+            regs[code[pc + 3]] = regs[code[pc + 1]] + regs[code[pc + 2]]
+            pc += 4
+        elif op == SUB:
+            regs[code[pc + 3]] = regs[code[pc + 1]] - regs[code[pc + 2]]
+            pc += 4
+        elif op == JUMP:
+            pc = code[pc + 1]
+        elif op == JUMP_EQ:
+            pc = code[pc + 3] if regs[code[pc + 1]] == regs[code[pc + 2]] else code[pc + 4]
+        elif op == JUMP_GT:
+            pc = code[pc + 3] if regs[code[pc + 1]] > regs[code[pc + 2]] else code[pc + 4]
+        elif op == JUMP_LE:
+            pc = code[pc + 3] if regs[code[pc + 1]] <= regs[code[pc + 2]] else code[pc + 4]
+        elif op == JUMP_GE:
+            pc = code[pc + 3] if regs[code[pc + 1]] >= regs[code[pc + 2]] else code[pc + 4]
+        elif op == JUMP_NE:
+            pc = code[pc + 3] if regs[code[pc + 1]] != regs[code[pc + 2]] else code[pc + 4]
+        elif op == MUL:
+            regs[code[pc + 3]] = regs[code[pc + 1]] * regs[code[pc + 2]]
+            pc += 4
+        elif op == COPY:
+            regs[code[pc + 2]] = regs[code[pc + 1]]
+            pc += 3
+        elif op == DIV:
+            a = regs[code[pc + 1]]
+            b = regs[code[pc + 2]]
+            q = a // b
+            regs[code[pc + 3]] = q + 1 if q < 0 and q * b != a else q  # rounded towards zero, like `divide`
+            pc += 4
+        elif op == COND_JUMP:
+            pc = code[pc + 2] if regs[code[pc + 1]] else code[pc + 3]
+        elif op == BUILTIN_2:
+            regs[code[pc + 4]] = builtins[code[pc + 1]](regs[code[pc + 2]], regs[code[pc + 3]])
+            pc += 5
+        elif op == BUILTIN_1:
+            regs[code[pc + 3]] = builtins[code[pc + 1]](regs[code[pc + 2]])
+            pc += 4
+        elif op == CALL:
+            argc = code[pc + 2]
+            callee = functions[code[pc + 1]]
+            frames.append((code, regs, pc + 3 + argc))
+            args = [regs[arg] for arg in code[pc + 3:pc + 3 + argc]]
+            code = codes[code[pc + 1]]
+            regs = callee.registers[:]
+            regs[:argc] = args
+            pc = 0
+        elif op == RETURN or op == END:
+            value = regs[code[pc + 1]] if op == RETURN else None
+            if not frames:
+                return value
+            code, regs, pc = frames.pop()
+            regs[code[pc]] = value
+            pc += 1
+        elif op == CONST:
+            regs[code[pc + 2]] = code[pc + 1]
+            pc += 3
+        elif op == BUILTIN:
+            argc = code[pc + 2]
+            regs[code[pc + 3 + argc]] = builtins[code[pc + 1]](*[regs[arg] for arg in code[pc + 3:pc + 3 + argc]])
+            pc += 4 + argc
+        elif op == EQ:
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] == regs[code[pc + 2]] else 0
+            pc += 4
+        elif op == NE:
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] != regs[code[pc + 2]] else 0
+            pc += 4
+        elif op == LT:
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] < regs[code[pc + 2]] else 0
+            pc += 4
+        elif op == LE:
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] <= regs[code[pc + 2]] else 0
+            pc += 4
+        elif op == GT:
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] > regs[code[pc + 2]] else 0
+            pc += 4
+        else:  # GE
+            regs[code[pc + 3]] = 1 if regs[code[pc + 1]] >= regs[code[pc + 2]] else 0
+            pc += 4
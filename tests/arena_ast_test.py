@@ -0,0 +1,103 @@
+import pickle
+
+from src.compiler import ast
+from src.compiler.arena_ast import bind_symbols, pack, unpack, view
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.symbols import SymbolTable
+from src.compiler.tokenizer import tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+from src.compiler.types import Bool, Int
+
+source = '''
+fun square(x: Int): Int {
+    return x * x;
+}
+fun pick(b: Bool, x: Int, y: Int): Int {
+    if b then { return x } else { return y }
+}
+fun noop() { }
+{
+    var a: Int = -square(3);
+    var done = false;
+    while not done do {
+        a = a + 1;
+        if a >= 0 or a == 5 then { done = true; break } else { continue };
+    }
+    print_int(pick(true, a, 2));
+}
+'''
+
+
+def test_pack_unpack() -> None:
+    symbols = SymbolTable()
+    module = parse_module(tokenize(source), symbols=symbols)
+    arena = pack(module)
+    bind_symbols(arena, symbols)
+    assert unpack(view(arena)) == module
+    assert [node.symbol for node in [unpack(view(arena)).functions[1].name, module.functions[1].name]] == \
+        [symbols.ids['pick']] * 2
+
+    loaded = pickle.loads(pickle.dumps(arena))
+    try:
+        unpack(view(loaded))
+        assert False, 'Read symbols of another table'
+    except Exception as e:
+        assert 'bind_symbols' in str(e)
+    other = SymbolTable()
+    other.intern('unrelated')
+    bind_symbols(loaded, other)
+    assert unpack(view(loaded)) == module
+    assert view(loaded).functions[1].name.symbol == other.ids['pick'] != symbols.ids['pick']
+
+
+def test_pack_deep_nesting() -> None:
+    depth = 100_000
+    arena = pack(parse_module(tokenize('{' * depth + '1' + '}' * depth)))
+    bind_symbols(arena, SymbolTable())
+    for root in [view(arena), unpack(view(arena))]:
+        node = root.expr
+        for _ in range(depth):
+            node = node.statements[0]
+        assert unpack(node.statements) == [ast.Literal(node.statements[0].location, 1)]
+
+
+def test_view_fields() -> None:
+    arena = pack(parse_module(tokenize(source)))
+    bind_symbols(arena, SymbolTable())
+    module = view(arena)
+    square = module.functions[0]
+    assert isinstance(square, ast.FunctionDef)
+    assert square.name.name == 'square'
+    assert [param.name for param in square.params] == ['x']
+    assert square.param_types[0] is Int
+    assert square.location.line == 2
+
+    statements = module.expr.statements[0].statements
+    assert isinstance(statements[0], ast.VarDeclaration)
+    assert isinstance(statements[0].var_type, ast.TypeInt)
+    assert isinstance(statements[0].value, ast.UnaryOp)
+    assert statements[0].value.operator == '-'
+    assert statements[1].value.value is False
+    assert isinstance(statements[2], ast.WhileLoop)
+
+
+def test_typecheck_and_generate_ir_through_views() -> None:
+    module = parse_module(tokenize(source))
+    arena = pickle.loads(pickle.dumps(pack(module)))
+    symtab = SymTab(locals={}, parent=None)
+    view_symtab = SymTab(locals={}, parent=None)
+    bind_symbols(arena, view_symtab.symbols)
+    module_view = view(arena)
+    for fun, fun_view in zip(module.functions, module_view.functions):
+        assert typecheck_function(fun, symtab) == typecheck_function(fun_view, view_symtab)
+        assert str(generate_ir(root_types, fun_view)) == str(generate_ir(root_types, fun))
+    assert module.expr is not None
+    typecheck(module.expr, symtab)
+    typecheck(module_view.expr, view_symtab)
+    assert str(generate_ir(root_types, module_view.expr)) == str(generate_ir(root_types, module.expr))
+
+    # The types set through the views are in the arena
+    assert unpack(module_view) == module
+    assert module_view.expr.statements[0].statements[1].value.type is Bool
@@ -1,10 +1,15 @@
 import os
 import subprocess
 
+import pytest
+
 from src.compiler.assembler import assemble
 from src.compiler.assembly_generator import generate_assembly
+from src.compiler.ir import Instruction
 from src.compiler.ir_generator import generate_ir
+from src.compiler.ir_interpreter import run_ir
 from src.compiler.parser import parser
+from src.compiler.pipeline import compile_stream, lower_stream
 from src.compiler.symTab import SymTab, root_types
 from src.compiler.tokenizer import tokenize
 from src.compiler.type_checker import typecheck
@@ -40,3 +45,27 @@ def test_generate_ir_var() -> None:
         assert output.strip() == '1'
     else:
         raise Exception(f'Test failed')
+
+
+def test_run_ir_like_executable(capsys: pytest.CaptureFixture[str]) -> None:
+    code = '''
+    fun fib(n: Int): Int { if n < 2 then { return n } else { return fib(n - 1) + fib(n - 2) } }
+    {
+        var x = true;
+        print_int(x);
+        print_int(0 - 7 / 2);
+        var i = 0;
+        while not (i >= 3) do { print_bool(i == 1); i = i + 1 };
+        print_int(-i);
+        print_int(fib(15))
+    }
+    '''
+    instructions: dict[str, list[Instruction]] = {}
+    for irs in lower_stream(tokenize(code)):
+        instructions.update(irs)
+
+    assemble(compile_stream(tokenize(code)), 'compile_program')
+    proc = subprocess.run([f'{os.getcwd()}/compile_program'], capture_output=True, text=True)
+    run_ir(instructions)
+    assert capsys.readouterr().out == proc.stdout == '1\n-3\nfalse\ntrue\nfalse\n-3\n610\n'
+
@@ -0,0 +1,84 @@
+import io
+import sys
+
+import pytest
+
+from benchmarks.resolver_bench import loop_template
+from src.compiler.__main__ import main
+from src.compiler.closure_interpreter import compile_closures, interpret_closures, interpret_closures_module
+from src.compiler.interpreter import interpret, interpret_module
+from src.compiler.parser import parser, parse_module
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import tokenize
+
+
+def symtab() -> SymTab:
+    return SymTab(locals=interpreter_locals, parent=None)
+
+
+def test_interpret_closures() -> None:
+    programs = [
+        '1+2 *3', ' if 1>2 then  1 else 0 ', 'if 1 < 2 then 5', 'if 2 < 1 then 5',
+        ' { var a = 1; var b = a * 10; var c = b - 2; a = c / 2; a } ',
+        '{ var a = 1; { var a = 2; a = a + 1 }; a }',
+        '{ var i = 0; var s = 0; while i < 10 do { var j = i * i; s = s + j; i = i + 1 }; s }',
+        '{ var b = false; var n = 0; b and { n = 1; true }; true or { n = 2; false }; n == 0 }',
+        '{ var x = 0; { } }', '{ var x = 3; x = x = 4; x }',
+        loop_template.format(iterations=20),
+    ]
+    for code in programs:
+        assert interpret_closures(symtab(), parser(tokenize(code))) == interpret(symtab(), parser(tokenize(code))), code
+
+
+def test_compiled_closures_run_again() -> None:
+    run = compile_closures(symtab(), parser(tokenize('{ var i = 0; while i < 3 do i = i + 1; i }')))
+    assert run() == 3 and run() == 3
+
+
+def test_closure_errors_at_run_time() -> None:
+    run = compile_closures(symtab(), parser(tokenize('if false then unknown(1) else 2')))
+    assert run() == 2
+    for code, message in [('unknown(1)', 'Unknown function call unknown'), ('y + 1', 'Undefined variable name y'),
+                          ('{ while 1 do 2 }', 'Failed to evaluate condition')]:
+        with pytest.raises(Exception, match=message):
+            interpret_closures(symtab(), parser(tokenize(code)))
+
+
+def test_interpret_closures_module() -> None:
+    programs = [
+        '{ var i = 0; while true do { i = i + 1; if i > 3 then break }; i }',
+        '{ var i = 0; var s = 0; while i < 10 do { i = i + 1; if i == 3 then continue; s = s + i }; s }',
+        'fun fib(n: Int): Int { if n < 2 then { return n } else { return fib(n - 1) + fib(n - 2) } }\nfib(15)',
+        'fun f(x: Int): Int { var y = x * 2; { var z = y + 1; return z } }\nfun g(): Int { return f(f(1)) }\ng()',
+        'fun even(n: Int): Bool { if n == 0 then { return true } return odd(n - 1) }\n'
+        'fun odd(n: Int): Bool { if n == 0 then { return false } return even(n - 1) }\neven(10)',
+        'fun first(n: Int): Int { var i = 0; while true do { if i * i >= n then { return i }; i = i + 1 } }\nfirst(50)',
+        'fun nothing() { return }\nnothing()',
+        'fun body_value(): Int { 5 }\nbody_value()',
+    ]
+    for code in programs:
+        module = parse_module(tokenize(code))
+        assert interpret_closures_module(symtab(), module) == interpret_module(symtab(), module), code
+
+
+def test_closure_signal_errors() -> None:
+    for code, message in [('{ break }', 'Break or continue outside of a loop'),
+                          ('{ return 1 }', 'Return outside of a function'),
+                          ('fun f(): Int { break }\nf()', 'outside of a loop in f'),
+                          ('fun f(x: Int): Int { return x }\nf()', 'f expects 1 arguments')]:
+        for run in [interpret_module, interpret_closures_module]:
+            with pytest.raises(Exception, match=message):
+                run(symtab(), parse_module(tokenize(code)))
+
+
+def test_interpret_closures_command(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    programs = {
+        '{ var i = 0; while true do { i = i + 1; if i > 3 then break }; i }': '4',
+        'fun f(x: Int): Int { return x + 1 } f(2)': '3',
+        'print_int(7)': '7\nNone',
+    }
+    for code, expected in programs.items():
+        monkeypatch.setattr(sys, 'argv', ['compiler', 'interpret-closures'])
+        monkeypatch.setattr(sys, 'stdin', io.StringIO(code))
+        assert main() == 0
+        assert capsys.readouterr().out == expected + '\n', code
@@ -0,0 +1,63 @@
+from src.compiler.incremental_parser import ParseCache, reparse_module
+from src.compiler.incremental_tokenizer import retokenize
+from src.compiler.parser import parse_module
+from src.compiler.tokenizer import tokenize
+
+source = '''fun square(x: Int): Int {
+    return x * x;
+}
+fun add(x: Int, y: Int): Int {
+    return x + y;
+}
+print_int(add(square(2), 3));
+fun is_big(x: Int): Bool {
+    if x > 10 then { return true } else { return false }
+}
+print_bool(is_big(add(1, 2)))
+'''
+
+
+def test_reparse_same_lines() -> None:
+    cache = ParseCache()
+    first = reparse_module(tokenize(source), cache)
+    assert first == parse_module(tokenize(source))
+    assert (cache.parsed, cache.reused) == (3, 0)
+
+    edited = source.replace('x + y', 'y + x')
+    module = reparse_module(tokenize(edited), cache)
+    assert module == parse_module(tokenize(edited))
+    assert (cache.parsed, cache.reused) == (1, 2)
+    assert module.functions[0] is first.functions[0]
+    assert module.functions[2] is first.functions[2]
+
+
+def test_reparse_moves_locations() -> None:
+    cache = ParseCache()
+    tokens = tokenize(source)
+    first = reparse_module(tokens, cache)
+    edited = source.replace('return x * x;', 'var y = x * x;\n    return y;')
+    module = reparse_module(tokenize(edited), cache)
+    assert module == parse_module(tokenize(edited))
+    assert (cache.parsed, cache.reused) == (1, 2)
+    assert module.functions[2] is not first.functions[2]
+    assert module.functions[2].location.line == 9
+
+    # The earlier parse and its tokens keep their lines
+    assert first == parse_module(tokenize(source))
+    assert tokens == tokenize(source)
+
+    # Moving it back finds the same definitions again
+    module = reparse_module(tokenize(source), cache)
+    assert module == parse_module(tokenize(source))
+    assert (cache.parsed, cache.reused) == (1, 2)
+
+
+def test_reparse_after_retokenize() -> None:
+    tokens = tokenize(source)
+    cache = ParseCache()
+    reparse_module(tokens, cache)
+    offset = source.index('return x + y;')
+    edited, tokens = retokenize(source, tokens, offset, 0, 'print_int(x);\n    ')
+    module = reparse_module(tokens, cache)
+    assert module == parse_module(tokenize(edited))
+    assert (cache.parsed, cache.reused) == (1, 2)
@@ -0,0 +1,45 @@
+import random
+
+from src.compiler.incremental_tokenizer import retokenize
+from src.compiler.tokenizer import tokenize
+
+source = '''// comment
+{
+    var x: Int = 10; /* multi
+    line */ var flag = true;
+    while x >= 0 and not flag do x = x - 1;
+    if x == 0 then print_int(x / 2) else print_bool(flag)
+}
+'''
+
+
+def check_edit(code: str, offset: int, removed: int, inserted: str) -> None:
+    expected_source = code[:offset] + inserted + code[offset + removed:]
+    try:
+        expected = tokenize(expected_source)
+    except Exception:
+        return
+    new_source, tokens = retokenize(code, tokenize(code), offset, removed, inserted)
+    assert new_source == expected_source
+    assert tokens == expected, (offset, removed, inserted)
+
+
+def test_retokenize_edits() -> None:
+    check_edit(source, 0, 0, 'a')
+    check_edit(source, len(source), 0, ' b')
+    check_edit(source, source.index('flag'), 4, 'f')
+    check_edit(source, source.index('10'), 0, '\n\n')
+    check_edit(source, source.index('x ='), 0, '/* ')
+    check_edit(source, source.index('*/'), 2, '')
+    check_edit(source, source.index('var flag'), 0, '*/')
+    check_edit(source, source.index('and') + 1, 0, ' ')
+    check_edit(source, source.index('while'), 5, 'whilex')
+
+
+def test_retokenize_random_edits() -> None:
+    rand = random.Random(0)
+    snippets = ['', ' ', '\n', 'a', '1', '=', '/', '*', '/*', '*/', '//', ' if ', '{\n']
+    for _ in range(2000):
+        offset = rand.randrange(len(source) + 1)
+        removed = rand.choice([0, 0, 1, 2, 5])
+        check_edit(source, offset, min(removed, len(source) - offset), rand.choice(snippets))
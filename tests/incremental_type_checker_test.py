@@ -0,0 +1,73 @@
+import pytest
+
+from src.compiler.incremental_parser import ParseCache, reparse_module
+from src.compiler.incremental_type_checker import TypeCache, retypecheck_module
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+from src.compiler.traversal import preorder
+from src.compiler.type_checker import typecheck, typecheck_function
+
+source = '''fun square(x: Int): Int {
+    return x * x;
+}
+fun add(x: Int, y: Int): Int {
+    var big = x > 10;
+    return x + y;
+}
+fun is_big(x: Int): Bool {
+    if x > 10 then { return true } else { return false }
+}
+print_int(add(square(2), 3))
+'''
+
+
+def types(root: object) -> list[object]:
+    return [getattr(node, 'type', None) for node in preorder(root)]
+
+
+def checked_types(code: str) -> list[object]:
+    module = parse_module(tokenize(code))
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+    typecheck(module.expr, symtab)
+    return types(module)
+
+
+def test_retypecheck_after_reparse() -> None:
+    parse_cache = ParseCache()
+    cache = TypeCache()
+    retypecheck_module(reparse_module(tokenize(source), parse_cache), SymTab(locals={}, parent=None), cache)
+    assert (cache.checked, cache.reused) == (3, 0)
+
+    edited = source.replace('x + y', 'y + x')
+    module = reparse_module(tokenize(edited), parse_cache)
+    retypecheck_module(module, SymTab(locals={}, parent=None), cache)
+    assert (cache.checked, cache.reused) == (1, 2)
+    assert types(module) == checked_types(edited)
+
+
+def test_retypecheck_restores_types() -> None:
+    cache = TypeCache()
+    retypecheck_module(parse_module(tokenize(source)), SymTab(locals={}, parent=None), cache)
+    module = parse_module(tokenize(source))  # new definitions, without types
+    retypecheck_module(module, SymTab(locals={}, parent=None), cache)
+    assert (cache.checked, cache.reused) == (0, 3)
+    assert types(module) == checked_types(source)
+
+
+def test_retypecheck_changed_signature() -> None:
+    code = 'fun g(): Int { return 1 }\nfun f(): Int { return g() }\n'
+    cache = TypeCache()
+    retypecheck_module(parse_module(tokenize(code)), SymTab(locals={}, parent=None), cache)
+
+    module = parse_module(tokenize(code.replace('fun g(): Int { return 1 }', 'fun g(): Bool { return 1 > 0 }')))
+    with pytest.raises(Exception, match='Expected return type'):
+        retypecheck_module(module, SymTab(locals={}, parent=None), cache)
+
+
+def test_retypecheck_undefined_call() -> None:
+    with pytest.raises(Exception, match='Unknown function g'):
+        retypecheck_module(parse_module(tokenize('fun f(): Int { return g() }\n')), SymTab(locals={}, parent=None),
+                           TypeCache())
@@ -1,5 +1,11 @@
-from src.compiler.interpreter import interpret
-from src.compiler.parser import parser
+import io
+import sys
+
+import pytest
+
+from src.compiler.__main__ import main
+from src.compiler.interpreter import interpret, interpret_module
+from src.compiler.parser import parse_module, parser
 from src.compiler.symTab import SymTab, interpreter_locals
 from src.compiler.tokenizer import tokenize
 
@@ -14,3 +20,48 @@ def test_interpreter() -> None:
     assert interpret(symtable, parser(tokenize(' if 1>2 then  1 else 0 '))) == 0
     assert interpret(symtable, parser(tokenize(' { var x = 1; x = x * 10; x = x - 2; x = x / 2; x } '))) == 4
     assert interpret(symtable, parser(tokenize(' { var a = 1; var b = a * 10; var c = b - 2; a = c / 2; a } '))) == 4
+
+
+def run_module(code: str) -> object:
+    return interpret_module(symtable, parse_module(tokenize(code)))
+
+
+def test_break_continue() -> None:
+    code = '{ var i = 0; var s = 0; while true do { i = i + 1; if i > 10 then break; if i == 5 then continue; s = s + i }; s }'
+    assert interpret(symtable, parser(tokenize(code))) == 50
+    code = '{ var i = 0; while i < 3 do { var j = 0; while true do { j = j + 1; if j == 2 then break }; i = i + j }; i }'
+    assert interpret(symtable, parser(tokenize(code))) == 4
+    with pytest.raises(Exception, match='outside of a loop'):
+        interpret(symtable, parser(tokenize('{ break }')))
+
+
+def test_functions() -> None:
+    code = """
+    fun fact(n: Int): Int { if n <= 1 then { return 1 } else { return n * fact(n - 1) } }
+    fun first_square_over(limit: Int): Int {
+        var i = 0;
+        while true do { if i * i > limit then { return i }; i = i + 1 }
+        return 0;
+    }
+    fact(5) + first_square_over(50)
+    """
+    assert run_module(code) == 128
+    with pytest.raises(Exception, match='outside of a loop in f'):
+        run_module('fun f(): Int { break }\nwhile true do f()')
+
+
+def test_deep_recursion() -> None:
+    code = 'fun down(n: Int): Int { if n == 0 then { return 0 } else { return down(n - 1) + 1 } }\ndown(20000)'
+    assert run_module(code) == 20000  # far deeper than the Python stack
+
+
+def test_interpret_command(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]) -> None:
+    programs = {
+        '{ var i = 0; while true do { i = i + 1; if i > 3 then break }; i }': '4',
+        'fun f(x: Int): Int { return x + 1 } f(2)': '3',
+    }
+    for code, expected in programs.items():
+        monkeypatch.setattr(sys, 'argv', ['compiler', 'interpret'])
+        monkeypatch.setattr(sys, 'stdin', io.StringIO(code))
+        assert main() == 0
+        assert capsys.readouterr().out == expected + '\n', code
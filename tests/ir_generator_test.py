@@ -1,5 +1,7 @@
+from benchmarks.common import generate_functions
 from src.compiler.ir_generator import generate_ir
-from src.compiler.parser import parser
+from src.compiler.parser import parse_module, parser
+from src.compiler.pipeline import lower_stream
 from src.compiler.symTab import SymTab, root_types
 from src.compiler.tokenizer import tokenize
 from src.compiler.type_checker import typecheck
@@ -64,3 +66,36 @@ def test_generate_ir_opt() -> None:
     output = [str(ins) for ins in ir_instructions['main']]
 
     assert output == expected
+
+
+def test_generate_ir_fused() -> None:
+    sources = [generate_functions(20), '{ var a = 1; if a < 2 then { a = 3 }; a == 3 }',
+               '{ var b = true or false; while b and 1 > 2 do { b = not b; if b then break }; -1 }',
+               '{ var x = true; var y = x; if y then 1 else 2 }', '{ var x = 5; var y = x; while y > 0 do y = y - 1 }',
+               'var x = 5; var y = x; y']
+    for source in sources:
+        fused = [str(ins) for irs in lower_stream(tokenize(source)) for instructions in irs.values()
+                 for ins in instructions]
+        two_pass = [str(ins) for irs in lower_stream(tokenize(source), fused=False)
+                    for instructions in irs.values() for ins in instructions]
+        assert fused == two_pass
+
+    for code in ['(1<3)+2', 'if 1 then 2 else 4', 'if 1<3 then 2 else 3>0', 'var x: Int = true', 'while 1 do 2',
+                 '{ var a = 1; a = true }', 'f(1) + 1', 'not 1', '{ return 1 }', 'undefined + 1']:
+        errors = []
+        for one_walk in [False, True]:
+            expr = parser(tokenize(code))
+            try:
+                if not one_walk:
+                    typecheck(expr, SymTab(locals={}, parent=None))
+                generate_ir(root_types, expr, SymTab(locals={}, parent=None) if one_walk else None)
+            except Exception as e:
+                errors.append(str(e))
+        assert len(errors) == 2 and errors[0] == errors[1], code
+
+    module = parse_module(tokenize('fun f(x: Int): Bool { return x }'))
+    try:
+        generate_ir(root_types, module.functions[0], SymTab(locals={}, parent=None))
+        assert False, 'Type checking done for a wrong return type'
+    except Exception as e:
+        assert 'Expected return type' in str(e)
@@ -0,0 +1,35 @@
+from typing import Any
+
+from src.compiler.ir import Instruction
+from src.compiler.ir_interpreter import divide, ir_builtins, run_ir
+from src.compiler.pipeline import lower_stream
+from src.compiler.tokenizer import tokenize
+
+
+def run(code: str) -> list[Any]:
+    printed: list[Any] = []
+    instructions: dict[str, list[Instruction]] = {}
+    for irs in lower_stream(tokenize(code)):
+        instructions.update(irs)
+    run_ir(instructions, {**ir_builtins, 'print_int': printed.append, 'print_bool': printed.append})
+    return printed
+
+
+def test_divide() -> None:
+    assert [divide(7, 2), divide(-7, 2), divide(7, -2), divide(-7, -2)] == [3, -3, -3, 3]
+
+
+def test_run_ir() -> None:
+    assert run('{ var a = 3; var b = a * a - 1; print_int(if b > 5 then b else 0 - b) }') == [8]
+    assert run('{ var b = true; print_bool(b == false); print_int(-5 / 3) }') == [0, -1]
+    assert run('{ var i = 0; var s = 0; while i < 10 do { i = i + 1; s = s + i }; print_int(s) }') == [55]
+    assert run('1 + 2 * 3') == [7]
+    assert run('{ var k = 0; while not (k > 3) do k = k + 1; print_int(k); print_bool(not true); print_int(-k) }') \
+        == [4, 0, -4]
+    assert run('fun sq(x: Int): Int { return x * x }\nfun add(x: Int, y: Int): Int { return x + y }\n'
+               'print_int(add(sq(3), sq(4)))') == [25]
+
+
+def test_deep_recursion() -> None:
+    code = 'fun down(n: Int): Int { if n == 0 then { return 0 } else { return down(n - 1) + 1 } }\nprint_int(down(20000))'
+    assert run(code) == [20000]
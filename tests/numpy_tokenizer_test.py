@@ -0,0 +1,31 @@
+import pytest
+
+from src.compiler.numpy_tokenizer import tokenize_numpy
+from src.compiler.tokenizer import tokenize
+
+pytest.importorskip('numpy')
+
+source = '''// comment /* not a block comment
+{
+    var x1: Int = 10; /* multi
+    line */ var flag = true;
+    while x1 >= 0 and not flag do x1 = x1 - 1;
+    if x1 == 0 then print_int(x1 / 2) else print_bool(flag != false)
+}
+12abc a12 ((x))<=>=!=*/2
+'''
+
+
+def test_tokenize_numpy_matches_tokenize() -> None:
+    assert tokenize_numpy(source) == tokenize(source)
+    assert tokenize_numpy('') == []
+    assert tokenize_numpy('x') == tokenize('x')
+
+
+def test_tokenize_numpy_errors() -> None:
+    for code in ['a\n  b # c', 'a\n  b ! c', 'a\n  b /* c', 'a\n  b é']:
+        try:
+            tokenize_numpy(code)
+            assert False
+        except Exception as e:
+            assert 'line 2, column 5' in str(e), code
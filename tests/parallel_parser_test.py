@@ -0,0 +1,58 @@
+from src.compiler import ast
+from src.compiler.parallel_parser import function_spans, parse_functions, parse_parallel, token_columns
+from src.compiler.parallel_tokenizer import tokenize_parallel
+from src.compiler.parser import parse_module
+from src.compiler.symbols import SymbolTable
+from src.compiler.token_stream import tokenize_compact
+from src.compiler.tokenizer import tokenize
+from src.compiler.traversal import preorder
+from src.compiler.types import Int
+
+source = '''
+fun square(x: Int): Int {
+    return x * x;
+}
+print_int(square(3));
+fun pick(b: Bool, x: Int, y: Int): Int {
+    if b then { return x } else { return y }
+}
+fun noop() { }
+print_int(pick(true, 1, square(2)));
+''' + ''.join(f'fun f{n}(x: Int): Int {{ return f{n}(x - 1) + {n}; }}\n' for n in range(20))
+
+
+def test_function_spans() -> None:
+    tokens = tokenize(source)
+    spans = function_spans(tokens)
+    assert len(spans) == 23
+    assert [tokens[start].text for start, _ in spans] == ['fun'] * 23
+    assert [tokens[end - 1].text for _, end in spans] == ['}'] * 23
+    assert tokens[spans[0][1]].text == 'print_int'
+
+
+def test_parse_parallel() -> None:
+    tokens = tokenize(source, SymbolTable())
+    module = parse_parallel(tokens, workers=2)
+    assert module == parse_module(tokens)
+    assert [fun.name.symbol for fun in module.functions] == [fun.name.symbol for fun in parse_module(tokens).functions]
+    assert module.functions[0].param_types[0] is Int
+
+
+def test_parse_parallel_symbols() -> None:
+    # Compact and parallel tokens carry no symbol IDs; the workers must not give them their own
+    for tokens in [tokenize_compact(source)[:], tokenize_parallel(source, workers=2)]:
+        symbols = SymbolTable()
+        module = parse_parallel(tokens, workers=2, symbols=symbols)
+        for fun in module.functions:
+            for node in [fun.name, *fun.params, *preorder(fun.body)]:
+                if isinstance(node, ast.Identifier):
+                    assert node.symbol == symbols.ids[node.name]
+
+    # Without a table they keep none, and are looked up by name
+    module = parse_parallel(tokenize_compact(source)[:], workers=2)
+    for fun in module.functions:
+        for node in [fun.name, *fun.params, *preorder(fun.body)]:
+            if isinstance(node, ast.Identifier):
+                assert node.symbol == -1 and node.key == node.name
+    body = parse_functions(token_columns(tokenize_compact('fun f() { g() }')[:]))[0].body
+    assert [node.key for node in preorder(body) if isinstance(node, ast.Identifier)] == ['g']
@@ -0,0 +1,38 @@
+from src.compiler.parallel_tokenizer import split_points, tokenize_parallel
+from src.compiler.tokenizer import tokenize
+
+source = '''// comment /* not a block comment
+{
+    var x: Int = 10; /* multi
+    line
+    comment */ var flag = true;
+    while x >= 0 and not flag do x = x - 1;
+    /*
+    */
+    if x == 0 then print_int(x / 2) else print_bool(flag)
+}
+''' * 5
+
+
+def test_split_points_outside_block_comments() -> None:
+    for parts in range(1, 40):
+        points = split_points(source, parts)
+        assert points[0] == 0
+        assert points == sorted(set(points))
+        for point in points[1:]:
+            assert source[point - 1] == '\n'
+            tokenize(source[:point])  # raises on an unterminated comment
+
+
+def test_tokenize_parallel() -> None:
+    assert tokenize_parallel(source, workers=1) == tokenize(source)
+    assert tokenize_parallel(source, workers=3) == tokenize(source)
+
+
+def test_tokenize_parallel_error_line() -> None:
+    code = source + 'a # b'
+    try:
+        tokenize_parallel(code, workers=2)
+        assert False
+    except Exception as e:
+        assert f'line {code.count(chr(10)) + 1}, column 3' in str(e)
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.common import generate_functions
+from src.compiler.parallel_type_checker import typecheck_parallel
+from src.compiler.parser import parse_module
+from src.compiler.symTab import SymTab
+from src.compiler.tokenizer import tokenize
+from src.compiler.traversal import preorder
+from src.compiler.type_checker import typecheck, typecheck_function
+from src.compiler.types import Bool, Int
+
+
+def test_typecheck_parallel() -> None:
+    source = generate_functions(30) + 'fun later(): Bool { return f_1(1, 2) > 0 }\nf_29(1, 2) + 1'
+    expected = parse_module(tokenize(source))
+    symtab = SymTab(locals={}, parent=None)
+    for fun in expected.functions:
+        typecheck_function(fun, symtab)
+    assert expected.expr is not None
+    typecheck(expected.expr, symtab)
+
+    module = parse_module(tokenize(source))
+    typecheck_parallel(module, SymTab(locals={}, parent=None), workers=2)
+    def types(root: object) -> list[object]:
+        return [getattr(node, 'type', None) for node in preorder(root)]
+
+    assert types(module) == types(expected)
+    assert module.functions[-1].body.statements[0].type is Bool  # type: ignore[attr-defined]
+
+
+def test_typecheck_parallel_forward_calls_and_errors() -> None:
+    module = parse_module(tokenize('fun f(): Int { return g() }\nfun g(): Int { return 1 }\nf()'))
+    typecheck_parallel(module, SymTab(locals={}, parent=None), workers=2)
+    assert module.functions[0].body.statements[0].type is Int  # type: ignore[attr-defined]
+
+    source = generate_functions(10) + 'fun wrong(x: Int): Bool { return x }\n'
+    with pytest.raises(Exception, match='Expected return type'):
+        typecheck_parallel(parse_module(tokenize(source)), SymTab(locals={}, parent=None), workers=2, annotate=False)
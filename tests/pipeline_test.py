@@ -0,0 +1,81 @@
+import os
+import subprocess
+
+import pytest
+
+from src.compiler.assembler import assemble
+from src.compiler.ir import Instruction
+from src.compiler.ir_interpreter import run_ir
+from src.compiler.pipeline import compile_stream, lower_stream, split_module
+from src.compiler.tokenizer import tokenize
+
+source = '''
+fun square(x: Int): Int {
+    return x * x;
+}
+
+fun vec_len_squared(x: Int, y: Int): Int {
+    return square(x) + square(y);
+}
+
+print_int(vec_len_squared(3, 4));
+
+fun is_big(x: Int): Bool {
+    if x > 10 then { return true } else { return false }
+}
+
+print_bool(is_big(square(4)));
+'''
+
+
+def test_split_module() -> None:
+    items = [[token.text for token in item] for item in split_module(tokenize(source))]
+    assert [item[:2] for item in items] == [['fun', 'square'], ['fun', 'vec_len_squared'], ['fun', 'is_big'],
+                                            ['print_int', '(']]
+    assert items[0][-1] == '}'
+    assert items[3][-3:] == [')', ')', ';']
+
+
+def test_compile_stream() -> None:
+    pieces = list(compile_stream(tokenize(source)))
+    assert len(pieces) == 4
+    assert pieces[0].startswith('.global main')
+    assert not pieces[1].startswith('.global main')
+
+    assemble(pieces, 'compile_program')
+    proc = subprocess.run([f'{os.getcwd()}/compile_program'], capture_output=True, text=True)
+    assert proc.stdout.split() == ['25', 'true']
+
+
+def test_lower_stream_prints_last_value(capsys: pytest.CaptureFixture[str]) -> None:
+    programs = {
+        '1 + 2': '3',
+        'var x = 1; x + 1': '2',
+        'var x = 1; x + 1;': '',
+        'print_int(1); 2 > 1': '1 true',
+        'print_int(1);': '1',
+        '{ var x = 1; x + 1 }': '',
+        'fun f(): Int { return 1 } var a = f(); a': '1',
+        source: '25 true',
+    }
+    for code, expected in programs.items():
+        for fused in [True, False]:
+            instructions: dict[str, list[Instruction]] = {}
+            for irs in lower_stream(tokenize(code), fused):
+                instructions.update(irs)
+            run_ir(instructions)
+            assert capsys.readouterr().out.split() == expected.split(), code
+
+
+def test_lower_stream_errors() -> None:
+    programs = {
+        'fun f(): Int { return g() } fun g(): Int { return 1 } f()': 'Unknown function g',
+        'undefined(1)': 'Unknown function undefined',
+        '1 2': 'expected ";"',
+    }
+    for code, message in programs.items():
+        try:
+            list(lower_stream(tokenize(code)))
+            assert False, code
+        except Exception as e:
+            assert message in str(e), code
@@ -0,0 +1,47 @@
+import pytest
+
+from src.compiler import ast
+from src.compiler.interpreter import interpret
+from src.compiler.parser import SharedNodes, parse_module, parser
+from src.compiler.symTab import SymTab, interpreter_locals
+from src.compiler.tokenizer import tokenize
+from src.compiler.traversal import preorder
+
+
+def slots(node: ast.Expression | ast.Module) -> list[tuple[str, int]]:
+    return [(n.name, n.slot) for n in preorder(node) if isinstance(n, ast.Identifier)]
+
+
+def run(code: str, shared: SharedNodes | None = None) -> object:
+    return interpret(SymTab(locals=interpreter_locals, parent=None), parser(tokenize(code), shared))
+
+
+def test_slots() -> None:
+    expr = parser(tokenize('{ var a = 1; var b = { var a = a + 1; a }; print_int(a + b) }'))
+    assert slots(expr) == [('a', 0), ('b', 2), ('a', 1), ('a', 0), ('a', 1), ('print_int', -1), ('a', 0), ('b', 2)]
+
+    module = parse_module(tokenize('fun f(x: Int, y: Int): Int { var z = x; return f(z, y); }\n{ var x = 1; x }'))
+    assert slots(module) == [('f', -1), ('x', 0), ('y', 1), ('z', 2), ('x', 0), ('f', -1), ('z', 2), ('y', 1),
+                             ('x', 0), ('x', 0)]
+
+    with pytest.raises(Exception, match='Variable a has already been declared'):
+        parser(tokenize('{ var a = 1; var a = 2 }'))
+
+
+def test_interpret_with_slots() -> None:
+    assert run('{ var a = 1; { var a = 2; a = a + 1 }; a }') == 1
+    assert run('{ var a = 1; { a = a + 1 }; a }') == 2
+    assert run('{ var i = 0; var s = 0; while i < 10 do { var j = i * i; s = s + j; i = i + 1 }; s }') == 285
+
+
+def test_resolve_shared_nodes() -> None:
+    code = '{ { var a = 1; a + 1 }; { var b = 0; var a = 2; a + 1 } }'
+    shared = SharedNodes()
+    expr = parser(tokenize(code), shared)
+    assert isinstance(expr, ast.Block)
+    first, second = (block.statements[-1] for block in expr.statements if isinstance(block, ast.Block))
+    assert isinstance(first, ast.TreeOperator) and isinstance(second, ast.TreeOperator)
+    assert first is not second and first.right is second.right  # copied where 'a' has another slot
+    assert slots(first) == [('a', 0)] and slots(second) == [('a', 2)]
+
+    assert run('{ var a = 1; var b = { var c = 5; var a = 2; a + 1 }; a + 1 + b }', SharedNodes()) == 5
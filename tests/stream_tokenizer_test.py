@@ -0,0 +1,57 @@
+import io
+import os
+import tempfile
+from typing import Callable
+
+from src.compiler.stream_tokenizer import tokenize_file, tokenize_reader
+from src.compiler.tokenizer import tokenize
+
+source = '''
+// comment
+{
+    var x: Int = 10; /* multi
+    line */ var flag = true; // trailing
+    while x >= 0 and not flag do x = x - 1;
+    if x == 0 then print_int(x / 2) else print_bool(flag)
+} /* last */ 1
+'''
+
+
+def test_tokenize_file() -> None:
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'program.txt')
+        with open(path, 'w') as f:
+            f.write(source)
+        assert list(tokenize_file(path)) == tokenize(source)
+
+        with open(path, 'w') as f:
+            f.write('')
+        assert list(tokenize_file(path)) == []
+
+
+def test_tokenize_reader_chunk_boundaries() -> None:
+    expected = tokenize(source)
+    for chunk_size in [1, 2, 3, 5, 8, 64, 4096]:
+        assert list(tokenize_reader(io.BytesIO(source.encode()), chunk_size)) == expected
+
+
+def test_tokenize_reader_long_comments() -> None:
+    code = '/*' + 'x\n' * 1000 + '*/ a // ' + 'y' * 1000 + '\n b'
+    assert list(tokenize_reader(io.BytesIO(code.encode()), 16)) == tokenize(code)
+
+
+def test_tokenize_reader_long_whitespace() -> None:
+    code = 'a' + ' \n' * 1000 + '  b' + ' ' * 1000 + 'c'
+    assert list(tokenize_reader(io.BytesIO(code.encode()), 16)) == tokenize(code)
+
+
+def test_unterminated_comment() -> None:
+    code = 'a\n b /* never closed'
+    tokenizers: list[Callable[[], object]] = [lambda: tokenize(code),
+                                              lambda: list(tokenize_reader(io.BytesIO(code.encode()), 4))]
+    for tokens in tokenizers:
+        try:
+            tokens()
+            assert False
+        except Exception as e:
+            assert 'line 2, column 4' in str(e)
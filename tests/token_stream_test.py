@@ -0,0 +1,43 @@
+from src.compiler.parser import parser
+from src.compiler.token_stream import tokenize_compact
+from src.compiler.tokenizer import tokenize, SourceLocation
+
+source = '''
+// comment
+{
+    var x: Int = 10; /* multi
+    line */ var flag = true;
+    while x > 0 and not flag do x = x - 1;
+    if x >= 0 then print_int(x) else print_bool(flag)
+}
+'''
+
+
+def test_token_stream_matches_tokenize() -> None:
+    stream = tokenize_compact(source)
+    assert len(stream) == len(tokenize(source))
+    assert list(stream) == tokenize(source)
+    assert stream[-1] == tokenize(source)[-1]
+    assert stream[2:5] == tokenize(source)[2:5]
+
+
+def test_token_stream_lazy_locations() -> None:
+    stream = tokenize_compact('a\n  bb +\n\n c')
+    assert [stream.text(i) for i in range(len(stream))] == ['a', 'bb', '+', 'c']
+    assert stream.type(2) == 'operators'
+    assert stream.location(0) == SourceLocation(line=1, column=1)
+    assert stream.location(1) == SourceLocation(line=2, column=3)
+    assert stream.location(2) == SourceLocation(line=2, column=6)
+    assert stream.location(3) == SourceLocation(line=4, column=2)
+
+
+def test_parser_accepts_token_stream() -> None:
+    assert parser(tokenize_compact(source)) == parser(tokenize(source))
+
+
+def test_token_stream_error() -> None:
+    try:
+        tokenize_compact('a\n  b # c')
+        assert False
+    except Exception as e:
+        assert 'line 2, column 5' in str(e)
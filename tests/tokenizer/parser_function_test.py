@@ -1,5 +1,5 @@
 from src.compiler import ast, types
-from src.compiler.parser import parser
+from src.compiler.parser import parser, parse_module
 from src.compiler.tokenizer import tokenize, DummyLocation, SourceLocation
 from src.compiler.types import Type, Int
 
@@ -29,3 +29,15 @@ def test_parse_f() -> None:
                 args=[ast.Identifier(loc, name='x'),
                       ast.TreeOperator(loc, left=ast.Identifier(loc, name='y'), operator='+',
                                        right=ast.Identifier(loc, name='z'))]))
+
+
+def test_parse_module() -> None:
+    module = parse_module(tokenize('fun f(x: Int, y: Bool): Int { return x; } fun g() { } f(1, true); g()'))
+    assert [fun.name.name for fun in module.functions] == ['f', 'g']
+    assert module.functions[0] == ast.FunctionDef(
+        loc, ast.Identifier(loc, name='f'), [ast.Identifier(loc, name='x'), ast.Identifier(loc, name='y')],
+        [types.Int, types.Bool],
+        ast.Block(loc, [ast.Return(loc, ast.Identifier(loc, name='x')), ast.Literal(loc, None)]), types.Int)
+    assert module.functions[1].params == [] and module.functions[1].return_type == types.Unit
+    assert isinstance(module.expr, ast.Block)
+    assert [statement.call.name for statement in module.expr.statements] == ['f', 'g']  # type: ignore
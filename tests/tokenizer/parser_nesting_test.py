@@ -0,0 +1,57 @@
+from src.compiler import ast
+from src.compiler.parser import parser
+from src.compiler.tokenizer import tokenize
+
+source = '''
+{
+    var x: Int = 10;
+    var flag = true;
+    while x > 0 and not flag do {
+        x = x - 1;
+        if x == 3 then { break } else continue
+    }
+    { f(x, -x, (1 + 2) * 3) }
+    a = b = c == d
+}
+'''
+
+depth = 100_000
+
+
+def nesting(node: ast.Expression) -> int:
+    """Counts nodes along the first child, without recursing."""
+    count = 0
+    while True:
+        count += 1
+        match node:
+            case ast.Block():
+                node = node.statements[0]
+            case ast.IfExpression():
+                node = node.then_clause
+            case ast.WhileLoop():
+                node = node.do_action
+            case ast.TreeOperator():
+                node = node.left
+            case _:
+                return count
+
+
+def test_parser_nesting_errors() -> None:
+    try:
+        parser(tokenize('{ a b }'))
+        assert False
+    except Exception as e:
+        assert 'expected ";"' in str(e)
+    try:
+        parser(tokenize('(' * depth + '1'))
+        assert False
+    except Exception as e:
+        assert 'Expected ")"' in str(e)
+
+
+def test_parser_deep_nesting() -> None:
+    assert nesting(parser(tokenize('(' * depth + '1 + 2' + ')' * depth))) == 2
+    assert nesting(parser(tokenize('{' * depth + '1' + '}' * depth))) == depth + 1
+    assert nesting(parser(tokenize('if a then ' * depth + '1'))) == depth + 1
+    assert nesting(parser(tokenize('while a do ' * depth + '1'))) == depth + 1
+    assert nesting(parser(tokenize('{' + source * 3 + '}'))) == 3
@@ -16,3 +16,25 @@ def test_operators_parser() -> None:
                               right=ast.Literal(SourceLocation(line=1, column=5), value=1)),
         operator="-",
         right=ast.Literal(SourceLocation(line=1, column=9), value=2))
+
+
+def test_operator_precedence() -> None:
+    a = ast.Identifier(loc, name='a')
+    b = ast.Identifier(loc, name='b')
+    assert parser(tokenize('a or 1 + 2 * 3 < 4 and b')) == ast.TreeOperator(
+        loc, a, 'or', ast.TreeOperator(
+            loc, ast.TreeOperator(
+                loc, ast.TreeOperator(
+                    loc, ast.Literal(loc, 1), '+', ast.TreeOperator(loc, ast.Literal(loc, 2), '*', ast.Literal(loc, 3))),
+                '<', ast.Literal(loc, 4)),
+            'and', b))
+
+
+def test_assignment_is_right_associative() -> None:
+    a = ast.Identifier(loc, name='a')
+    b = ast.Identifier(loc, name='b')
+    c = ast.Identifier(loc, name='c')
+    assert parser(tokenize('a = b = c == 1')) == ast.TreeOperator(
+        loc, a, '=', ast.TreeOperator(loc, b, '=', ast.TreeOperator(loc, c, '==', ast.Literal(loc, 1))))
+    assert parser(tokenize('a or b = c')) == ast.TreeOperator(
+        loc, ast.TreeOperator(loc, a, 'or', b), '=', c)
@@ -0,0 +1,66 @@
+import pytest
+
+from src.compiler import ast
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import SharedNodes, parse_module, parser
+from src.compiler.symTab import SymTab, root_types
+from src.compiler.tokenizer import DummyLocation, Token, tokenize
+from src.compiler.type_checker import typecheck, typecheck_function
+from src.compiler.types import Bool, Int
+
+source = '''
+fun ints(x: Int, y: Int): Bool {
+    return x * x + y * y == x * x + 1;
+}
+fun bools(x: Bool, y: Bool): Bool {
+    return x == y and x == y;
+}
+print_bool(ints(1, 2) == bools(true, true));
+'''
+
+
+def test_shared_subtrees() -> None:
+    # Shared nodes keep the location of their first occurrence
+    tokens = [Token(token.type, token.text, DummyLocation(0, 0), token.symbol) for token in tokenize(source)]
+    shared = SharedNodes()
+    module = parse_module(tokens, shared)
+    assert module == parse_module(tokens)
+
+    ints = module.functions[0].body.statements[0]
+    assert isinstance(ints, ast.Return) and isinstance(ints.value, ast.TreeOperator)
+    left, right = ints.value.left, ints.value.right
+    assert isinstance(left, ast.TreeOperator) and isinstance(right, ast.TreeOperator)
+    assert left.left is right.left  # x * x
+    assert shared.shared > 0 and shared.saved_bytes > 0
+
+    # Calls and assignments are never shared
+    expr = parser(tokenize('f(1) + f(1) + (a = 1) + (a = 1)'), SharedNodes())
+    assert isinstance(expr, ast.TreeOperator) and isinstance(expr.left, ast.TreeOperator)
+    assert expr.right is not expr.left.right
+    calls = expr.left.left
+    assert isinstance(calls, ast.TreeOperator)
+    assert calls.right is not calls.left
+
+
+def test_typecheck_shared_between_scopes() -> None:
+    module = parse_module(tokenize(source), SharedNodes())
+    symtab = SymTab(locals={}, parent=None)
+    for fun in module.functions:
+        typecheck_function(fun, symtab)
+        generate_ir(root_types, fun)
+    assert module.expr is not None
+    assert typecheck(module.expr, symtab) is not None
+
+    ints, bools = (fun.body.statements[0] for fun in module.functions)
+    assert isinstance(ints, ast.Return) and ints.value is not None
+    assert isinstance(bools, ast.Return) and bools.value is not None
+    assert ints.value.type is Bool and bools.value.type is Bool
+    assert module.functions[0].params[0].type is Int
+
+    # A shared subtree is checked again where it occurs
+    bad = 'fun f(x: Int): Int { return x + 1; }\nfun g(x: Bool): Int { return x + 1; }'
+    module = parse_module(tokenize(bad), SharedNodes())
+    symtab = SymTab(locals={}, parent=None)
+    typecheck_function(module.functions[0], symtab)
+    with pytest.raises(Exception, match='expected two Ints'):
+        typecheck_function(module.functions[1], symtab)
@@ -1,3 +1,4 @@
+from src.compiler.symbols import SymbolTable, builtin_symbols
 from src.compiler.tokenizer import tokenize, Token, SourceLocation
 
 
@@ -81,3 +82,44 @@ def test_tokenizer() -> None:
         Token(type='identifier', text='Hello', source_location=SourceLocation(line=2, column=2)),
         Token(type='identifier', text='Jayan', source_location=SourceLocation(line=2, column=46))
     ]
+
+
+def test_tokenizer_keyword_prefixes() -> None:
+    assert tokenize("iffy order nothing") == [
+        Token(type='identifier', text='iffy', source_location=SourceLocation(line=1, column=1)),
+        Token(type='identifier', text='order', source_location=SourceLocation(line=1, column=6)),
+        Token(type='identifier', text='nothing', source_location=SourceLocation(line=1, column=12)),
+    ]
+
+    assert tokenize("a and not b or c") == [
+        Token(type='identifier', text='a', source_location=SourceLocation(line=1, column=1)),
+        Token(type='bool_operator', text='and', source_location=SourceLocation(line=1, column=3)),
+        Token(type='unary_operator', text='not', source_location=SourceLocation(line=1, column=7)),
+        Token(type='identifier', text='b', source_location=SourceLocation(line=1, column=11)),
+        Token(type='bool_operator', text='or', source_location=SourceLocation(line=1, column=13)),
+        Token(type='identifier', text='c', source_location=SourceLocation(line=1, column=16)),
+    ]
+
+
+def test_tokenizer_location_after_multi_line_comment() -> None:
+    assert tokenize("/* a\n bc */ x") == [
+        Token(type='identifier', text='x', source_location=SourceLocation(line=2, column=8)),
+    ]
+
+
+def test_tokenizer_error() -> None:
+    try:
+        tokenize("a\n  b # c")
+        assert False
+    except Exception as e:
+        assert 'line 2, column 5' in str(e)
+
+
+def test_tokenizer_symbols() -> None:
+    assert [token.symbol for token in tokenize('a + b')] == [-1, -1, -1]
+
+    symbols = SymbolTable()
+    a, plus, b, a_again, call = tokenize('a + b a print_int', symbols)
+    assert a.symbol == a_again.symbol == symbols.ids['a'] != b.symbol
+    assert plus.symbol == -1
+    assert call.symbol == builtin_symbols['print_int'] == SymbolTable().ids['print_int']
@@ -0,0 +1,76 @@
+from typing import Any
+
+import pytest
+
+from src.compiler import ast
+from src.compiler.interpreter import interpret
+from src.compiler.ir_generator import generate_ir
+from src.compiler.parser import parser
+from src.compiler.symTab import SymTab, interpreter_locals, root_types
+from src.compiler.tokenizer import SourceLocation, tokenize
+from src.compiler.traversal import DispatchTable, Visit, postorder, preorder, walk
+from src.compiler.type_checker import typecheck
+from src.compiler.types import Int
+
+
+def test_walk() -> None:
+    def literal(node: ast.Literal, depth: int) -> str:
+        return f'{node.value}@{depth}'
+
+    def tree_operator(node: ast.TreeOperator, depth: int) -> Visit:
+        right = yield node.right, depth + 1  # children in any order
+        left = yield node.left, depth + 1
+        return f'({left} {node.operator} {right})'
+
+    class Subclass(ast.Literal):
+        pass
+
+    handlers = DispatchTable({ast.Literal: literal, ast.TreeOperator: tree_operator})
+    assert walk(handlers, parser(tokenize('1 + 2 * 3')), 0) == '(1@1 + (2@2 * 3@2))'
+    assert walk(handlers, Subclass(SourceLocation(1, 1), value=4), 0) == '4@0'
+    assert handlers[Subclass] is literal
+    with pytest.raises(Exception, match='Unsupported AST Node'):
+        walk(handlers, parser(tokenize('-1')), 0)
+
+
+def test_walk_throws_into_parent() -> None:
+    def literal(node: ast.Literal, context: None) -> int:
+        if node.value == 0:
+            raise ZeroDivisionError()
+        return 1 // node.value  # type: ignore[operator]
+
+    def tree_operator(node: ast.TreeOperator, context: None) -> Visit:
+        try:
+            left = yield node.left, context
+        except ZeroDivisionError:
+            left = 'caught'
+        right = yield node.right, context
+        return f'{left} {right}'
+
+    handlers = DispatchTable({ast.Literal: literal, ast.TreeOperator: tree_operator})
+    assert walk(handlers, parser(tokenize('0 + 1')), None) == 'caught 1'
+    with pytest.raises(ZeroDivisionError):
+        walk(handlers, parser(tokenize('1 + 0')), None)
+
+
+def test_preorder_postorder() -> None:
+    def names(nodes: Any) -> list[str]:
+        return [getattr(node, 'name', None) or getattr(node, 'operator', None) or str(node.value) for node in nodes]
+
+    expr = parser(tokenize('a + 1 * b'))
+    assert names(preorder(expr)) == ['+', 'a', '*', '1', 'b']
+    assert names(postorder(expr)) == ['a', '1', 'b', '*', '+']
+
+
+def test_deep_nesting() -> None:
+    depth = 100_000
+    expr = parser(tokenize('(1 + ' * depth + '1' + ')' * depth))
+    assert typecheck(expr, SymTab(locals={}, parent=None)) is Int
+    assert interpret(SymTab(locals=interpreter_locals, parent=None), expr) == depth + 1
+    assert len(generate_ir(root_types, expr)['main']) == 2 * depth + 2  # loads, calls and the print
+    assert sum(1 for _ in preorder(expr)) == 2 * depth + 1
+
+
+def test_interpret_long_loop() -> None:
+    code = '{ var i = 0; while i < 10000 do i = i + 1; i }'
+    assert interpret(SymTab(locals=interpreter_locals, parent=None), parser(tokenize(code))) == 10000
@@ -1,8 +1,8 @@
-from src.compiler.parser import parser
+from src.compiler.parser import parser, parse_module
 from src.compiler.symTab import SymTab
 from src.compiler.tokenizer import tokenize
-from src.compiler.type_checker import typecheck
-from src.compiler.types import Int, Bool, Unit
+from src.compiler.type_checker import typecheck, typecheck_function
+from src.compiler.types import Int, Bool, Unit, FunctionType
 
 
 def get_new_symTab() -> SymTab:
@@ -11,6 +11,8 @@ def get_new_symTab() -> SymTab:
 
 def test_type_checker() -> None:
     assert typecheck(parser(tokenize('1+2')), get_new_symTab()) == Int
+    assert typecheck(parser(tokenize('read_int() + 1')), get_new_symTab()) == Int
+    assert typecheck(parser(tokenize('print_int(1)')), get_new_symTab()) == Unit
     assert typecheck(parser(tokenize('1+2>3')), get_new_symTab()) == Bool
     assert typecheck(parser(tokenize('if 1 > 3 then 4')), get_new_symTab()) == Unit
     assert typecheck(parser(tokenize('if 1 > 3 then 4 else 2')), get_new_symTab()) == Int
@@ -23,6 +25,8 @@ def test_type_checker() -> None:
     fail_typechecker('if 1<3 then 2 else 3>0')
     fail_typechecker('var x: Int = true')
     fail_typechecker('var x: Bool = 2')
+    fail_typechecker('undefined(1)')
+    fail_typechecker('1 + f()')
 
 
 def fail_typechecker(code: str) -> None:
@@ -34,3 +38,37 @@ def fail_typechecker(code: str) -> None:
         failed = True
 
     assert failed, f'Type checking done for {code}'
+
+
+def test_typecheck_function() -> None:
+    symtab = get_new_symTab()
+    module = parse_module(tokenize('fun f(x: Int, b: Bool): Int { if b then { return x } else { return 0 } }'))
+    assert typecheck_function(module.functions[0], symtab) == FunctionType((Int, Bool), Int)
+    assert typecheck(parser(tokenize('f(1, true) + 1')), symtab) == Int
+
+    for code in ['f(true, 1)', 'f(1)']:
+        try:
+            typecheck(parser(tokenize(code)), symtab)
+            assert False, f'Type checking done for {code}'
+        except Exception as e:
+            assert 'expected arguments' in str(e)
+
+    module = parse_module(tokenize('fun g(): Int { return true }'))
+    try:
+        typecheck_function(module.functions[0], symtab)
+        assert False
+    except Exception as e:
+        assert 'Expected return type' in str(e)
+
+
+def test_symtab_names() -> None:
+    symtab = get_new_symTab()
+    symtab.add_local('x', Int)
+    assert symtab.require('x') is Int and symtab.require(symtab.symbols.ids['x']) is Int
+    # Trees parsed without a table and with the symtab's one
+    assert typecheck(parser(tokenize('x + 1')), symtab) == Int
+    assert typecheck(parser(tokenize('x + 1'), symbols=symtab.symbols), symtab) == Int
+
+    child = SymTab(locals={'y': Bool}, parent=symtab)
+    assert child.symbols is symtab.symbols
+    assert typecheck(parser(tokenize('if y then x else 0')), child) == Int
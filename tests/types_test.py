@@ -0,0 +1,17 @@
+import pickle
+
+from src.compiler.types import BasicType, FunctionType, Int, Bool, Unit, PrintInt
+
+
+def test_interned_types() -> None:
+    assert BasicType('Int') is Int
+    assert FunctionType((Int,), Unit) is PrintInt
+    assert FunctionType([Int], Unit) is PrintInt and PrintInt.params == (Int,)  # type: ignore[arg-type]
+    assert FunctionType(params=(Int,), return_type=Unit) is PrintInt
+    assert FunctionType((Int, Bool), Int) is not FunctionType((Bool, Int), Int)
+    assert {FunctionType((Int,), Unit): 'print_int'}[PrintInt] == 'print_int'
+
+
+def test_unpickled_types_are_interned() -> None:
+    assert pickle.loads(pickle.dumps(Bool)) is Bool
+    assert pickle.loads(pickle.dumps([PrintInt, FunctionType((), Unit)])) == [PrintInt, FunctionType((), Unit)]
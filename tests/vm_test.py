@@ -0,0 +1,46 @@
+from typing import Any
+
+from src.compiler.ir import Instruction
+from src.compiler.ir_interpreter import ir_builtins
+from src.compiler.pipeline import lower_stream
+from src.compiler.tokenizer import tokenize
+from src.compiler.vm import Bytecode, compile_bytecode, disassemble, run_bytecode
+
+
+def compile_code(code: str, printed: list[Any]) -> Bytecode:
+    instructions: dict[str, list[Instruction]] = {}
+    for irs in lower_stream(tokenize(code)):
+        instructions.update(irs)
+    return compile_bytecode(instructions, {**ir_builtins, 'print_int': printed.append, 'print_bool': printed.append})
+
+
+def run(code: str) -> list[Any]:
+    printed: list[Any] = []
+    run_bytecode(compile_code(code, printed))
+    return printed
+
+
+def test_run_bytecode() -> None:
+    assert run('{ var a = 3; var b = a * a - 1; print_int(if b > 5 then b else 0 - b) }') == [8]
+    assert run('{ var b = true; print_bool(b == false); print_int(-5 / 3) }') == [0, -1]
+    assert run('{ var i = 0; var s = 0; while i < 10 do { i = i + 1; s = s + i }; print_int(s) }') == [55]
+    assert run('{ var i = 0; while i <= 5 do { if i > 3 and i != 5 then print_int(i); i = i + 1 } }') == [4]
+    assert run('1 + 2 * 3') == [7]
+    assert run('{ var k = 0; while not (k > 3) do k = k + 1; print_int(k); print_bool(not true); print_int(-k) }') \
+        == [4, 0, -4]
+    assert run('fun sq(x: Int): Int { return x * x }\nfun add(x: Int, y: Int): Int { return x + y }\n'
+               'print_int(add(sq(3), sq(4)))') == [25]
+
+
+def test_fused_instructions() -> None:
+    bytecode = compile_code('{ var i = 0; while i < 10 do { i = i + 1 }; print_int(i) }', [])
+    main = bytecode.functions[bytecode.main]
+    ops = [name for _, name, _ in disassemble(main)]
+    # The constants start in their registers, `i < 10` branches, and `i + 1` writes `i`
+    assert ops == ['COPY', 'JUMP_LT', 'ADD', 'JUMP', 'BUILTIN_1', 'END']
+    assert sorted(value for value in main.registers if value is not None) == [0, 1, 10]
+
+
+def test_deep_recursion() -> None:
+    code = 'fun down(n: Int): Int { if n == 0 then { return 0 } else { return down(n - 1) + 1 } }\nprint_int(down(20000))'
+    assert run(code) == [20000]